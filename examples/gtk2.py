@@ -15,8 +15,11 @@ import time
 #    the system.
 # 2. By calling cef.MessageLoopWork() in a timer - each call performs
 #    a single iteration of CEF message loop processing.
+# 3. By calling cef.InstallGLibMessagePump() before cef.Initialize(), CEF
+#    then wakes the GTK main loop only when it has work to do.
 MESSAGE_LOOP_BEST = 1
 MESSAGE_LOOP_TIMER = 2  # Pass --message-loop-timer flag to script to use this
+MESSAGE_LOOP_GLIB = 3  # Pass --message-loop-glib flag to script to use this
 g_message_loop = None
 
 
@@ -24,6 +27,8 @@ def main():
     check_versions()
     sys.excepthook = cef.ExceptHook  # To shutdown all CEF processes on error
     configure_message_loop()
+    if g_message_loop == MESSAGE_LOOP_GLIB:
+        cef.InstallGLibMessagePump()
     cef.Initialize()
     gobject.threads_init()
     Gtk2Example()
@@ -48,6 +53,10 @@ def configure_message_loop():
         print("Message loop mode: TIMER")
         g_message_loop = MESSAGE_LOOP_TIMER
         sys.argv.remove("--message-loop-timer")
+    elif "--message-loop-glib" in sys.argv:
+        print("Message loop mode: GLIB")
+        g_message_loop = MESSAGE_LOOP_GLIB
+        sys.argv.remove("--message-loop-glib")
     else:
         print("Message loop mode: BEST")
         g_message_loop = MESSAGE_LOOP_BEST
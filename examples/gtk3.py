@@ -16,6 +16,9 @@ def main():
             minor=Gtk.get_minor_version()))
     assert cef.__version__ >= "53.1", "CEF Python v53.1+ required to run this"
     sys.excepthook = cef.ExceptHook  # To shutdown all CEF processes on error
+    # CEF wakes the GTK main loop when it has work to do, there is
+    # no need to call cef.MessageLoopWork() in a timer.
+    cef.InstallGLibMessagePump()
     cef.Initialize()
     app = Gtk3Example()
     SystemExit(app.run(sys.argv))
@@ -30,15 +33,10 @@ class Gtk3Example(Gtk.Application):
 
     def run(self, argv):
         GObject.threads_init()
-        GObject.timeout_add(10, self.on_timer)
         self.connect("activate", self.on_activate)
         self.connect("shutdown", self.on_shutdown)
         return super(Gtk3Example, self).run(argv)
 
-    def on_timer(self):
-        cef.MessageLoopWork()
-        return True
-
     def on_activate(self, *_):
         self.window = Gtk.ApplicationWindow.new(self)
         self.window.set_title("GTK 3 example (PyGObject)")
@@ -26,7 +26,11 @@ def main():
     logger.info("Tk {ver}".format(ver=tk.TkVersion))
     assert cef.__version__ >= "53.1", "CEF Python v53.1+ required to run this"
     sys.excepthook = cef.ExceptHook  # To shutdown all CEF processes on error
-    cef.Initialize()
+    # MessageLoopWork() is called in a timer with the delay requested
+    # by CEF, see message_loop_work(). Tk can't be woken from other
+    # threads, so the scheduler ignores the requests.
+    cef.SetMessagePumpScheduler(lambda delay_ms: None)
+    cef.Initialize({"external_message_pump": True})
     app = MainFrame(tk.Tk())
     app.mainloop()
     cef.Shutdown()
@@ -258,7 +262,7 @@ class BrowserFrame(tk.Frame):
 
     def message_loop_work(self):
         cef.MessageLoopWork()
-        self.after(10, self.message_loop_work)
+        self.after(cef.GetNextWorkDelay(), self.message_loop_work)
 
     def on_configure(self, _):
         if not self.browser:
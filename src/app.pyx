@@ -13,3 +13,17 @@ cdef public void App_OnBeforeCommandLineProcessing_BrowserProcess(
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void App_OnScheduleMessagePumpWork(
+        cef_types.int64 delay_ms
+        ) except * with gil:
+    # Called on any thread when the external_message_pump setting is
+    # enabled and the native message pump is not used.
+    cdef object scheduler = g_messagePumpScheduler
+    try:
+        ScheduleNextWork(delay_ms)
+        if scheduler is not None:
+            scheduler(delay_ms)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
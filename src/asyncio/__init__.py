@@ -0,0 +1,120 @@
+# Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+"""Run the CEF message loop on an asyncio event loop.
+
+Instead of calling cefpython.MessageLoopWork() in a periodic timer,
+CEF work is scheduled on the event loop exactly when CEF asks for it
+through OnScheduleMessagePumpWork. When idle the loop sleeps and when
+busy there is no timer latency.
+
+Usage:
+    from cefpython3 import cefpython as cef
+    from cefpython3.asyncio import InstallMessagePump
+    loop = asyncio.get_event_loop()
+    pump = InstallMessagePump(loop)
+    cef.Initialize({"external_message_pump": True})
+    ... create browsers, run the loop ...
+    pump.Uninstall()
+    cef.Shutdown()
+
+The event loop must run on the thread that called cefpython.Initialize().
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+from cefpython3 import cefpython
+
+__all__ = ["MessagePump", "InstallMessagePump"]
+
+# Special delay placeholder value, same as in CEF's external pump.
+# It is scheduled after each work iteration and dropped when a timer
+# event is already pending.
+TIMER_DELAY_PLACEHOLDER = 2147483647
+
+# The maximum number of milliseconds to wait between calls to
+# MessageLoopWork() (30fps).
+MAX_TIMER_DELAY = 1000 // 30
+
+
+class MessagePump(object):
+    """Python port of CEF's MainMessageLoopExternalPump scheduling
+    logic using an asyncio event loop instead of native timers."""
+
+    def __init__(self, loop=None):
+        self.loop = loop or asyncio.get_event_loop()
+        self.timer = None
+        self.is_active = False
+        self.reentrancy_detected = False
+        self.installed = False
+
+    def Install(self):
+        """Set this pump as the message pump scheduler. Must be called
+        before cefpython.Initialize()."""
+        cefpython.SetMessagePumpScheduler(self.OnScheduleMessagePumpWork)
+        self.installed = True
+
+    def Uninstall(self):
+        """Stop scheduling work. Call it before cefpython.Shutdown()."""
+        if self.installed:
+            cefpython.SetMessagePumpScheduler(None)
+            self.installed = False
+        self.KillTimer()
+
+    def OnScheduleMessagePumpWork(self, delay_ms):
+        # Called by CEF on any thread.
+        if self.installed:
+            self.loop.call_soon_threadsafe(self.OnScheduleWork, delay_ms)
+
+    def OnScheduleWork(self, delay_ms):
+        if not self.installed:
+            return
+        if delay_ms == TIMER_DELAY_PLACEHOLDER and self.timer:
+            # Don't set the maximum timer requested from DoWork() if
+            # a timer event is currently pending.
+            return
+        self.KillTimer()
+        if delay_ms <= 0:
+            self.DoWork()
+        else:
+            delay_ms = min(delay_ms, MAX_TIMER_DELAY)
+            self.timer = self.loop.call_later(delay_ms / 1000.0,
+                                              self.OnTimerTimeout)
+
+    def OnTimerTimeout(self):
+        self.timer = None
+        self.DoWork()
+
+    def KillTimer(self):
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+
+    def DoWork(self):
+        if self.is_active:
+            # MessageLoopWork() callbacks may run nested event loops,
+            # repost the discarded call so that it executes later.
+            self.reentrancy_detected = True
+            return
+        self.reentrancy_detected = False
+        self.is_active = True
+        try:
+            cefpython.MessageLoopWork()
+        finally:
+            self.is_active = False
+        if self.reentrancy_detected:
+            # Execute the remaining work as soon as possible.
+            self.loop.call_soon(self.OnScheduleWork, 0)
+        elif not self.timer:
+            # May be dropped in OnScheduleWork() if another timer
+            # event is already in-flight.
+            self.loop.call_soon(self.OnScheduleWork,
+                                TIMER_DELAY_PLACEHOLDER)
+
+
+def InstallMessagePump(loop=None):
+    """Create a MessagePump for the loop and install it. Returns the
+    pump."""
+    pump = MessagePump(loop)
+    pump.Install()
+    return pump
@@ -17,6 +17,42 @@ MOUSEBUTTON_RIGHT = cef_types.MBT_RIGHT
 # get segmentation faults, as they will be garbage collected.
 
 cdef dict g_pyBrowsers = {}
+# Set by RemovePyBrowser() when the last browser was removed, used by
+# Shutdown() with the multi_threaded_message_loop setting.
+cdef object g_browsersClosedEvent = None
+# Indexes maintained by GetPyBrowser(), CreateBrowserSync() and
+# RemovePyBrowser(), so that lookups don't need to iterate browsers.
+# windowHandle => browserId, both native and outer window handles.
+cdef dict g_pyBrowsersByWindowHandle = {}
+# browserId => [windowHandle, ..]
+cdef dict g_pyBrowserWindowHandles = {}
+# id(clientCallbacks) => [browserId, ..], browsers sharing the client
+# callbacks dict, popups share it with their opener. Maintained by
+# GetPyBrowser(), PyBrowser.SetClientCallbacksDict() and RemovePyBrowser().
+cdef dict g_clientCallbacksBrowserIds = {}
+
+# Client callbacks whose C++ handlers don't call into Python when the
+# callback is not set, see client_handler/client_callbacks.h.
+cdef dict g_clientCallbackFlags = {
+    "OnAddressChange": CCB_OnAddressChange,
+    "OnTitleChange": CCB_OnTitleChange,
+    "OnTooltip": CCB_OnTooltip,
+    "OnStatusMessage": CCB_OnStatusMessage,
+    "OnConsoleMessage": CCB_OnConsoleMessage,
+    "OnPreKeyEvent": CCB_OnPreKeyEvent,
+    "OnKeyEvent": CCB_OnKeyEvent,
+    "OnLoadingStateChange": CCB_OnLoadingStateChange,
+    "OnLoadStart": CCB_OnLoadStart,
+    "OnLoadEnd": CCB_OnLoadEnd,
+    "OnLoadError": CCB_OnLoadError,
+    "OnPaint": CCB_OnPaint,
+    "OnCursorChange": CCB_OnCursorChange,
+    "OnScrollOffsetChanged": CCB_OnScrollOffsetChanged,
+    "OnBeforeBrowse": CCB_OnBeforeBrowse,
+    "OnBeforeResourceLoad": CCB_OnBeforeResourceLoad,
+    "GetResourceHandler": CCB_GetResourceHandler,
+    "OnResourceRedirect": CCB_OnResourceRedirect,
+}
 
 cdef PyBrowser GetPyBrowserById(int browserId):
     if browserId in g_pyBrowsers:
@@ -32,24 +68,21 @@ cdef PyBrowser GetPyBrowser(CefRefPtr[CefBrowser] cefBrowser):
 
     cdef PyBrowser pyBrowser
     cdef int browserId
-    cdef int identifier
 
     browserId = cefBrowser.get().GetIdentifier()
     if browserId in g_pyBrowsers:
         return g_pyBrowsers[browserId]
 
-    for identifier, pyBrowser in g_pyBrowsers.items():
-        if not pyBrowser.cefBrowser.get():
-            # noinspection PyUnresolvedReferences
-            Debug("GetPyBrowser(): removing an empty CefBrowser reference, "
-                  "browserId=%s" % identifier)
-            del g_pyBrowsers[identifier]
+    # Browsers are removed from g_pyBrowsers in RemovePyBrowser(),
+    # called from LifespanHandler_OnBeforeClose() and Shutdown().
 
     # noinspection PyUnresolvedReferences
     Debug("GetPyBrowser(): creating new PyBrowser, browserId=%s" % browserId)
     pyBrowser = PyBrowser()
     pyBrowser.cefBrowser = cefBrowser
     g_pyBrowsers[browserId] = pyBrowser
+    AddPyBrowserWindowHandle(browserId, pyBrowser.GetWindowHandle())
+    pyBrowser.AddToClientCallbacksBrowsers()
 
     # Inherit client callbacks and javascript bindings
     # from parent browser.
@@ -71,21 +104,42 @@ cdef PyBrowser GetPyBrowser(CefRefPtr[CefBrowser] cefBrowser):
     if pyBrowser.IsPopup() and \
             not pyBrowser.GetUserData("__outerWindowHandle"):
         openerHandle = pyBrowser.GetOpenerWindowHandle()
-        for identifier, tempPyBrowser in g_pyBrowsers.items():
-            if tempPyBrowser.GetWindowHandle() == openerHandle:
-                clientCallbacks = tempPyBrowser.GetClientCallbacksDict()
-                if clientCallbacks:
-                    pyBrowser.SetClientCallbacksDict(clientCallbacks)
-                javascriptBindings = tempPyBrowser.GetJavascriptBindings()
-                if javascriptBindings:
-                    if javascriptBindings.GetBindToPopups():
-                        pyBrowser.SetJavascriptBindings(javascriptBindings)
+        tempPyBrowser = GetPyBrowserById(
+                g_pyBrowsersByWindowHandle.get(openerHandle, 0))
+        if tempPyBrowser and tempPyBrowser.GetWindowHandle() == openerHandle:
+            clientCallbacks = tempPyBrowser.GetClientCallbacksDict()
+            if clientCallbacks:
+                pyBrowser.SetClientCallbacksDict(clientCallbacks)
+            javascriptBindings = tempPyBrowser.GetJavascriptBindings()
+            if javascriptBindings:
+                if javascriptBindings.GetBindToPopups():
+                    pyBrowser.SetJavascriptBindings(javascriptBindings)
+    pyBrowser.UpdateClientCallbackMask()
     return pyBrowser
 
+cdef void AddPyBrowserWindowHandle(int browserId, WindowHandle windowHandle
+                                   ) except *:
+    # Windowless browsers have no window handle.
+    if not windowHandle:
+        return
+    # First browser wins, same as when iterating browsers.
+    if windowHandle not in g_pyBrowsersByWindowHandle:
+        g_pyBrowsersByWindowHandle[windowHandle] = browserId
+        g_pyBrowserWindowHandles.setdefault(browserId, []).append(
+                windowHandle)
+
+cdef void RemovePyBrowserWindowHandles(int browserId) except *:
+    for windowHandle in g_pyBrowserWindowHandles.pop(browserId, []):
+        if g_pyBrowsersByWindowHandle.get(windowHandle) == browserId:
+            del g_pyBrowsersByWindowHandle[windowHandle]
+
 cdef void RemovePyBrowser(int browserId) except *:
     # Called from LifespanHandler_OnBeforeClose().
     global g_pyBrowsers
+    RemovePyBrowserWindowHandles(browserId)
+    RemoveClientCallbackMask(browserId)
     if browserId in g_pyBrowsers:
+        (<PyBrowser>g_pyBrowsers[browserId]).RemoveFromClientCallbacksBrowsers()
         if len(g_pyBrowsers) == 1:
             # This is the last browser remaining.
             if g_sharedRequestContext.get():
@@ -96,18 +150,16 @@ cdef void RemovePyBrowser(int browserId) except *:
         # noinspection PyUnresolvedReferences
         Debug("del g_pyBrowsers[%s]" % browserId)
         del g_pyBrowsers[browserId]
+        if not g_pyBrowsers and g_browsersClosedEvent is not None:
+            g_browsersClosedEvent.set()
     else:
         # noinspection PyUnresolvedReferences
         Debug("RemovePyBrowser() FAILED: browser not found, id = %s" \
                 % browserId)
 
 cpdef PyBrowser GetBrowserByWindowHandle(WindowHandle windowHandle):
-    cdef PyBrowser pyBrowser
-    for browserId in g_pyBrowsers:
-        pyBrowser = g_pyBrowsers[browserId]
-        if (pyBrowser.GetWindowHandle() == windowHandle or
-                pyBrowser.GetUserData("__outerWindowHandle") == long(windowHandle)):
-            return pyBrowser
+    if windowHandle in g_pyBrowsersByWindowHandle:
+        return GetPyBrowserById(g_pyBrowsersByWindowHandle[windowHandle])
     return None
 
 cdef public void PyBrowser_ShowDevTools(CefRefPtr[CefBrowser] cefBrowser
@@ -130,6 +182,9 @@ cdef class PyBrowser:
     cdef public list allowedClientCallbacks
     cdef public JavascriptBindings javascriptBindings
     cdef public dict userData
+    cdef public dict channels
+    # Key in g_clientCallbacksBrowserIds, None when not registered.
+    cdef object clientCallbacksKey
 
     # Properties used by ToggleFullscreen().
     cdef public int isFullscreen
@@ -160,12 +215,15 @@ cdef class PyBrowser:
         self.clientCallbacks = {}
         self.allowedClientCallbacks = []
         self.userData = {}
+        self.channels = {}
 
     def __dealloc__(self):
         if self.imageBuffer:
             free(self.imageBuffer)
 
-    cpdef py_void SetClientCallback(self, py_string name, object callback):
+    cdef void SetClientCallbackValue(self, py_string name, object callback
+                                     ) except *:
+        # Client callback masks are updated by the caller.
         if not self.allowedClientCallbacks:
             # DisplayHandler
             self.allowedClientCallbacks += [
@@ -214,38 +272,92 @@ cdef class PyBrowser:
                             "callback: %s" % name)
         self.clientCallbacks[name] = callback
 
+    cpdef py_void SetClientCallback(self, py_string name, object callback):
+        self.SetClientCallbackValue(name, callback)
+        self.UpdateSharedClientCallbackMasks()
+
     cpdef py_void SetClientHandler(self, object clientHandler):
         if not hasattr(clientHandler, "__class__"):
             raise Exception("Browser.SetClientHandler() failed: __class__ "
                             "attribute missing")
-        cdef dict methods = {}
         cdef py_string key
-        cdef object method
-        cdef tuple value
-        for value in inspect.getmembers(clientHandler,
-                predicate=inspect.ismethod):
-            key = value[0]
-            method = value[1]
+        # See method_cache.pyx.
+        for key in GetMethodNames(clientHandler, inspect.ismethod):
             if key and key[0] != '_':
-                self.SetClientCallback(key, method)
+                self.SetClientCallbackValue(key, getattr(clientHandler, key))
+        self.UpdateSharedClientCallbackMasks()
 
     cpdef object GetClientCallback(self, py_string name):
         if name in self.clientCallbacks:
             return self.clientCallbacks[name]
 
     cpdef py_void SetClientCallbacksDict(self, dict clientCallbacks):
+        cdef py_bool registered = self.clientCallbacksKey is not None
+        self.RemoveFromClientCallbacksBrowsers()
         self.clientCallbacks = clientCallbacks
+        if registered:
+            self.AddToClientCallbacksBrowsers()
+        self.UpdateClientCallbackMask()
+
+    cdef void AddToClientCallbacksBrowsers(self) except *:
+        self.clientCallbacksKey = id(self.clientCallbacks)
+        g_clientCallbacksBrowserIds.setdefault(self.clientCallbacksKey,
+                                               []).append(self.GetIdentifier())
+
+    cdef void RemoveFromClientCallbacksBrowsers(self) except *:
+        if self.clientCallbacksKey is None:
+            return
+        cdef list browserIds = g_clientCallbacksBrowserIds.get(
+                self.clientCallbacksKey)
+        if browserIds is not None:
+            if self.GetIdentifier() in browserIds:
+                browserIds.remove(self.GetIdentifier())
+            if not browserIds:
+                del g_clientCallbacksBrowserIds[self.clientCallbacksKey]
+        self.clientCallbacksKey = None
+
+    cdef void UpdateSharedClientCallbackMasks(self) except *:
+        # Popups may share the dict with this browser.
+        cdef PyBrowser pyBrowser
+        if self.clientCallbacksKey is None \
+                or self.clientCallbacksKey != id(self.clientCallbacks):
+            # The public "clientCallbacks" attribute was replaced.
+            self.UpdateClientCallbackMask()
+            return
+        for browserId in g_clientCallbacksBrowserIds[self.clientCallbacksKey]:
+            pyBrowser = GetPyBrowserById(browserId)
+            if pyBrowser:
+                pyBrowser.UpdateClientCallbackMask()
+
+    cdef void UpdateClientCallbackMask(self) except *:
+        # Called whenever client callbacks change. Modifying the dict
+        # returned by GetClientCallbacksDict() directly is not detected.
+        cdef uint32_t mask = 0
+        for name, callback in self.clientCallbacks.items():
+            if callback and name in g_clientCallbackFlags:
+                mask |= <uint32_t>g_clientCallbackFlags[name]
+        SetClientCallbackMask(self.GetIdentifier(), mask)
 
     cpdef dict GetClientCallbacksDict(self):
         return self.clientCallbacks
 
     cpdef py_void SetJavascriptBindings(self, JavascriptBindings bindings):
         self.javascriptBindings = bindings
-        self.javascriptBindings.Rebind()
+        self.javascriptBindings.InvalidateBrowser(self.GetIdentifier())
+        self.javascriptBindings.BindBrowser(self)
 
     cpdef JavascriptBindings GetJavascriptBindings(self):
         return self.javascriptBindings
 
+    cpdef Channel CreateChannel(self, py_string name,
+                                py_string policy="latest",
+                                int maxQueueSize=1000):
+        # See channel.pyx.
+        return CreateChannelForBrowser(self, name, policy, maxQueueSize)
+
+    cpdef Channel GetChannel(self, py_string name):
+        return self.channels.get(name)
+
     # --------------
     # CEF API.
     # --------------
@@ -274,6 +386,10 @@ cdef class PyBrowser:
     cpdef py_void CloseDevTools(self):
         self.GetCefBrowserHost().get().CloseDevTools()
 
+    cpdef object EvaluateJavascript(self, py_string jsCode,
+                                    object timeout=None):
+        return self.GetMainFrame().EvaluateJavascript(jsCode, timeout)
+
     def ExecuteFunction(self, *args):
         self.GetMainFrame().ExecuteFunction(*args)
 
@@ -290,11 +406,16 @@ cdef class PyBrowser:
                 bool(forward), bool(matchCase), bool(findNext))
 
     cpdef PyFrame GetFocusedFrame(self):
+        if g_multiThreadedMessageLoop and not IsThread(TID_UI):
+            return CallOnUIThread("Browser.GetFocusedFrame()",
+                                  self.GetFocusedFrame, [])
         assert IsThread(TID_UI), (
                 "Browser.GetFocusedFrame() may only be called on UI thread")
         return GetPyFrame(self.GetCefBrowser().get().GetFocusedFrame())
 
     cpdef PyFrame GetFrame(self, py_string name):
+        if g_multiThreadedMessageLoop and not IsThread(TID_UI):
+            return CallOnUIThread("Browser.GetFrame()", self.GetFrame, [name])
         assert IsThread(TID_UI), (
                 "Browser.GetFrame() may only be called on the UI thread")
         cdef CefString cefName
@@ -306,6 +427,9 @@ cdef class PyBrowser:
                 <long long>long(identifier)))
 
     cpdef list GetFrameNames(self):
+        if g_multiThreadedMessageLoop and not IsThread(TID_UI):
+            return CallOnUIThread("Browser.GetFrameNames()",
+                                  self.GetFrameNames, [])
         assert IsThread(TID_UI), (
                 "Browser.GetFrameNames() may only be called on the UI thread")
         cdef cpp_vector[CefString] cefNames
@@ -586,6 +710,9 @@ cdef class PyBrowser:
         return self.GetCefBrowserHost().get().IsMouseCursorChangeDisabled()
 
     cpdef py_bool TryCloseBrowser(self):
+        if g_multiThreadedMessageLoop and not IsThread(TID_UI):
+            return CallOnUIThread("Browser.TryCloseBrowser()",
+                                  self.TryCloseBrowser, [])
         return self.GetCefBrowserHost().get().TryCloseBrowser()
 
     cpdef py_void WasResized(self):
@@ -600,6 +727,11 @@ cdef class PyBrowser:
     cdef void SendProcessMessage(self, cef_process_id_t targetProcess,
             object frameId, py_string messageName, list pyArguments
             ) except *:
+        if targetProcess == cef_types.PID_RENDERER \
+                and IsProcessMessageBatchingEnabled():
+            # See process_message_batch.pyx.
+            QueueProcessMessage(self, frameId, messageName, pyArguments)
+            return
         cdef CefRefPtr[CefProcessMessage] message = \
                 CefProcessMessage_Create(PyToCefStringValue(messageName))
         # This does not work, no idea why, the CEF implementation
@@ -619,6 +751,8 @@ cdef class PyBrowser:
         if not success:
             raise Exception("Browser.SendProcessMessage() failed: "\
                     "messageName=%s" % messageName)
+        g_processMessageStatistics["messages_sent"] += 1
+        g_processMessageStatistics["ipc_messages_sent"] += 1
 
     # -------------------------------------------------------------------------
     # OSR drag & drop
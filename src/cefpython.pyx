@@ -282,6 +282,14 @@ import json
 import datetime
 # noinspection PyUnresolvedReferences
 import random
+# noinspection PyUnresolvedReferences
+import collections
+# noinspection PyUnresolvedReferences
+import mmap
+# noinspection PyUnresolvedReferences
+import struct
+# noinspection PyUnresolvedReferences
+import tempfile
 
 if sys.version_info.major == 2:
     # noinspection PyUnresolvedReferences
@@ -301,6 +309,17 @@ else:
 from cpython.version cimport PY_MAJOR_VERSION
 # noinspection PyUnresolvedReferences
 import weakref
+# noinspection PyUnresolvedReferences
+import threading
+
+try:
+    # noinspection PyUnresolvedReferences
+    from concurrent import futures as concurrent_futures
+except ImportError:
+    # Python 2 requires the "futures" backport package to be installed.
+    # Functions returning futures will raise an exception when it is
+    # not available.
+    concurrent_futures = None
 
 # We should allow multiple string types: str, unicode, bytes.
 # PyToCefString() can handle them all.
@@ -351,6 +370,8 @@ from cython.operator cimport preincrement as preinc, dereference as deref
 from libc.stdlib cimport calloc, malloc, free
 # noinspection PyUnresolvedReferences
 from libc.stdlib cimport atoi
+# noinspection PyUnresolvedReferences
+from libc.math cimport ceil
 
 # When pyx file cimports * from a pxd file and that pxd cimports * from another pxd
 # then these names will be visible in pyx file.
@@ -376,6 +397,7 @@ ELIF UNAME_SYSNAME == "Darwin":
 
 from cpp_utils cimport *
 from task cimport *
+from client_callbacks cimport *
 
 from cef_string cimport *
 cdef extern from *:
@@ -447,6 +469,25 @@ g_applicationSettings = {"string_encoding": "utf-8"}
 g_commandLineSwitches = {}
 
 cdef scoped_ptr[MainMessageLoopExternalPump] g_external_message_pump
+# Python callable that replaces the native external message pump,
+# see SetMessagePumpScheduler().
+cdef object g_messagePumpScheduler = None
+# Time of the earliest message loop work requested through
+# OnScheduleMessagePumpWork since the last MessageLoopWork() call,
+# 0 if none. See GetNextWorkDelay().
+cdef double g_nextWorkTime = 0
+# Set in Initialize(). When True CEF runs its message loop on a separate
+# UI thread and calls that require it are marshalled there from the
+# application main thread, see CallOnUIThread().
+cdef py_bool g_multiThreadedMessageLoop = False
+# Set in Shutdown(), tasks can no longer be posted to CEF threads.
+cdef py_bool g_isShutdown = False
+# Maximum delay returned by GetNextWorkDelay(), same as in CEF's
+# external message pump (30fps).
+MAX_WORK_DELAY = 1000 // 30
+# Maximum sleep between message loop work while Shutdown() waits for
+# browsers to close, closing requires a few IPC round trips.
+cdef int SHUTDOWN_MAX_WORK_DELAY = 10
 
 # noinspection PyUnresolvedReferences
 cdef cpp_bool _MessageLoopWork_wasused = False
@@ -481,11 +522,19 @@ ELIF UNAME_SYSNAME == "Darwin":
     include "window_utils_mac.pyx"
 
 include "task.pyx"
+include "thread_safe_browser.pyx"
+include "method_cache.pyx"
 include "javascript_bindings.pyx"
+include "observable_property.pyx"
 include "virtual_keys.pyx"
 include "window_info.pyx"
 include "process_message_utils.pyx"
 include "javascript_callback.pyx"
+include "javascript_evaluation.pyx"
+include "process_message_batch.pyx"
+include "channel.pyx"
+include "stream.pyx"
+include "shared_memory.pyx"
 include "python_callback.pyx"
 include "web_plugin_info.pyx"
 include "request.pyx"
@@ -670,6 +719,14 @@ def Initialize(applicationSettings=None, commandLineSwitches=None, **kwargs):
     # CEF options - default values.
     if not "multi_threaded_message_loop" in applicationSettings:
         applicationSettings["multi_threaded_message_loop"] = False
+    global g_multiThreadedMessageLoop
+    g_multiThreadedMessageLoop = bool(
+            applicationSettings["multi_threaded_message_loop"])
+    IF UNAME_SYSNAME != "Windows":
+        if g_multiThreadedMessageLoop:
+            raise Exception("Initialize() failed: the"
+                            " multi_threaded_message_loop setting is only"
+                            " supported on Windows")
     if not "single_process" in applicationSettings:
         applicationSettings["single_process"] = False
 
@@ -697,10 +754,16 @@ def Initialize(applicationSettings=None, commandLineSwitches=None, **kwargs):
     for key in applicationSettings:
         g_applicationSettings[key] = copy.deepcopy(applicationSettings[key])
 
+    InitPythonCallbackSettings()
+
     cdef CefSettings cefApplicationSettings
     # No sandboxing for the subprocesses
     cefApplicationSettings.no_sandbox = 1
     SetApplicationSettings(applicationSettings, &cefApplicationSettings)
+    if g_external_message_pump.get():
+        # InstallGLibMessagePump() was called
+        cefApplicationSettings.external_message_pump = 1
+        g_applicationSettings["external_message_pump"] = True
 
     if commandLineSwitches:
         # Make a copy as commandLineSwitches is a reference only
@@ -710,8 +773,15 @@ def Initialize(applicationSettings=None, commandLineSwitches=None, **kwargs):
             g_commandLineSwitches[key] = copy.deepcopy(
                     commandLineSwitches[key])
 
-    # External message pump
+    # External message pump. When a Python scheduler was set it is
+    # called instead of the native pump in OnScheduleMessagePumpWork.
+    if g_messagePumpScheduler is not None\
+            and not GetAppSetting("external_message_pump"):
+        raise Exception("Initialize() failed: a message pump scheduler was"
+                        " set, but the external_message_pump setting is not"
+                        " enabled")
     if GetAppSetting("external_message_pump")\
+            and g_messagePumpScheduler is None\
             and not g_external_message_pump.get():
         g_external_message_pump.Assign(MainMessageLoopExternalPump.Create())
 
@@ -746,6 +816,11 @@ def CreateBrowserSync(windowInfo=None,
         navigateUrl = kwargs["url"]
 
     Debug("CreateBrowserSync() called")
+    if g_multiThreadedMessageLoop and not IsThread(TID_UI):
+        # Block the application thread until the browser is created
+        # on the CEF UI thread.
+        return CallOnUIThread("CreateBrowserSync()", CreateBrowserSync,
+                              [windowInfo, browserSettings, navigateUrl])
     assert IsThread(TID_UI), (
             "cefpython.CreateBrowserSync() may only be called on the UI thread")
 
@@ -818,11 +893,19 @@ def CreateBrowserSync(windowInfo=None,
 
     cdef PyBrowser pyBrowser = GetPyBrowser(cefBrowser)
     pyBrowser.SetUserData("__outerWindowHandle", int(windowInfo.parentWindowHandle))
+    AddPyBrowserWindowHandle(pyBrowser.GetIdentifier(),
+                             windowInfo.parentWindowHandle)
 
     return pyBrowser
 
+cdef void CheckMessageLoopAllowed(py_string funcName) except *:
+    if g_multiThreadedMessageLoop:
+        raise Exception("%s failed: not allowed with the"
+                        " multi_threaded_message_loop setting" % funcName)
+
 def MessageLoop():
     Debug("MessageLoop()")
+    CheckMessageLoopAllowed("MessageLoop()")
     with nogil:
         CefRunMessageLoop()
 
@@ -838,57 +921,141 @@ def MessageLoopWork():
     # when calling from c++ to python.
 
     if not _MessageLoopWork_wasused:
+        CheckMessageLoopAllowed("MessageLoopWork()")
         global _MessageLoopWork_wasused
         _MessageLoopWork_wasused = True
 
+    # Work requested before this call is done now, requests made
+    # while doing work are recorded again.
+    global g_nextWorkTime
+    g_nextWorkTime = 0
+
     with nogil:
         CefDoMessageLoopWork()
 
+    ScheduleJavascriptCallbacksRelease()
+
+cdef void ScheduleNextWork(cef_types.int64 delay_ms) except *:
+    global g_nextWorkTime
+    cdef double workTime = time.time()
+    if delay_ms > 0:
+        workTime += delay_ms / 1000.0
+    if not g_nextWorkTime or workTime < g_nextWorkTime:
+        g_nextWorkTime = workTime
+
+def GetNextWorkDelay(int maxDelay=MAX_WORK_DELAY):
+    # Milliseconds after which MessageLoopWork() should be called, as
+    # requested by CEF through OnScheduleMessagePumpWork. Returns 0 when
+    # work is pending and maxDelay when nothing was requested.
+    if not g_nextWorkTime:
+        return maxDelay
+    cdef int delay = <int>ceil((g_nextWorkTime - time.time()) * 1000.0)
+    if delay < 0:
+        return 0
+    return min(delay, maxDelay)
+
+def SetMessagePumpScheduler(scheduler):
+    # The scheduler is called with the delay in milliseconds after which
+    # MessageLoopWork() should be called, on any thread. Must be set
+    # before Initialize() with the external_message_pump setting enabled.
+    # Pass None to remove it.
+    global g_messagePumpScheduler
+    if scheduler is not None and not callable(scheduler):
+        raise Exception("SetMessagePumpScheduler() failed: scheduler is"
+                        " not callable")
+    if scheduler is not None and g_external_message_pump.get():
+        raise Exception("SetMessagePumpScheduler() failed: the native"
+                        " message pump is installed")
+    g_messagePumpScheduler = scheduler
+
+def InstallGLibMessagePump():
+    # Wake the default GLib main context (the GTK main loop) when CEF
+    # schedules work, instead of calling MessageLoopWork() in a timer.
+    # Must be called before Initialize(), it enables the
+    # external_message_pump setting.
+    IF UNAME_SYSNAME == "Linux":
+        if g_messagePumpScheduler is not None:
+            raise Exception("InstallGLibMessagePump() failed: a message"
+                            " pump scheduler was set")
+        if not g_external_message_pump.get():
+            g_external_message_pump.Assign(
+                    MainMessageLoopExternalPump.Create())
+    ELSE:
+        raise Exception("InstallGLibMessagePump() failed: only available"
+                        " on Linux")
+
 def SingleMessageLoop():
     # @deprecated, use MessageLoopWork() instead
     MessageLoopWork()
 
 def QuitMessageLoop():
     Debug("QuitMessageLoop()")
+    CheckMessageLoopAllowed("QuitMessageLoop()")
     with nogil:
         CefQuitMessageLoop()
 
-def Shutdown():
+def _CloseBrowsersOnShutdown():
+    # Called on the UI thread. Browsers are removed from g_pyBrowsers
+    # by LifespanHandler_OnBeforeClose().
+    for browserId in list(g_pyBrowsers):
+        browser = GetPyBrowserById(browserId)
+        if browser:
+            browser.CloseBrowser(True)
+
+cdef list CloseBrowsersAndWait(double timeout):
+    # Close all browsers and wait until OnBeforeClose was called for
+    # each of them or the timeout (seconds) expires. Returns identifiers
+    # of browsers that failed to close.
+    global g_browsersClosedEvent
+    cdef double deadline = time.time() + timeout
+    cdef double remaining
+    cdef int delay
+    if g_multiThreadedMessageLoop:
+        # CEF runs its own message loop on the UI thread, there is no
+        # message loop work to do, RemovePyBrowser() sets the event.
+        g_browsersClosedEvent = threading.Event()
+        if not len(g_pyBrowsers):
+            g_browsersClosedEvent.set()
+        PostPythonTask(TID_UI, 0, _CloseBrowsersOnShutdown, [])
+        g_browsersClosedEvent.wait(timeout)
+        g_browsersClosedEvent = None
+    else:
+        # There might be a case when python error occured after creating
+        # browser, but before any message loop was run. In such case
+        # the renderer process won't be terminated unless we run some
+        # message loop work, so always pump until browsers are closed.
+        _CloseBrowsersOnShutdown()
+        while len(g_pyBrowsers):
+            MessageLoopWork()
+            remaining = deadline - time.time()
+            if not len(g_pyBrowsers) or remaining <= 0:
+                break
+            # Sleep only when CEF didn't request more work to be done.
+            delay = GetNextWorkDelay(SHUTDOWN_MAX_WORK_DELAY)
+            if delay:
+                time.sleep(min(delay / 1000.0, remaining))
+    return list(g_pyBrowsers)
+
+def Shutdown(double timeout=5.0):
+    global g_multiThreadedMessageLoop
+    global g_isShutdown
     if g_sharedRequestContext.get():
         # A similar release is done in RemovePyBrowser and CloseBrowser.
         # This one is probably redundant. Additional testing should be done.
         Debug("Shutdown: releasing shared request context")
         g_sharedRequestContext.Assign(NULL)
 
-    if len(g_pyBrowsers) and _MessageLoopWork_wasused:
-        # There might be a case when python error occured after creating
-        # browser, but before any message loop was run. In such case
-        # the renderer process won't be terminated unless we run some
-        # message loop work here first, try to close browser and free
-        # reference, and then run some message loop work again.
-        for i in range(10):
-            with nogil:
-                CefDoMessageLoopWork()
-            time.sleep(0.01)
-        browsers_list = []
-        for browserId in g_pyBrowsers:
-            # Cannot close browser here otherwise error:
-            # > dictionary changed size during iteration
-            browsers_list.append(browserId)
-        for browserId in browsers_list:
-            browser = GetPyBrowserById(browserId)
-            if browser:
-                browser.TryCloseBrowser()
-            RemovePyBrowser(browserId)
-        for i in range(10):
-            with nogil:
-                CefDoMessageLoopWork()
-            time.sleep(0.01)
-
+    cdef list failedBrowsers = []
     if len(g_pyBrowsers):
-        Error("Shutdown called, but there are still browser references alive")
+        failedBrowsers = CloseBrowsersAndWait(timeout)
+    if failedBrowsers:
+        Error("Shutdown called, but browsers failed to close in %s sec: %s"
+              % (timeout, failedBrowsers))
+        for browserId in failedBrowsers:
+            RemovePyBrowser(browserId)
 
     Debug("Shutdown()")
+    g_isShutdown = True
     with nogil:
         # Temporary fix for possible errors on shutdown. See this post:
         # https://magpcss.org/ceforum/viewtopic.php?p=30858#p30858
@@ -902,11 +1069,18 @@ def Shutdown():
             for i in range(10):
                 CefDoMessageLoopWork()
 
+    g_multiThreadedMessageLoop = False
+
     # Release external message pump, as in cefclient after Shutdown
     if g_external_message_pump.get():
         # Reset will set it to NULL
         g_external_message_pump.reset()
 
+    # Renderer processes are terminated, memory mappings can be released.
+    CloseSharedMemoryRegions()
+
+    return failedBrowsers
+
 
 def SetOsModalLoop(py_bool modalLoop):
     cdef cpp_bool cefModalLoop = bool(modalLoop)
@@ -0,0 +1,258 @@
+# Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+# Channels created with Browser.CreateChannel() push values from Python
+# to javascript subscribers. Channel names are sent to the Renderer
+# process along with javascript bindings, see JavascriptBindings.Rebind(),
+# and are available in javascript as window[name].subscribe(callback).
+#
+# Flow control: only one delivery per channel is in flight at a time.
+# Values are sent in the "ChannelDelivery" message [name, deliveryId,
+# [[value, key], ...]]. The Renderer process calls the subscribers and
+# acknowledges it with the "ChannelAck" message [name, deliveryId].
+# Values published in the meantime are pending and the policy decides
+# what to keep when the renderer lags:
+#   "latest" - keep only the latest value per key
+#   "queue"  - keep all values, up to maxQueueSize (oldest are dropped)
+#   "drop"   - drop values published while a delivery is in flight
+#              or while a value is held for a subscriber
+# When the renderer has no subscribers for the channel, e.g. the page's
+# javascript didn't subscribe yet, the ack says the values were not
+# delivered. They are put back to pending and held until the renderer
+# sends the "ChannelSubscribed" message [name].
+
+include "cefpython.pyx"
+
+cdef list CHANNEL_POLICIES = ["latest", "queue", "drop"]
+
+cdef class Channel:
+    cdef py_string name
+    cdef int browserId
+    cdef py_string policy
+    cdef int maxQueueSize
+    # OrderedDict for the "latest" policy, deque for the others.
+    cdef object pending
+    cdef int deliveryMaxId
+    # Zero when no delivery is in flight.
+    cdef int inFlightDeliveryId
+    # [[value, key], ...] of the delivery in flight.
+    cdef list inFlightValues
+    # Set when the renderer had no subscribers.
+    cdef py_bool waitingForSubscriber
+    cdef py_bool closed
+    cdef dict statistics
+
+    def __init__(self, int browserId, py_string name, py_string policy,
+                 int maxQueueSize):
+        self.name = name
+        self.browserId = browserId
+        self.policy = policy
+        self.maxQueueSize = maxQueueSize
+        if policy == "latest":
+            self.pending = collections.OrderedDict()
+        else:
+            self.pending = collections.deque()
+        self.deliveryMaxId = 0
+        self.inFlightDeliveryId = 0
+        self.inFlightValues = None
+        self.waitingForSubscriber = False
+        self.closed = False
+        self.statistics = {
+            "published": 0,
+            "delivered": 0,
+            "skipped": 0,
+            "deliveries": 0,
+        }
+
+    cpdef py_string GetName(self):
+        return self.name
+
+    cpdef py_string GetPolicy(self):
+        return self.policy
+
+    cpdef int GetPendingCount(self) except *:
+        return len(self.pending)
+
+    cpdef dict GetStatistics(self):
+        return dict(self.statistics)
+
+    cpdef py_bool IsClosed(self):
+        return self.closed
+
+    cpdef py_void Publish(self, object value, object key=None):
+        if self.closed:
+            raise Exception("Channel.Publish() failed: channel \"%s\" is"
+                            " closed" % self.name)
+        self.statistics["published"] += 1
+        if self.policy == "latest":
+            if key in self.pending:
+                # Stale intermediate value is never delivered.
+                del self.pending[key]
+                self.statistics["skipped"] += 1
+            self.pending[key] = value
+        elif self.policy == "queue":
+            if len(self.pending) >= self.maxQueueSize:
+                self.pending.popleft()
+                self.statistics["skipped"] += 1
+            self.pending.append((key, value))
+        else:
+            # While waiting for a subscriber only the value that was
+            # not delivered is kept.
+            if self.inFlightDeliveryId \
+                    or (self.waitingForSubscriber and self.pending) \
+                    or len(self.pending) >= self.maxQueueSize:
+                self.statistics["skipped"] += 1
+                return
+            self.pending.append((key, value))
+        self.Deliver()
+
+    cpdef py_void Close(self):
+        cdef PyBrowser pyBrowser
+        if self.closed:
+            return
+        self.closed = True
+        self.pending.clear()
+        pyBrowser = GetPyBrowserById(self.browserId)
+        if pyBrowser and pyBrowser.channels.get(self.name) is self:
+            del pyBrowser.channels[self.name]
+
+    cdef void Deliver(self) except *:
+        if self.inFlightDeliveryId or self.waitingForSubscriber \
+                or not self.pending or self.closed:
+            return
+        cdef PyBrowser pyBrowser = GetPyBrowserById(self.browserId)
+        if not pyBrowser:
+            return
+        cdef list values
+        if self.policy == "latest":
+            values = [[value, key] for key, value in self.pending.items()]
+        else:
+            values = [[value, key] for key, value in self.pending]
+        self.pending.clear()
+        self.deliveryMaxId += 1
+        self.inFlightDeliveryId = self.deliveryMaxId
+        self.inFlightValues = values
+        self.statistics["delivered"] += len(values)
+        self.statistics["deliveries"] += 1
+        pyBrowser.SendProcessMessage(cef_types.PID_RENDERER, 0,
+                                     "ChannelDelivery",
+                                     [self.name, self.inFlightDeliveryId,
+                                      values])
+
+    cdef void OnAck(self, int deliveryId, py_bool delivered) except *:
+        if deliveryId != self.inFlightDeliveryId:
+            # Ack for a delivery sent to a previous document.
+            return
+        cdef list values = self.inFlightValues
+        self.inFlightDeliveryId = 0
+        self.inFlightValues = None
+        if not delivered:
+            # No subscribers yet, hold the values until there are.
+            self.statistics["delivered"] -= len(values)
+            self.statistics["deliveries"] -= 1
+            self.Requeue(values)
+            self.waitingForSubscriber = True
+            return
+        self.Deliver()
+
+    cdef void OnSubscribed(self) except *:
+        self.waitingForSubscriber = False
+        self.Deliver()
+
+    cdef void Requeue(self, list values) except *:
+        # Put values back in front of the pending values published in
+        # the meantime, applying the policy.
+        cdef object pending
+        if self.closed:
+            return
+        if self.policy == "latest":
+            # Newer values for the same key win.
+            pending = collections.OrderedDict()
+            for value, key in values:
+                if key in self.pending:
+                    self.statistics["skipped"] += 1
+                else:
+                    pending[key] = value
+            pending.update(self.pending)
+            self.pending = pending
+        else:
+            for value, key in reversed(values):
+                self.pending.appendleft((key, value))
+            if self.policy == "queue":
+                while len(self.pending) > self.maxQueueSize:
+                    self.pending.popleft()
+                    self.statistics["skipped"] += 1
+
+    cdef void Reset(self) except *:
+        # Called when a new document is loaded in the main frame, an ack
+        # for the delivery in flight may never arrive. The renderer
+        # rejects the next delivery until the page subscribes.
+        self.inFlightDeliveryId = 0
+        self.inFlightValues = None
+        self.waitingForSubscriber = False
+        self.Deliver()
+
+cdef Channel CreateChannelForBrowser(PyBrowser pyBrowser, py_string name,
+                                     py_string policy, int maxQueueSize):
+    if policy not in CHANNEL_POLICIES:
+        raise Exception("Browser.CreateChannel() failed: invalid policy"
+                        " \"%s\", allowed values: %s"
+                        % (policy, ", ".join(CHANNEL_POLICIES)))
+    if maxQueueSize < 1:
+        raise Exception("Browser.CreateChannel() failed: maxQueueSize must"
+                        " be greater than zero")
+    if name in pyBrowser.channels:
+        raise Exception("Browser.CreateChannel() failed: channel \"%s\""
+                        " already exists" % name)
+    cdef Channel channel = Channel(pyBrowser.GetIdentifier(), name, policy,
+                                   maxQueueSize)
+    pyBrowser.channels[name] = channel
+    # Channel names are sent to the Renderer process along with
+    # javascript bindings.
+    if pyBrowser.GetJavascriptBindings():
+        pyBrowser.GetJavascriptBindings().InvalidateBrowser(
+                pyBrowser.GetIdentifier())
+        pyBrowser.GetJavascriptBindings().BindBrowser(pyBrowser)
+    else:
+        pyBrowser.SetJavascriptBindings(JavascriptBindings())
+    return channel
+
+cdef void ResetChannelsForBrowser(PyBrowser pyBrowser) except *:
+    cdef Channel channel
+    for channel in list(pyBrowser.channels.values()):
+        channel.Reset()
+
+cdef public void Channel_OnAck(
+        CefRefPtr[CefBrowser] cefBrowser,
+        const CefString& cefChannelName,
+        int deliveryId,
+        cpp_bool delivered
+        ) except * with gil:
+    cdef PyBrowser pyBrowser
+    cdef Channel channel
+    try:
+        pyBrowser = GetPyBrowser(cefBrowser)
+        if not pyBrowser:
+            return
+        channel = pyBrowser.channels.get(CefToPyString(cefChannelName))
+        if channel:
+            channel.OnAck(deliveryId, delivered)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void Channel_OnSubscribed(
+        CefRefPtr[CefBrowser] cefBrowser,
+        const CefString& cefChannelName
+        ) except * with gil:
+    cdef PyBrowser pyBrowser
+    cdef Channel channel
+    try:
+        pyBrowser = GetPyBrowser(cefBrowser)
+        if not pyBrowser:
+            return
+        channel = pyBrowser.channels.get(CefToPyString(cefChannelName))
+        if channel:
+            channel.OnSubscribed()
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
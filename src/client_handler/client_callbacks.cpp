@@ -0,0 +1,32 @@
+// Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+#include "client_callbacks.h"
+#include <map>
+#include "include/base/cef_lock.h"
+
+// Written on the UI thread, read on the UI and IO threads.
+base::Lock g_clientCallbackMasksLock;
+std::map<int, uint32_t> g_clientCallbackMasks;
+
+void SetClientCallbackMask(int browserId, uint32_t mask) {
+    base::AutoLock lock_scope(g_clientCallbackMasksLock);
+    g_clientCallbackMasks[browserId] = mask;
+}
+
+void RemoveClientCallbackMask(int browserId) {
+    base::AutoLock lock_scope(g_clientCallbackMasksLock);
+    g_clientCallbackMasks.erase(browserId);
+}
+
+bool HasClientCallback(CefRefPtr<CefBrowser> browser, uint32_t flag) {
+    if (!browser.get()) {
+        return true;
+    }
+    base::AutoLock lock_scope(g_clientCallbackMasksLock);
+    std::map<int, uint32_t>::const_iterator it = g_clientCallbackMasks.find(
+            browser->GetIdentifier());
+    if (it == g_clientCallbackMasks.end()) {
+        return true;
+    }
+    return (it->second & flag) != 0;
+}
@@ -0,0 +1,45 @@
+// Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+// Bitmask of client callbacks that are set in Python for each browser.
+// Handlers of frequent events check the mask and return default values
+// without acquiring the GIL when no callback is set. The mask is updated
+// from Python in PyBrowser.UpdateClientCallbackMask(). Browsers without
+// a mask (not yet known to Python) always call into Python.
+
+#pragma once
+
+#if defined(_WIN32)
+#include "../windows/stdint.h"
+#endif
+
+#include "include/cef_browser.h"
+
+enum ClientCallbackFlag {
+    // DisplayHandler
+    CCB_OnAddressChange = 1 << 0,
+    CCB_OnTitleChange = 1 << 1,
+    CCB_OnTooltip = 1 << 2,
+    CCB_OnStatusMessage = 1 << 3,
+    CCB_OnConsoleMessage = 1 << 4,
+    // KeyboardHandler
+    CCB_OnPreKeyEvent = 1 << 5,
+    CCB_OnKeyEvent = 1 << 6,
+    // LoadHandler
+    CCB_OnLoadingStateChange = 1 << 7,
+    CCB_OnLoadStart = 1 << 8,
+    CCB_OnLoadEnd = 1 << 9,
+    CCB_OnLoadError = 1 << 10,
+    // RenderHandler
+    CCB_OnPaint = 1 << 11,
+    CCB_OnCursorChange = 1 << 12,
+    CCB_OnScrollOffsetChanged = 1 << 13,
+    // RequestHandler
+    CCB_OnBeforeBrowse = 1 << 14,
+    CCB_OnBeforeResourceLoad = 1 << 15,
+    CCB_GetResourceHandler = 1 << 16,
+    CCB_OnResourceRedirect = 1 << 17
+};
+
+void SetClientCallbackMask(int browserId, uint32_t mask);
+void RemoveClientCallbackMask(int browserId);
+bool HasClientCallback(CefRefPtr<CefBrowser> browser, uint32_t flag);
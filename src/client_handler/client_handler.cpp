@@ -65,6 +65,20 @@ bool ClientHandler::OnProcessMessageReceived(
     } else if (messageName == "V8FunctionHandler::Execute") {
         CefRefPtr<CefListValue> arguments = message->GetArgumentList();
         if (arguments->GetSize() == 3
+                    // frameId
+                    && arguments->GetType(0) == VTYPE_INT
+                    // functionId
+                    && arguments->GetType(1) == VTYPE_INT
+                    // functionArguments
+                    && arguments->GetType(2) == VTYPE_LIST) {
+            int64 frameId = arguments->GetInt(0);
+            int functionId = arguments->GetInt(1);
+            CefRefPtr<CefListValue> functionArguments = arguments->GetList(2);
+            CefRefPtr<CefFrame> frame = browser->GetFrame(frameId);
+            V8FunctionHandler_ExecuteById(browser, frame, functionId,
+                                          functionArguments);
+            return true;
+        } else if (arguments->GetSize() == 3
                     // frameId
                     && arguments->GetType(0) == VTYPE_INT
                     // functionName
@@ -97,15 +111,115 @@ bool ClientHandler::OnProcessMessageReceived(
                      ", messageName = ExecutePythonCallback");
             return false;
         }
+    } else if (messageName == "EvaluateJavascriptResult") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 3
+                && arguments->GetType(0) == VTYPE_INT // evaluationId
+                && arguments->GetType(1) == VTYPE_BOOL) { // success
+            int evaluationId = arguments->GetInt(0);
+            if (arguments->GetBool(1)
+                    && arguments->GetType(2) == VTYPE_LIST) {
+                JavascriptEvaluation_OnResult(browser, evaluationId,
+                                              arguments->GetList(2));
+            } else {
+                JavascriptEvaluation_OnError(browser, evaluationId,
+                                             arguments->GetString(2));
+            }
+            return true;
+        } else {
+            DebugLog("Browser: OnProcessMessageReceived(): invalid arguments" \
+                     ", messageName = EvaluateJavascriptResult");
+            return false;
+        }
+    } else if (messageName == "ChannelAck") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 3
+                && arguments->GetType(0) == VTYPE_STRING // channelName
+                && arguments->GetType(1) == VTYPE_INT // deliveryId
+                && arguments->GetType(2) == VTYPE_BOOL) { // delivered
+            Channel_OnAck(browser, arguments->GetString(0),
+                          arguments->GetInt(1), arguments->GetBool(2));
+            return true;
+        } else {
+            DebugLog("Browser: OnProcessMessageReceived(): invalid arguments" \
+                     ", messageName = ChannelAck");
+            return false;
+        }
+    } else if (messageName == "ChannelSubscribed") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 1
+                && arguments->GetType(0) == VTYPE_STRING) { // channelName
+            Channel_OnSubscribed(browser, arguments->GetString(0));
+            return true;
+        } else {
+            DebugLog("Browser: OnProcessMessageReceived(): invalid arguments" \
+                     ", messageName = ChannelSubscribed");
+            return false;
+        }
+    } else if (messageName == "CreateSharedMemory") {
+        SharedMemory_OnCreate(browser);
+        return true;
+    } else if (messageName == "SharedMemoryAttached") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 1
+                && arguments->GetType(0) == VTYPE_INT) { // regionId
+            SharedMemory_OnAttached(browser, arguments->GetInt(0));
+            return true;
+        } else {
+            DebugLog("Browser: OnProcessMessageReceived(): invalid arguments" \
+                     ", messageName = SharedMemoryAttached");
+            return false;
+        }
+    } else if (messageName == "StreamRead") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 1
+                && arguments->GetType(0) == VTYPE_INT) { // streamId
+            Stream_OnRead(browser, arguments->GetInt(0));
+            return true;
+        } else {
+            DebugLog("Browser: OnProcessMessageReceived(): invalid arguments" \
+                     ", messageName = StreamRead");
+            return false;
+        }
+    } else if (messageName == "StreamWrite") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 3
+                && arguments->GetType(0) == VTYPE_INT // streamId
+                && arguments->GetType(1) == VTYPE_STRING // chunk
+                && arguments->GetType(2) == VTYPE_BOOL) { // done
+            Stream_OnWrite(browser, arguments->GetInt(0),
+                           arguments->GetString(1), arguments->GetBool(2));
+            return true;
+        } else {
+            DebugLog("Browser: OnProcessMessageReceived(): invalid arguments" \
+                     ", messageName = StreamWrite");
+            return false;
+        }
+    } else if (messageName == "StreamCancel") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 2
+                && arguments->GetType(0) == VTYPE_INT // streamId
+                && arguments->GetType(1) == VTYPE_STRING) { // reason
+            Stream_OnCancel(browser, arguments->GetInt(0),
+                            arguments->GetString(1));
+            return true;
+        } else {
+            DebugLog("Browser: OnProcessMessageReceived(): invalid arguments" \
+                     ", messageName = StreamCancel");
+            return false;
+        }
     } else if (messageName == "RemovePythonCallbacksForFrame") {
         CefRefPtr<CefListValue> arguments = message->GetArgumentList();
-        if (arguments->GetSize() == 1 && arguments->GetType(0) == VTYPE_INT) {
-            int frameId = arguments->GetInt(0);
-            RemovePythonCallbacksForFrame(frameId);
+        int64 frameId = 0;
+        if (arguments->GetSize() == 1
+                && arguments->GetType(0) == VTYPE_BINARY
+                && arguments->GetBinary(0)->GetSize() == sizeof(frameId)) {
+            arguments->GetBinary(0)->GetData(&frameId, sizeof(frameId), 0);
+            RemovePythonCallbacksForFrame(browser, frameId);
             return true;
         } else {
             DebugLog("Browser: OnProcessMessageReceived(): invalid arguments" \
-                     ", messageName = ExecutePythonCallback");
+                     ", messageName = RemovePythonCallbacksForFrame");
             return false;
         }
     }
@@ -1,6 +1,7 @@
 // Copyright (c) 2016 CEF Python. See the Authors and License files.
 
 #include "display_handler.h"
+#include "client_callbacks.h"
 
 
 void DisplayHandler::OnAddressChange(CefRefPtr<CefBrowser> browser,
@@ -8,6 +9,9 @@ void DisplayHandler::OnAddressChange(CefRefPtr<CefBrowser> browser,
                                     const CefString& url)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnAddressChange)) {
+        return;
+    }
     DisplayHandler_OnAddressChange(browser, frame, url);
 }
 
@@ -16,6 +20,9 @@ void DisplayHandler::OnTitleChange(CefRefPtr<CefBrowser> browser,
                                   const CefString& title)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnTitleChange)) {
+        return;
+    }
     DisplayHandler_OnTitleChange(browser, title);
 }
 
@@ -24,6 +31,9 @@ bool DisplayHandler::OnTooltip(CefRefPtr<CefBrowser> browser,
                               CefString& text)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnTooltip)) {
+        return false;
+    }
     return DisplayHandler_OnTooltip(browser, text);
 }
 
@@ -32,6 +42,9 @@ void DisplayHandler::OnStatusMessage(CefRefPtr<CefBrowser> browser,
                                     const CefString& value)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnStatusMessage)) {
+        return;
+    }
     DisplayHandler_OnStatusMessage(browser, value);
 }
 
@@ -42,5 +55,8 @@ bool DisplayHandler::OnConsoleMessage(CefRefPtr<CefBrowser> browser,
                                      int line)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnConsoleMessage)) {
+        return false;
+    }
     return DisplayHandler_OnConsoleMessage(browser, message, source, line);
 }
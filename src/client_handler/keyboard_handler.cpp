@@ -1,6 +1,7 @@
 // Copyright (c) 2016 CEF Python. See the Authors and License files.
 
 #include "keyboard_handler.h"
+#include "client_callbacks.h"
 
 
 bool KeyboardHandler::OnPreKeyEvent(CefRefPtr<CefBrowser> browser,
@@ -9,6 +10,9 @@ bool KeyboardHandler::OnPreKeyEvent(CefRefPtr<CefBrowser> browser,
                                     bool* is_keyboard_shortcut)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnPreKeyEvent)) {
+        return false;
+    }
     return KeyboardHandler_OnPreKeyEvent(browser, event, os_event,
                                          is_keyboard_shortcut);
 }
@@ -19,5 +23,8 @@ bool KeyboardHandler:: OnKeyEvent(CefRefPtr<CefBrowser> browser,
                                   CefEventHandle os_event)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnKeyEvent)) {
+        return false;
+    }
     return KeyboardHandler_OnKeyEvent(browser, event, os_event);
 }
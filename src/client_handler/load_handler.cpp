@@ -1,6 +1,7 @@
 // Copyright (c) 2016 CEF Python. See the Authors and License files.
 
 #include "load_handler.h"
+#include "client_callbacks.h"
 
 
 void LoadHandler::OnLoadingStateChange(CefRefPtr<CefBrowser> browser,
@@ -9,6 +10,9 @@ void LoadHandler::OnLoadingStateChange(CefRefPtr<CefBrowser> browser,
                                        bool canGoForward)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnLoadingStateChange)) {
+        return;
+    }
     LoadHandler_OnLoadingStateChange(browser, isLoading, canGoBack,
                                      canGoForward);
 }
@@ -19,6 +23,9 @@ void LoadHandler::OnLoadStart(CefRefPtr<CefBrowser> browser,
                               TransitionType transition_type)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnLoadStart)) {
+        return;
+    }
     LoadHandler_OnLoadStart(browser, frame);
 }
 
@@ -28,6 +35,9 @@ void LoadHandler::OnLoadEnd(CefRefPtr<CefBrowser> browser,
                             int httpStatusCode)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnLoadEnd)) {
+        return;
+    }
     LoadHandler_OnLoadEnd(browser, frame, httpStatusCode);
 }
 
@@ -39,5 +49,8 @@ void LoadHandler::OnLoadError(CefRefPtr<CefBrowser> browser,
                               const CefString& failedUrl)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnLoadError)) {
+        return;
+    }
     LoadHandler_OnLoadError(browser, frame, errorCode, errorText, failedUrl);
 }
@@ -1,6 +1,7 @@
 // Copyright (c) 2016 CEF Python. See the Authors and License files.
 
 #include "render_handler.h"
+#include "client_callbacks.h"
 
 
 bool RenderHandler::GetRootScreenRect(CefRefPtr<CefBrowser> browser,
@@ -62,6 +63,9 @@ void RenderHandler::OnPaint(CefRefPtr<CefBrowser> browser,
                             int width, int height)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnPaint)) {
+        return;
+    }
     RenderHandler_OnPaint(browser, type, const_cast<RectList&>(dirtyRects),
                           buffer, width, height);
 }
@@ -73,6 +77,9 @@ void RenderHandler::OnCursorChange(CefRefPtr<CefBrowser> browser,
                                    const CefCursorInfo& custom_cursor_info)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnCursorChange)) {
+        return;
+    }
     RenderHandler_OnCursorChange(browser, cursor);
 }
 
@@ -82,6 +89,9 @@ void RenderHandler::OnScrollOffsetChanged(CefRefPtr<CefBrowser> browser,
                                           double y)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnScrollOffsetChanged)) {
+        return;
+    }
     RenderHandler_OnScrollOffsetChanged(browser);
 }
 
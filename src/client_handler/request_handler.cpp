@@ -1,6 +1,7 @@
 // Copyright (c) 2016 CEF Python. See the Authors and License files.
 
 #include "request_handler.h"
+#include "client_callbacks.h"
 #include "common/DebugLog.h"
 
 
@@ -10,6 +11,9 @@ bool RequestHandler::OnBeforeBrowse(CefRefPtr<CefBrowser> browser,
                                     bool is_redirect)
 {
     REQUIRE_UI_THREAD();
+    if (!HasClientCallback(browser, CCB_OnBeforeBrowse)) {
+        return false;
+    }
     return RequestHandler_OnBeforeBrowse(browser, frame, request, is_redirect);
 }
 
@@ -21,6 +25,9 @@ ReturnValue RequestHandler::OnBeforeResourceLoad(
                                         CefRefPtr<CefRequestCallback> callback)
 {
     REQUIRE_IO_THREAD();
+    if (!HasClientCallback(browser, CCB_OnBeforeResourceLoad)) {
+        return RV_CONTINUE;
+    }
     bool retval = RequestHandler_OnBeforeResourceLoad(browser, frame, request);
     if (retval) {
         return RV_CANCEL;
@@ -36,6 +43,9 @@ CefRefPtr<CefResourceHandler> RequestHandler::GetResourceHandler(
                                                 CefRefPtr<CefRequest> request)
 {
     REQUIRE_IO_THREAD();
+    if (!HasClientCallback(browser, CCB_GetResourceHandler)) {
+        return NULL;
+    }
     return RequestHandler_GetResourceHandler(browser, frame, request);
 }
 
@@ -47,6 +57,9 @@ void RequestHandler::OnResourceRedirect(CefRefPtr<CefBrowser> browser,
                                         CefString& new_url)
 {
     REQUIRE_IO_THREAD();
+    if (!HasClientCallback(browser, CCB_OnResourceRedirect)) {
+        return;
+    }
     RequestHandler_OnResourceRedirect(browser, frame, request->GetURL(),
                                       new_url, request, response);
 }
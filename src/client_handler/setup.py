@@ -52,7 +52,7 @@ client_handler_src = [
     'task.cpp', 'x11.cpp', 'context_menu_handler.cpp', 'display_handler.cpp',
     'download_handler.cpp', 'focus_handler.cpp', 'js_dialog_handler.cpp',
     'keyboard_handler.cpp', 'lifespan_handler.cpp', 'load_handler.cpp',
-    'render_handler.cpp', 'request_handler.cpp'
+    'render_handler.cpp', 'request_handler.cpp', 'client_callbacks.cpp'
 ]
 
 if OS_POSTFIX.startswith('mac'):
@@ -7,6 +7,7 @@
 #include "include/cef_task.h"
 
 void PostTaskWrapper(int threadId, int taskId);
+void PostDelayedTaskWrapper(int threadId, int taskId, int64 delay_ms);
 
 CefRefPtr<CefTask> CreateTask_SetCookie(
         CefCookieManager* obj,
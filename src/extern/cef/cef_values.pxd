@@ -19,6 +19,10 @@ cdef extern from "include/cef_values.h":
         size_t GetSize()
         size_t GetData(void* buffer_, size_t buffer_size, size_t data_offset)
         
+    cdef cppclass CefValue:
+        cpp_bool IsValid()
+        cef_value_type_t GetType()
+
     cdef CefRefPtr[CefDictionaryValue] CefDictionaryValue_Create \
         "CefDictionaryValue::Create"()
 
@@ -40,6 +44,8 @@ cdef extern from "include/cef_values.h":
         CefRefPtr[CefBinaryValue] GetBinary(const CefString& key)
         CefRefPtr[CefDictionaryValue] GetDictionary(const CefString& key)
         CefRefPtr[CefListValue] GetList(const CefString& key)
+        CefRefPtr[CefValue] GetValue(const CefString& key)
+        cpp_bool SetValue(const CefString& key, CefRefPtr[CefValue] value)
         cpp_bool SetNull(const CefString& key)
         cpp_bool SetBool(const CefString& key, cpp_bool value)
         cpp_bool SetInt(const CefString& key, int value)
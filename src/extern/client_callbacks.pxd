@@ -0,0 +1,33 @@
+# Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+from libc.stdint cimport uint32_t
+from cef_ptr cimport CefRefPtr
+from cef_browser cimport CefBrowser
+# noinspection PyUnresolvedReferences
+from libcpp cimport bool as cpp_bool
+
+cdef extern from "client_handler/client_callbacks.h":
+
+    ctypedef enum ClientCallbackFlag:
+        CCB_OnAddressChange
+        CCB_OnTitleChange
+        CCB_OnTooltip
+        CCB_OnStatusMessage
+        CCB_OnConsoleMessage
+        CCB_OnPreKeyEvent
+        CCB_OnKeyEvent
+        CCB_OnLoadingStateChange
+        CCB_OnLoadStart
+        CCB_OnLoadEnd
+        CCB_OnLoadError
+        CCB_OnPaint
+        CCB_OnCursorChange
+        CCB_OnScrollOffsetChanged
+        CCB_OnBeforeBrowse
+        CCB_OnBeforeResourceLoad
+        CCB_GetResourceHandler
+        CCB_OnResourceRedirect
+
+    void SetClientCallbackMask(int browserId, uint32_t mask)
+    void RemoveClientCallbackMask(int browserId)
+    cpp_bool HasClientCallback(CefRefPtr[CefBrowser] browser, uint32_t flag)
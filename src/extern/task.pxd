@@ -4,6 +4,8 @@
 
 from cef_ptr cimport CefRefPtr
 # noinspection PyUnresolvedReferences
+cimport cef_types
+# noinspection PyUnresolvedReferences
 from cef_task cimport CefTask
 from cef_string cimport CefString
 from cef_cookie cimport CefCookie, CefCookieManager
@@ -16,6 +18,8 @@ from libcpp cimport bool as cpp_bool
 cdef extern from "client_handler/task.h":
 
     void PostTaskWrapper(int threadId, int taskId) nogil
+    void PostDelayedTaskWrapper(int threadId, int taskId,
+                                cef_types.int64 delay_ms) nogil
 
     cdef CefRefPtr[CefTask] CreateTask_SetCookie(
             CefCookieManager* obj,
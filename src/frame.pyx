@@ -4,15 +4,42 @@
 
 include "cefpython.pyx"
 
+# browserId => {frameId: PyFrame}. Frames are removed in
+# V8ContextHandler_OnContextReleased() and when the browser is closed.
 cdef dict g_pyFrames = {}
 
-cdef object GetUniqueFrameId(int browserId, object frameId):
-    return str(browserId) +"#"+ str(frameId)
+# Function paths like "object.method" that can be resolved on the window
+# object in the Renderer process without compiling any javascript code.
+cdef object g_functionPathRegex = re.compile(
+        r"^[A-Za-z_$][A-Za-z0-9_$]*(\.[A-Za-z_$][A-Za-z0-9_$]*)*$")
+
+cdef cpp_bool IsNativeFunctionArgument(object value,
+                                       int nestingLevel=0) except *:
+    # Whether the value is sent with the same semantics as json.dumps()
+    # in the ExecuteJavascript() path. Integers outside of the int32
+    # range would become strings and python functions would become
+    # callbacks, which are not supported in Frame.ExecuteFunction().
+    if nestingLevel > 8:
+        return False
+    cdef type valueType = type(value)
+    if valueType == int or valueType == long:
+        return -2147483648 <= value <= 2147483647
+    if valueType == list or valueType == tuple:
+        for item in value:
+            if not IsNativeFunctionArgument(item, nestingLevel + 1):
+                return False
+    elif valueType == dict:
+        for item in value.values():
+            if not IsNativeFunctionArgument(item, nestingLevel + 1):
+                return False
+    elif IsFunctionOrMethod(valueType):
+        return False
+    return True
 
 cdef PyFrame GetPyFrameById(int browserId, object frameId):
-    cdef object uniqueFrameId = GetUniqueFrameId(browserId, frameId)
-    if uniqueFrameId in g_pyFrames:
-        return g_pyFrames[uniqueFrameId]
+    cdef dict browserFrames = g_pyFrames.get(browserId)
+    if browserFrames:
+        return browserFrames.get(frameId)
     return None
 
 cdef PyFrame GetPyFrame(CefRefPtr[CefFrame] cefFrame):
@@ -25,42 +52,37 @@ cdef PyFrame GetPyFrame(CefRefPtr[CefFrame] cefFrame):
     cdef object frameId = cefFrame.get().GetIdentifier()
     cdef int browserId = cefFrame.get().GetBrowser().get().GetIdentifier()
     assert (frameId and browserId), "frameId or browserId empty"
-    cdef object uniqueFrameId = GetUniqueFrameId(browserId, frameId)
-    if uniqueFrameId in g_pyFrames:
-        return g_pyFrames[uniqueFrameId]
-    for uFid, pyFrame in g_pyFrames.items():
-        if not pyFrame.cefFrame.get():
-            Debug("GetPyFrame(): removing an empty CefFrame reference, " \
-                    "uniqueFrameId = %s" % uniqueFrameId)
-            del g_pyFrames[uFid]
+    cdef dict browserFrames = g_pyFrames.get(browserId)
+    if browserFrames is None:
+        browserFrames = {}
+        g_pyFrames[browserId] = browserFrames
+    else:
+        pyFrame = browserFrames.get(frameId)
+        if pyFrame is not None:
+            return pyFrame
     # Debug("GetPyFrame(): creating new PyFrame, frameId=%s" % frameId)
     pyFrame = PyFrame(browserId, frameId)
     pyFrame.cefFrame = cefFrame
-    g_pyFrames[uniqueFrameId] = pyFrame
+    browserFrames[frameId] = pyFrame
     return pyFrame
 
 cdef void RemovePyFrame(int browserId, object frameId) except *:
     # Called from V8ContextHandler_OnContextReleased().
     global g_pyFrames
-    cdef object uniqueFrameId = GetUniqueFrameId(browserId, frameId)
-    if uniqueFrameId in g_pyFrames:
-        Debug("del g_pyFrames[%s]" % uniqueFrameId)
-        del g_pyFrames[uniqueFrameId]
+    cdef dict browserFrames = g_pyFrames.get(browserId)
+    if browserFrames and frameId in browserFrames:
+        Debug("RemovePyFrame(): browserId = %s, frameId = %s" \
+                % (browserId, frameId))
+        del browserFrames[frameId]
     else:
-        Debug("RemovePyFrame() FAILED: uniqueFrameId = %s" % uniqueFrameId)
+        Debug("RemovePyFrame() FAILED: browserId = %s, frameId = %s" \
+                % (browserId, frameId))
 
 cdef void RemovePyFramesForBrowser(int browserId) except *:
     # Called from LifespanHandler_BeforeClose().
-    cdef list toRemove = []
-    cdef object uniqueFrameId
-    cdef PyFrame pyFrame
     global g_pyFrames
-    for uniqueFrameId, pyFrame in g_pyFrames.iteritems():
-        if pyFrame.GetBrowserIdentifier() == browserId:
-            toRemove.append(uniqueFrameId)
-    for uniqueFrameId in toRemove:
-        Debug("del g_pyFrames[%s]" % uniqueFrameId)
-        del g_pyFrames[uniqueFrameId]
+    if g_pyFrames.pop(browserId, None) is not None:
+        Debug("RemovePyFramesForBrowser(): browserId = %s" % browserId)
 
 cdef class PyFrame:
     cdef CefRefPtr[CefFrame] cefFrame
@@ -99,8 +121,26 @@ cdef class PyFrame:
         self.GetCefFrame().get().Delete()
 
     def ExecuteFunction(self, funcName, *args):
-        # No need to enter V8 context as we're calling javascript
-        # asynchronously using ExecuteJavascript() function.
+        cdef PyBrowser pyBrowser
+        if g_functionPathRegex.match(funcName) \
+                and IsNativeFunctionArgument(args):
+            # The function is resolved on the window object and called
+            # natively in the Renderer process, see
+            # CefPythonApp::ExecuteFunction(). Arguments are sent as
+            # a CefListValue, no javascript code needs to be compiled.
+            pyBrowser = self.GetBrowser()
+            if not pyBrowser:
+                raise Exception("Frame.ExecuteFunction() failed: browser"
+                                " not found")
+            pyBrowser.SendProcessMessage(
+                    cef_types.PID_RENDERER,
+                    self.GetIdentifier(),
+                    "ExecuteFunction",
+                    [self.GetIdentifier(), funcName, list(args)])
+            return
+        # Any other javascript syntax in funcName, eg. an anonymous
+        # function. No need to enter V8 context as we're calling
+        # javascript asynchronously using ExecuteJavascript() function.
         code = funcName+"("
         for i in range(0, len(args)):
             if i != 0:
@@ -109,11 +149,38 @@ cdef class PyFrame:
         code += ")"
         self.ExecuteJavascript(code)
 
+    cpdef object EvaluateJavascript(self, py_string jsCode,
+                                    object timeout=None):
+        # Returns a concurrent.futures.Future, see javascript_evaluation.pyx.
+        return EvaluateJavascriptInFrame(self, jsCode, timeout)
+
     cpdef py_void ExecuteJavascript(self, py_string jsCode,
             py_string scriptUrl="", int startLine=0):
+        # Messages queued earlier by ExecuteFunction() and others must
+        # reach the renderer first.
+        FlushPendingProcessMessages(self.GetBrowserIdentifier())
         self.GetCefFrame().get().ExecuteJavaScript(PyToCefStringValue(jsCode),
                 PyToCefStringValue(scriptUrl), startLine)
 
+    cpdef object SendStream(self, py_string funcName, object data,
+                            int chunkSize=65536):
+        # See stream.pyx. Returns a concurrent.futures.Future.
+        # Bytes are decoded in OpenStreamInFrame().
+        if not isinstance(data, (bytes, basestring)):
+            raise Exception("Frame.SendStream() failed: data must be"
+                            " a string")
+        return OpenStreamInFrame(self, "Frame.SendStream()", funcName,
+                                 data, None, chunkSize).future
+
+    cpdef object ReceiveStream(self, py_string funcName, object callback,
+                               int chunkSize=65536):
+        # See stream.pyx. Returns a concurrent.futures.Future.
+        if not callable(callback):
+            raise Exception("Frame.ReceiveStream() failed: callback is"
+                            " not callable")
+        return OpenStreamInFrame(self, "Frame.ReceiveStream()", funcName,
+                                 None, callback, chunkSize).future
+
     cpdef object GetIdentifier(self):
         # It is better to save browser and frame identifiers during
         # browser instantiation. When freeing PyBrowser and PyFrame
@@ -9,7 +9,8 @@ cdef public void BrowserProcessHandler_OnRenderProcessThreadCreated(
         ) except * with gil:
     try:
         # Keys 0 and 1 are already set in C++ code - to pass debug options.
-        pass
+        # Key 2 is set when shared memory is enabled.
+        SetSharedMemoryExtraInfo(extra_info)
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -15,10 +15,10 @@ cdef public void DisplayHandler_OnAddressChange(
     cdef object callback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
-        pyUrl = CefToPyString(cefUrl)
         callback = pyBrowser.GetClientCallback("OnAddressChange")
         if callback:
+            pyFrame = GetPyFrame(cefFrame)
+            pyUrl = CefToPyString(cefUrl)
             callback(pyBrowser, pyFrame, pyUrl)
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
@@ -33,9 +33,9 @@ cdef public void DisplayHandler_OnTitleChange(
     cdef object callback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyTitle = CefToPyString(cefTitle)
         callback = pyBrowser.GetClientCallback("OnTitleChange")
         if callback:
+            pyTitle = CefToPyString(cefTitle)
             callback(pyBrowser, pyTitle)
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
@@ -52,10 +52,10 @@ cdef public cpp_bool DisplayHandler_OnTooltip(
     cdef py_bool returnValue
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyText = CefToPyString(cefText)
-        pyTextOut = [pyText]
         callback = pyBrowser.GetClientCallback("OnTooltip")
         if callback:
+            pyText = CefToPyString(cefText)
+            pyTextOut = [pyText]
             returnValue = callback(pyBrowser, pyTextOut)
             # pyText and pyTextOut[0] are not the same strings!
             PyToCefString(pyTextOut[0], cefText)
@@ -74,9 +74,9 @@ cdef public void DisplayHandler_OnStatusMessage(
     cdef object callback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyValue = CefToPyString(cefValue)
         callback = pyBrowser.GetClientCallback("OnStatusMessage")
         if callback:
+            pyValue = CefToPyString(cefValue)
             callback(pyBrowser, pyValue)
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
@@ -95,10 +95,10 @@ cdef public cpp_bool DisplayHandler_OnConsoleMessage(
     cdef object callback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyMessage = CefToPyString(cefMessage)
-        pySource = CefToPyString(cefSource)
         callback = pyBrowser.GetClientCallback("OnConsoleMessage")
         if callback:
+            pyMessage = CefToPyString(cefMessage)
+            pySource = CefToPyString(cefSource)
             returnValue = callback(pyBrowser, pyMessage, pySource, line)
             return bool(returnValue)
         return False
@@ -49,14 +49,13 @@ cdef public cpp_bool JavascriptDialogHandler_OnJavascriptDialog(
     cdef py_bool returnValue
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyOriginUrl = CefToPyString(origin_url)
-        pyMessageText = CefToPyString(message_text)
-        pyDefaultPromptText = CefToPyString(default_prompt_text)
-        pyCallback = CreatePyJavascriptDialogCallback(callback)
-        pySuppressMessage = [bool(suppress_message)]
-        
         clientCallback = pyBrowser.GetClientCallback("OnJavascriptDialog")
         if clientCallback:
+            pyOriginUrl = CefToPyString(origin_url)
+            pyMessageText = CefToPyString(message_text)
+            pyDefaultPromptText = CefToPyString(default_prompt_text)
+            pyCallback = CreatePyJavascriptDialogCallback(callback)
+            pySuppressMessage = [bool(suppress_message)]
             returnValue = clientCallback(pyBrowser, pyOriginUrl,
                     dialog_type, pyMessageText, pyDefaultPromptText,
                     pyCallback, pySuppressMessage)
@@ -82,13 +81,12 @@ cdef public cpp_bool JavascriptDialogHandler_OnBeforeUnloadJavascriptDialog(
     cdef py_bool returnValue
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyMessageText = CefToPyString(message_text)
-        pyIsReload = bool(is_reload)
-        pyCallback = CreatePyJavascriptDialogCallback(callback)
-
         clientCallback = pyBrowser.GetClientCallback(
                 "OnBeforeUnloadJavascriptDialog")
         if clientCallback:
+            pyMessageText = CefToPyString(message_text)
+            pyIsReload = bool(is_reload)
+            pyCallback = CreatePyJavascriptDialogCallback(callback)
             returnValue = clientCallback(pyBrowser, pyMessageText, pyIsReload,
                     pyCallback)
             return bool(returnValue)
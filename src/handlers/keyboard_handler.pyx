@@ -55,10 +55,10 @@ cdef public cpp_bool KeyboardHandler_OnPreKeyEvent(
     cdef object callback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyEvent = CefToPyKeyEvent(cefEvent)
-        pyIsKeyboardShortcutOut = [cefIsKeyboardShortcut[0]]
         callback = pyBrowser.GetClientCallback("OnPreKeyEvent")
         if callback:
+            pyEvent = CefToPyKeyEvent(cefEvent)
+            pyIsKeyboardShortcutOut = [cefIsKeyboardShortcut[0]]
             returnValue = callback(pyBrowser, pyEvent, 
                     <object>PyLong_FromVoidPtr(cefEventHandle),
                     pyIsKeyboardShortcutOut)
@@ -81,9 +81,9 @@ cdef public cpp_bool KeyboardHandler_OnKeyEvent(
     cdef object callback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyEvent = CefToPyKeyEvent(cefEvent)
         callback = pyBrowser.GetClientCallback("OnKeyEvent")
         if callback:
+            pyEvent = CefToPyKeyEvent(cefEvent)
             returnValue = callback(pyBrowser, pyEvent,
                     <object>PyLong_FromVoidPtr(cefEventHandle))
             return bool(returnValue)
@@ -47,14 +47,14 @@ cdef public cpp_bool LifespanHandler_OnBeforePopup(
     cdef py_bool returnValue
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
-        pyTargetUrl = CefToPyString(targetUrl)
-        pyTargetFrameName = CefToPyString(targetFrameName)
-        pyNoJavascriptAccess = [noJavascriptAccess[0]]
-        pyWindowInfo = []
-        pyBrowserSettings = []
         callback = pyBrowser.GetClientCallback("OnBeforePopup")
         if callback:
+            pyFrame = GetPyFrame(cefFrame)
+            pyTargetUrl = CefToPyString(targetUrl)
+            pyTargetFrameName = CefToPyString(targetFrameName)
+            pyNoJavascriptAccess = [noJavascriptAccess[0]]
+            pyWindowInfo = []
+            pyBrowserSettings = []
             returnValue = bool(callback(pyBrowser, pyFrame, pyTargetUrl,
                     pyTargetFrameName, targetDisposition, userGesture, None,
                     pyWindowInfo, None, pyBrowserSettings,
@@ -108,6 +108,9 @@ cdef public void LifespanHandler_OnBeforeClose(
         if callback:
             callback(pyBrowser)
         RemovePythonCallbacksForBrowser(pyBrowser.GetIdentifier())
+        RemoveJavascriptEvaluationsForBrowser(pyBrowser.GetIdentifier())
+        RemoveStreamsForBrowser(pyBrowser.GetIdentifier())
+        RemoveSharedMemoryForBrowser(pyBrowser.GetIdentifier())
         RemovePyFramesForBrowser(pyBrowser.GetIdentifier())
         RemovePyBrowser(pyBrowser.GetIdentifier())
     except:
@@ -30,9 +30,9 @@ cdef public void LoadHandler_OnLoadStart(
     cdef object clientCallback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
         clientCallback = pyBrowser.GetClientCallback("OnLoadStart")
         if clientCallback:
+            pyFrame = GetPyFrame(cefFrame)
             clientCallback(pyBrowser, pyFrame)
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
@@ -48,9 +48,9 @@ cdef public void LoadHandler_OnLoadEnd(
     cdef object clientCallback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
         clientCallback = pyBrowser.GetClientCallback("OnLoadEnd")
         if clientCallback:
+            pyFrame = GetPyFrame(cefFrame)
             clientCallback(pyBrowser, pyFrame, httpStatusCode)
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
@@ -73,10 +73,10 @@ cdef public void LoadHandler_OnLoadError(
         # to OnLoadError should be ignored and not handled by user
         # scripts. The wxpython example implements such behavior.
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
-        errorTextOut = [CefToPyString(cefErrorText)]
         clientCallback = pyBrowser.GetClientCallback("OnLoadError")
         if clientCallback:
+            pyFrame = GetPyFrame(cefFrame)
+            errorTextOut = [CefToPyString(cefErrorText)]
             clientCallback(
                     pyBrowser, pyFrame, cefErrorCode, errorTextOut,
                     CefToPyString(cefFailedUrl))
@@ -178,6 +178,7 @@ cdef public void RenderHandler_OnPaint(
     cdef PyBrowser pyBrowser
     cdef list pyDirtyRects = []
     cdef list pyRect
+    cdef object callback
     # TODO: cefDirtyRects should be const, but const_iterator is
     #       not yet implemented in libcpp.vector.
     cdef cpp_vector[CefRect].iterator iterator
@@ -185,6 +186,9 @@ cdef public void RenderHandler_OnPaint(
     cdef PaintBuffer paintBuffer
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
+        callback = pyBrowser.GetClientCallback("OnPaint")
+        if not callback:
+            return
 
         iterator = cefDirtyRects.begin()
         while iterator != cefDirtyRects.end():
@@ -198,13 +202,8 @@ cdef public void RenderHandler_OnPaint(
         # OFF: | (width, height) = pyBrowser.GetSize(paintElementType)
 
         paintBuffer = CreatePaintBuffer(cefBuffer, width, height)
-
-        callback = pyBrowser.GetClientCallback("OnPaint")
-        if callback:
-            callback(pyBrowser, paintElementType, pyDirtyRects, paintBuffer,
-                width, height)
-        else:
-            return
+        callback(pyBrowser, paintElementType, pyDirtyRects, paintBuffer,
+            width, height)
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -247,9 +246,9 @@ cdef public cpp_bool RenderHandler_StartDragging(
     cdef py_bool ret
     try:
         browser = GetPyBrowser(cef_browser)
-        drag_data = DragData_Init(cef_drag_data)
         callback = browser.GetClientCallback("StartDragging")
         if callback:
+            drag_data = DragData_Init(cef_drag_data)
             ret = callback(browser, drag_data, allowed_ops, x, y)
             if ret:
                 return True
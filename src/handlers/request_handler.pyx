@@ -66,10 +66,10 @@ cdef public cpp_bool RequestHandler_OnBeforeResourceLoad(
     cdef py_bool returnValue
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
-        pyRequest = CreatePyRequest(cefRequest)
         clientCallback = pyBrowser.GetClientCallback("OnBeforeResourceLoad")
         if clientCallback:
+            pyFrame = GetPyFrame(cefFrame)
+            pyRequest = CreatePyRequest(cefRequest)
             returnValue = clientCallback(pyBrowser, pyFrame, pyRequest)
             return bool(returnValue)
         else:
@@ -92,11 +92,11 @@ cdef public cpp_bool RequestHandler_OnBeforeBrowse(
     cdef py_bool returnValue
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
-        pyRequest = CreatePyRequest(cefRequest)
-        pyIsRedirect = bool(cefIsRedirect)
         clientCallback = pyBrowser.GetClientCallback("OnBeforeBrowse")
         if clientCallback:
+            pyFrame = GetPyFrame(cefFrame)
+            pyRequest = CreatePyRequest(cefRequest)
+            pyIsRedirect = bool(cefIsRedirect)
             returnValue = clientCallback(pyBrowser, pyFrame, pyRequest,
                                          pyIsRedirect)
             return bool(returnValue)
@@ -118,10 +118,10 @@ cdef public CefRefPtr[CefResourceHandler] RequestHandler_GetResourceHandler(
     cdef object returnValue
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
-        pyRequest = CreatePyRequest(cefRequest)
         clientCallback = pyBrowser.GetClientCallback("GetResourceHandler")
         if clientCallback:
+            pyFrame = GetPyFrame(cefFrame)
+            pyRequest = CreatePyRequest(cefRequest)
             returnValue = clientCallback(pyBrowser, pyFrame, pyRequest)
             if returnValue:
                 return CreateResourceHandler(returnValue)
@@ -150,13 +150,13 @@ cdef public void RequestHandler_OnResourceRedirect(
     cdef object clientCallback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
-        pyOldUrl = CefToPyString(cefOldUrl)
-        pyNewUrlOut = [CefToPyString(cefNewUrl)]
-        pyRequest = CreatePyRequest(cefRequest)
-        pyResponse = CreatePyResponse(cefResponse)
         clientCallback = pyBrowser.GetClientCallback("OnResourceRedirect")
         if clientCallback:
+            pyFrame = GetPyFrame(cefFrame)
+            pyOldUrl = CefToPyString(cefOldUrl)
+            pyNewUrlOut = [CefToPyString(cefNewUrl)]
+            pyRequest = CreatePyRequest(cefRequest)
+            pyResponse = CreatePyResponse(cefResponse)
             clientCallback(pyBrowser, pyFrame, pyOldUrl, pyNewUrlOut,
                            pyRequest, pyResponse)
             if pyNewUrlOut[0]:
@@ -189,17 +189,17 @@ cdef public cpp_bool RequestHandler_GetAuthCredentials(
     cdef object clientCallback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
-        pyIsProxy = bool(cefIsProxy)
-        pyHost = CefToPyString(cefHost)
-        pyPort = int(cefPort)
-        pyRealm = CefToPyString(cefRealm)
-        pyScheme = CefToPyString(cefScheme)
-        pyAuthCallback = CreatePyAuthCallback(cefAuthCallback)
-        pyUsernameOut = [""]
-        pyPasswordOut = [""]
         clientCallback = pyBrowser.GetClientCallback("GetAuthCredentials")
         if clientCallback:
+            pyFrame = GetPyFrame(cefFrame)
+            pyIsProxy = bool(cefIsProxy)
+            pyHost = CefToPyString(cefHost)
+            pyPort = int(cefPort)
+            pyRealm = CefToPyString(cefRealm)
+            pyScheme = CefToPyString(cefScheme)
+            pyAuthCallback = CreatePyAuthCallback(cefAuthCallback)
+            pyUsernameOut = [""]
+            pyPasswordOut = [""]
             returnValue = clientCallback(
                     pyBrowser, pyFrame,
                     pyIsProxy, pyHost, pyPort, pyRealm, pyScheme,
@@ -237,9 +237,9 @@ cdef public cpp_bool RequestHandler_OnQuotaRequest(
     cdef object clientCallback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyOriginUrl = CefToPyString(cefOriginUrl)
         clientCallback = pyBrowser.GetClientCallback("OnQuotaRequest")
         if clientCallback:
+            pyOriginUrl = CefToPyString(cefOriginUrl)
             returnValue = clientCallback(pyBrowser, pyOriginUrl, long(newSize),
                     CreatePyRequestCallback(cefRequestCallback))
             return bool(returnValue)
@@ -292,10 +292,10 @@ cdef public void RequestHandler_OnProtocolExecution(
     cdef object clientCallback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyUrl = CefToPyString(cefUrl)
-        pyAllowOSExecutionOut = [bool(cefAllowOSExecution)]
         clientCallback = pyBrowser.GetClientCallback("OnProtocolExecution")
         if clientCallback:
+            pyUrl = CefToPyString(cefUrl)
+            pyAllowOSExecutionOut = [bool(cefAllowOSExecution)]
             clientCallback(pyBrowser, pyUrl, pyAllowOSExecutionOut)
             # Since Cython 0.17.4 assigning a value to an argument
             # passed by reference will throw an error, the fix is to
@@ -321,10 +321,10 @@ cdef public cpp_bool RequestHandler_OnBeforePluginLoad(
     cdef py_bool returnValue
     cdef object clientCallback
     try:
-        py_browser = GetPyBrowser(browser)
-        py_plugin_info = CreatePyWebPluginInfo(plugin_info)
         clientCallback = GetGlobalClientCallback("OnBeforePluginLoad")
         if clientCallback:
+            py_browser = GetPyBrowser(browser)
+            py_plugin_info = CreatePyWebPluginInfo(plugin_info)
             returnValue = clientCallback(
                     py_browser,
                     CefToPyString(mime_type),
@@ -372,6 +372,7 @@ cdef public void RequestHandler_OnRendererProcessTerminated(
     cdef PyBrowser pyBrowser
     cdef object clientCallback
     try:
+        ReleaseSharedMemoryForBrowser(cefBrowser.get().GetIdentifier())
         pyBrowser = GetPyBrowser(cefBrowser)
         clientCallback = pyBrowser.GetClientCallback(
                 "OnRendererProcessTerminated")
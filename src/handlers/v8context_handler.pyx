@@ -22,6 +22,9 @@ cdef public void V8ContextHandler_OnContextCreated(
         pyBrowser = GetPyBrowser(cefBrowser)
         pyBrowser.SetUserData("__v8ContextCreated", True)
         pyFrame = GetPyFrame(cefFrame)
+        if cefFrame.get() and cefFrame.get().IsMain():
+            # New document, see channel.pyx.
+            ResetChannelsForBrowser(pyBrowser)
         # User defined callback.
         clientCallback = pyBrowser.GetClientCallback("OnContextCreated")
         if clientCallback:
@@ -60,6 +63,8 @@ cdef public void V8ContextHandler_OnContextReleased(
             if not pyFrame:
                 Debug("V8ContextHandler_OnContextReleased() WARNING: "
                         "pyFrame not found")
+        RemoveJavascriptEvaluationsForFrame(browserId, frameId)
+        RemoveStreamsForFrame(browserId, frameId)
         RemovePyFrame(browserId, frameId)
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
@@ -12,10 +12,9 @@ cdef public void V8FunctionHandler_Execute(
         ) except * with gil:
     cdef PyBrowser pyBrowser
     cdef PyFrame pyFrame
+    cdef JavascriptBindings jsBindings
     cdef py_string functionName
     cdef object function
-    cdef list functionArguments
-    cdef object returnValue
     cdef py_string jsErrorMessage
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
@@ -33,16 +32,96 @@ cdef public void V8FunctionHandler_Execute(
             jsErrorMessage = "V8FunctionHandler_Execute() FAILED: " \
                     "python function not found: %s" % functionName
             Debug(jsErrorMessage)
+            SkipSharedMemoryStrings(cefBrowser, cefFunctionArguments)
             # Raise a javascript exception in that frame.
             pyFrame.ExecuteJavascript("throw '%s';" % jsErrorMessage)
             return
-        functionArguments = CefListValueToPyList(cefBrowser, 
-                cefFunctionArguments)
-        returnValue = function(*functionArguments)
-        if returnValue is not None:
-            Debug("V8FunctionHandler_Execute() WARNING: function returned" \
-                    "value, but returning values to javascript is not " \
-                    "supported, functionName=%s" % functionName)
+        CallBoundFunction(cefBrowser, functionName, function,
+                          jsBindings.GetExecutor(functionName),
+                          cefFunctionArguments)
+        ScheduleJavascriptCallbacksRelease()
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void V8FunctionHandler_ExecuteById(
+        CefRefPtr[CefBrowser] cefBrowser,
+        CefRefPtr[CefFrame] cefFrame,
+        int functionId,
+        CefRefPtr[CefListValue] cefFunctionArguments
+        ) except * with gil:
+    # Functions bound with JavascriptBindings are called by id, see
+    # JavascriptBindings.GetFunctionId().
+    cdef PyBrowser pyBrowser
+    cdef PyFrame pyFrame
+    cdef JavascriptBindings jsBindings
+    cdef tuple entry = None
+    cdef py_string jsErrorMessage
+    try:
+        pyBrowser = GetPyBrowser(cefBrowser)
+        jsBindings = pyBrowser.GetJavascriptBindings()
+        if jsBindings:
+            entry = jsBindings.GetFunctionById(functionId)
+        if not entry:
+            # Bindings changed in the meantime, see comment in
+            # V8FunctionHandler_Execute().
+            jsErrorMessage = "V8FunctionHandler_ExecuteById() FAILED: " \
+                    "python function not found: id=%s" % functionId
+            Debug(jsErrorMessage)
+            SkipSharedMemoryStrings(cefBrowser, cefFunctionArguments)
+            pyFrame = GetPyFrame(cefFrame)
+            pyFrame.ExecuteJavascript("throw '%s';" % jsErrorMessage)
+            return
+        CallBoundFunction(cefBrowser, entry[0], entry[1],
+                          jsBindings.GetExecutor(entry[0]),
+                          cefFunctionArguments)
+        ScheduleJavascriptCallbacksRelease()
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef void CallBoundFunction(CefRefPtr[CefBrowser] cefBrowser,
+                            py_string functionName, object function,
+                            object executor,
+                            CefRefPtr[CefListValue] cefFunctionArguments
+                            ) except *:
+    # Arguments are converted on the UI thread. When an executor was
+    # set for the function it is called in the executor and the result
+    # is handled later on the UI thread in _BoundFunctionDone().
+    cdef list functionArguments = CefListValueToPyList(cefBrowser,
+            cefFunctionArguments)
+    cdef object returnValue
+    cdef BoundFunctionDoneCallback doneCallback
+    if executor is not None:
+        doneCallback = BoundFunctionDoneCallback()
+        doneCallback.functionName = functionName
+        executor.submit(function, *functionArguments).add_done_callback(
+                doneCallback)
+        return
+    returnValue = function(*functionArguments)
+    CheckBoundFunctionReturnValue(functionName, returnValue)
+
+cdef void CheckBoundFunctionReturnValue(py_string functionName,
+                                        object returnValue) except *:
+    if returnValue is not None:
+        Debug("V8FunctionHandler_Execute() WARNING: function returned" \
+                "value, but returning values to javascript is not " \
+                "supported, functionName=%s" % functionName)
+
+cdef class BoundFunctionDoneCallback:
+    cdef py_string functionName
+
+    def __call__(self, object future):
+        # Called in the executor thread, or immediately in the UI thread
+        # when the function already finished.
+        PostPythonTask(TID_UI, 0, _BoundFunctionDone,
+                       [self.functionName, future])
+
+def _BoundFunctionDone(py_string functionName, object future):
+    # Called on the UI thread through PostPythonTask(). An exception
+    # raised by the function is re-raised here and reported by
+    # PyTaskRunnable() using sys.excepthook.
+    ScheduleJavascriptCallbacksRelease()
+    if future.cancelled():
+        return
+    CheckBoundFunctionReturnValue(functionName, future.result())
@@ -4,6 +4,28 @@
 
 include "cefpython.pyx"
 
+# Ids of bound functions and methods are unique across all bindings
+# objects, a call from a renderer with stale bindings never reaches
+# a wrong function.
+cdef int g_boundFunctionMaxId = 0
+
+cdef object SetBindingProperty(
+        CefRefPtr[CefDictionaryValue] cefDict, py_string name, object value):
+    # Validates and converts a property value in a single pass with
+    # PyDictToCefDictionaryValue(). Returns True or name of a type that
+    # is not allowed, in which case cefDict is left unchanged. See also
+    # IsValueAllowedRecursively().
+    cdef list notAllowedTypes = []
+    # The wrapping dict is not counted in the nesting level.
+    cdef CefRefPtr[CefDictionaryValue] converted = PyDictToCefDictionaryValue(
+            0, None, {name: value}, -1, notAllowedTypes)
+    if notAllowedTypes:
+        return notAllowedTypes[0]
+    cdef CefString cefName
+    PyToCefString(name, cefName)
+    cefDict.get().SetValue(cefName, converted.get().GetValue(cefName))
+    return True
+
 cdef class JavascriptBindings:
     # By default binding only to top frame.
     cdef public py_bool bindToFrames
@@ -11,14 +33,45 @@ cdef class JavascriptBindings:
     cdef public dict functions
     cdef public dict properties
     cdef public dict objects
+    # Names set with SetFunction/SetProperty/SetObject since the last
+    # Rebind(). Browsers that already received full bindings get only
+    # a "JavascriptBindingsPatch" message with these names.
+    cdef set changedNames
+    cdef set boundBrowserIds
+    cdef py_bool boundBindToFrames
+    # Functions and methods are sent to the Renderer process with
+    # integer ids, see V8FunctionHandler_ExecuteById().
+    # "name" or "object.method" => id.
+    cdef dict functionIds
+    # id => ("name" or "object.method", callable).
+    cdef dict functionsById
+    # Properties converted once in SetProperty() and reused for every
+    # browser and rebind. ObservableProperty values are not cached.
+    cdef CefDictionaryValueWrapper cefProperties
+    cdef set observableNames
+    # name => value of the "properties" dict when it was cached, used to
+    # detect direct modifications of the public dict without converting.
+    cdef dict cachedPropertyValues
+    # Function or object name => executor, see SetFunction().
+    cdef dict executors
 
     def __init__(self, bindToFrames=False, bindToPopups=False):
         self.functions = {}
         self.properties = {}
         self.objects = {}
+        self.changedNames = set()
+        self.boundBrowserIds = set()
+        self.functionIds = {}
+        self.functionsById = {}
+        self.cefProperties = CefDictionaryValueWrapper()
+        self.cefProperties.cefValue = CefDictionaryValue_Create()
+        self.observableNames = set()
+        self.cachedPropertyValues = {}
+        self.executors = {}
 
         self.bindToFrames = bool(bindToFrames)
         self.bindToPopups = bool(bindToPopups)
+        self.boundBindToFrames = self.bindToFrames
 
     cpdef py_bool GetBindToFrames(self):
         return bool(self.bindToFrames)
@@ -26,24 +79,56 @@ cdef class JavascriptBindings:
     cpdef py_bool GetBindToPopups(self):
         return bool(self.bindToPopups)
 
-    cpdef py_void SetFunction(self, py_string name, object func):
+    cpdef py_void SetFunction(self, py_string name, object func,
+                              object executor=None):
         self.SetProperty(name, func)
+        self.SetExecutor(name, executor)
+
+    cdef void SetExecutor(self, py_string name, object executor) except *:
+        if executor is None:
+            self.executors.pop(name, None)
+            return
+        if not hasattr(executor, "submit"):
+            raise Exception("JavascriptBindings: executor must have"
+                            " the submit() method, e.g. an instance of"
+                            " concurrent.futures.ThreadPoolExecutor")
+        self.executors[name] = executor
+
+    cdef object GetExecutor(self, py_string functionName):
+        # functionName is "name" or "object.method".
+        if not self.executors:
+            return None
+        if "." in functionName:
+            return self.executors.get(functionName.split(".")[0])
+        return self.executors.get(functionName)
 
-    cpdef py_void SetObject(self, py_string name, object obj):
+    cpdef py_void SetObject(self, py_string name, object obj,
+                            list methodNames=None, object executor=None):
         if not hasattr(obj, "__class__"):
             raise Exception("JavascriptBindings.SetObject() failed: name=%s, "
                             "__class__ attribute missing, this is not an object" % name)
-        cdef dict methods = {}
-        cdef py_string key
-        cdef object method
+        cdef dict methods
         cdef object predicate = inspect.ismethod
-        if isinstance(obj, (PyBrowser, PyFrame)):
-            predicate = inspect.isbuiltin
-        for value in inspect.getmembers(obj, predicate=predicate):
-            key = value[0]
-            method = value[1]
-            methods[key] = method
+        if methodNames is not None:
+            # Explicit whitelist, no introspection.
+            methods = {}
+            for methodName in methodNames:
+                methods[methodName] = getattr(obj, methodName)
+                if not callable(methods[methodName]):
+                    raise Exception("JavascriptBindings.SetObject() failed:"
+                                    " name=%s, %s is not callable"
+                                    % (name, methodName))
+        else:
+            if isinstance(obj, (PyBrowser, PyFrame)):
+                predicate = inspect.isbuiltin
+            # See method_cache.pyx.
+            methods = GetMethods(obj, predicate)
+        self.functions.pop(name, None)
+        self.properties.pop(name, None)
+        self.RemoveCachedProperty(name)
+        self.SetExecutor(name, executor)
         self.objects[name] = methods
+        self.changedNames.add(name)
 
     cpdef object GetFunction(self, py_string name):
         if name in self.functions:
@@ -70,47 +155,225 @@ cdef class JavascriptBindings:
             return self.GetFunction(name)
 
     cpdef py_void SetProperty(self, py_string name, object value):
-        cdef object allowed = self.IsValueAllowedRecursively(value) # returns True or string.
+        cdef object allowed = True
+        cdef object valueType = type(value)
+        if isinstance(value, ObservableProperty):
+            # Values are validated when set, see observable_property.pyx.
+            self.RemoveCachedProperty(name)
+            (<ObservableProperty>value).AddBinding(self, name)
+            self.observableNames.add(name)
+        elif IsFunctionOrMethod(valueType):
+            self.RemoveCachedProperty(name)
+        else:
+            # Validated while converting, value is cached only when
+            # it is allowed.
+            allowed = SetBindingProperty(self.cefProperties.cefValue,
+                                         name, value)
+            self.observableNames.discard(name)
         if allowed is not True:
             raise Exception("JavascriptBindings.SetProperty() failed: name=%s, "
                             "not allowed type: %s (this may be a type of a nested value)"
                             % (name, allowed))
 
-        cdef object valueType = type(value)
+        self.objects.pop(name, None)
+        self.executors.pop(name, None)
         if IsFunctionOrMethod(valueType):
+            self.properties.pop(name, None)
             self.functions[name] = value
         else:
+            self.functions.pop(name, None)
             self.properties[name] = value
+            self.cachedPropertyValues[name] = value
+        self.changedNames.add(name)
+
+    cdef void RemoveCachedProperty(self, py_string name) except *:
+        self.cefProperties.cefValue.get().Remove(PyToCefStringValue(name))
+        self.observableNames.discard(name)
+        self.cachedPropertyValues.pop(name, None)
+
+    cdef cpp_bool IsCachedPropertiesValid(self) except *:
+        # Detects values added, removed or replaced in the public
+        # "properties" dict. Values modified in place must be set again
+        # with SetProperty().
+        if len(self.properties) != len(self.cachedPropertyValues):
+            return False
+        for name, value in self.properties.items():
+            if self.cachedPropertyValues.get(name, self) is not value:
+                return False
+        return True
+
+    cdef void RebuildCachedProperties(self) except *:
+        # Public "properties" dict might have been modified directly.
+        cdef CefDictionaryValueWrapper cefProperties = \
+                CefDictionaryValueWrapper()
+        cefProperties.cefValue = CefDictionaryValue_Create()
+        cdef object allowed
+        cdef set observableNames = set()
+        for name, value in self.properties.items():
+            if isinstance(value, ObservableProperty):
+                observableNames.add(name)
+                continue
+            allowed = SetBindingProperty(cefProperties.cefValue, name, value)
+            if allowed is not True:
+                raise Exception("JavascriptBindings.Rebind() failed:"
+                                " name=%s, not allowed type: %s"
+                                % (name, allowed))
+        self.cefProperties = cefProperties
+        self.observableNames = observableNames
+        self.cachedPropertyValues = dict(self.properties)
+
+    cdef void InvalidateBrowser(self, int browserId) except *:
+        # Next Rebind() sends full bindings to this browser.
+        self.boundBrowserIds.discard(browserId)
+
+    cdef CefDictionaryValueWrapper GetCefProperties(self, object names):
+        # Properties to be sent to the Renderer process, all when names
+        # is None. Cached values are copied in C++, only observables
+        # are converted.
+        cdef CefDictionaryValueWrapper ret
+        cdef CefString cefName
+        cdef object allowed
+        if names is None and not self.observableNames:
+            return self.cefProperties
+        ret = CefDictionaryValueWrapper()
+        if names is None:
+            ret.cefValue = self.cefProperties.cefValue.get().Copy(False)
+            names = self.observableNames
+        else:
+            ret.cefValue = CefDictionaryValue_Create()
+        for name in names:
+            if name in self.observableNames:
+                allowed = SetBindingProperty(ret.cefValue, name,
+                        (<ObservableProperty>self.properties[name])
+                        .GetValues())
+                if allowed is not True:
+                    raise Exception("JavascriptBindings.Rebind() failed:"
+                                    " name=%s, not allowed type: %s"
+                                    % (name, allowed))
+            else:
+                PyToCefString(name, cefName)
+                ret.cefValue.get().SetValue(cefName,
+                        self.cefProperties.cefValue.get().GetValue(cefName))
+        return ret
+
+    cdef int GetFunctionId(self, py_string name, object func) except *:
+        # Id is preserved when a function is replaced, javascript
+        # functions created earlier call the new one.
+        global g_boundFunctionMaxId
+        cdef object functionId = self.functionIds.get(name)
+        if functionId is None:
+            g_boundFunctionMaxId += 1
+            functionId = g_boundFunctionMaxId
+            self.functionIds[name] = functionId
+        self.functionsById[functionId] = (name, func)
+        return functionId
+
+    cdef tuple GetFunctionById(self, int functionId):
+        return self.functionsById.get(functionId)
+
+    cdef dict GetObjectMethodIds(self, py_string objectName):
+        cdef dict methods = {}
+        cdef dict objectMethods = self.objects[objectName]
+        for methodName in objectMethods:
+            methods[methodName] = self.GetFunctionId(
+                    objectName + "." + methodName, objectMethods[methodName])
+        return methods
+
+    cdef dict GetBindingsData(self):
+        # Called on full rebind, ids of functions that are no longer
+        # bound are released. Properties are converted again only when
+        # the public "properties" dict was modified directly.
+        if not self.IsCachedPropertiesValid():
+            self.RebuildCachedProperties()
+        self.functionsById = {}
+        cdef dict functions = {}
+        for funcName in self.functions:
+            functions[funcName] = self.GetFunctionId(funcName,
+                                                     self.functions[funcName])
+        cdef CefDictionaryValueWrapper properties = self.GetCefProperties(None)
+        cdef dict objects = {}
+        for objectName in self.objects:
+            objects[objectName] = self.GetObjectMethodIds(objectName)
+        for name in list(self.functionIds):
+            if self.functionIds[name] not in self.functionsById:
+                del self.functionIds[name]
+        return {
+            "functions": functions,
+            "properties": properties,
+            "objects": objects,
+            "bindToFrames": self.bindToFrames,
+        }
 
     cpdef py_void Rebind(self):
         # Rebind() is called for both first-time binding and rebinding.
+        # When bindings were modified only through SetFunction/SetProperty/
+        # SetObject, browsers that are already bound receive a patch with
+        # the changed names only. Otherwise, e.g. when the public dicts
+        # were modified directly, everything is sent again.
+        if not self.changedNames:
+            self.boundBrowserIds.clear()
+        self.SendBindings()
+
+    cdef void SendBindings(self) except *:
+        # Called by Rebind().
         cdef PyBrowser pyBrowser
-        cdef dict functions
-        cdef dict properties
-        cdef dict objects
-        cdef dict methods
+        cdef dict bindingsData = None
+        cdef dict patch = None
+        cdef set changedNames = self.changedNames
+        self.changedNames = set()
+        if self.bindToFrames != self.boundBindToFrames:
+            self.boundBrowserIds.clear()
+            self.boundBindToFrames = self.bindToFrames
         for browserId, pyBrowser in g_pyBrowsers.iteritems():
             if pyBrowser.GetJavascriptBindings() != self:
                 continue
-            # Send to the Renderer process: functions, properties,
-            # objects and its methods, bindToFrames.
-            functions = {}
-            for funcName in self.functions:
-                functions[funcName] = None
-            properties = self.properties
-            objects = {}
-            for objectName in self.objects:
-                methods = {}
-                for methodName in self.objects[objectName]:
-                    methods[methodName] = None
-                objects[objectName] = methods
-            pyBrowser.SendProcessMessage(cef_types.PID_RENDERER,
-                    0, "DoJavascriptBindings", [{
-                            "functions": functions,
-                            "properties": properties,
-                            "objects": objects,
-                            "bindToFrames": self.bindToFrames
-                            }])
+            if browserId in self.boundBrowserIds:
+                if patch is None:
+                    patch = self.GetPatch(changedNames)
+                pyBrowser.SendProcessMessage(cef_types.PID_RENDERER,
+                        0, "JavascriptBindingsPatch", [patch])
+                continue
+            if bindingsData is None:
+                bindingsData = self.GetBindingsData()
+            self.SendBindingsData(pyBrowser, bindingsData)
+
+    cdef void BindBrowser(self, PyBrowser pyBrowser) except *:
+        # Called when bindings are set for a browser, e.g. a popup. Names
+        # changed since the last Rebind() are left for the next Rebind(),
+        # other browsers receive them in a patch then.
+        self.SendBindingsData(pyBrowser, self.GetBindingsData())
+
+    cdef void SendBindingsData(self, PyBrowser pyBrowser, dict bindingsData
+                               ) except *:
+        # Send to the Renderer process: functions and their ids,
+        # properties, objects and ids of its methods, bindToFrames.
+        cdef dict data = dict(bindingsData)
+        data["channels"] = list(pyBrowser.channels.keys())
+        pyBrowser.SendProcessMessage(cef_types.PID_RENDERER,
+                0, "DoJavascriptBindings", [data])
+        self.boundBrowserIds.add(pyBrowser.GetIdentifier())
+
+    cdef dict GetPatch(self, set changedNames):
+        # A name appears in only one of the dicts, the Renderer process
+        # removes it from the other ones.
+        cdef dict functions = {}
+        cdef list propertyNames = []
+        cdef dict objects = {}
+        for name in changedNames:
+            if name in self.functions:
+                functions[name] = self.GetFunctionId(name,
+                                                     self.functions[name])
+            elif name in self.properties:
+                propertyNames.append(name)
+            elif name in self.objects:
+                objects[name] = self.GetObjectMethodIds(name)
+        cdef CefDictionaryValueWrapper properties = self.GetCefProperties(
+                propertyNames)
+        return {
+            "functions": functions,
+            "properties": properties,
+            "objects": objects,
+        }
 
     cpdef dict GetProperties(self):
         return self.properties
@@ -4,12 +4,18 @@
 
 include "cefpython.pyx"
 
+# browserId => [callbackId, ...] released since the last flush, see
+# JavascriptCallback.Release() and ScheduleJavascriptCallbacksRelease().
+cdef dict g_releasedJavascriptCallbacks = {}
+cdef py_bool g_javascriptCallbacksReleaseScheduled = False
+
 cdef JavascriptCallback CreateJavascriptCallback(int callbackId,
         CefRefPtr[CefBrowser] cefBrowser, object frameId, py_string functionName):
     # frameId is int64
     cdef JavascriptCallback jsCallback = JavascriptCallback()
     jsCallback.callbackId = callbackId
     cdef PyBrowser browser = GetPyBrowser(cefBrowser)
+    jsCallback.browserId = browser.GetIdentifier()
     jsCallback.frame = browser.GetFrameByIdentifier(frameId)
     jsCallback.functionName = functionName
     Debug("Created javascript callback, callbackId=%s, functionName=%s" % \
@@ -18,12 +24,31 @@ cdef JavascriptCallback CreateJavascriptCallback(int callbackId,
 
 cdef class JavascriptCallback:
     cdef int callbackId
+    cdef int browserId
     cdef PyFrame frame
     cdef py_string functionName
+    cdef py_bool released
+
+    def __dealloc__(self):
+        # May run on any thread, only record the release here. The
+        # message is sent later on the UI thread, see
+        # ScheduleJavascriptCallbacksRelease().
+        if g_releasedJavascriptCallbacks is None:
+            # Module globals are cleared during interpreter shutdown.
+            return
+        self.RecordRelease()
 
     def Call(self, *args):
         # Send process message "ExecuteJavascriptCallback".
-        if self.frame:
+        if not IsThread(TID_UI):
+            # E.g. called by a bound function that runs in an executor,
+            # see JavascriptBindings.SetFunction().
+            PostPythonTask(TID_UI, 0, self.Call, list(args))
+            return
+        if self.released:
+            Debug("JavascriptCallback.Call() FAILED: callback was released, " \
+                    "callbackId = %s" % self.callbackId)
+        elif self.frame:
             browser = self.frame.GetBrowser()
             if browser:
                 browser.SendProcessMessage(
@@ -38,6 +63,23 @@ cdef class JavascriptCallback:
             Debug("JavascriptCallback.Call() FAILED: frame not found, " \
                     "callbackId = %s" % self.callbackId)
 
+    cpdef py_void Release(self):
+        # The Renderer process keeps the javascript function alive until
+        # it is released or its frame is destroyed. Releases are sent once
+        # per message loop iteration, in a single message per browser.
+        self.RecordRelease()
+        ScheduleJavascriptCallbacksRelease()
+
+    cdef void RecordRelease(self) except *:
+        if self.released or not self.callbackId:
+            return
+        self.released = True
+        if g_isShutdown:
+            # Renderer processes are gone, nothing to release there.
+            return
+        g_releasedJavascriptCallbacks.setdefault(self.browserId, []).append(
+                self.callbackId)
+
     def GetFunctionName(self):
         return self.functionName
 
@@ -47,3 +89,29 @@ cdef class JavascriptCallback:
 
     def GetFrame(self):
         return self.frame
+
+cdef void ScheduleJavascriptCallbacksRelease() except *:
+    # Callbacks garbage collected since the last flush are only recorded
+    # in __dealloc__, this is called from UI thread code that runs after
+    # Python code had a chance to drop them: Release(), MessageLoopWork()
+    # and the handlers calling bound functions and python callbacks.
+    global g_javascriptCallbacksReleaseScheduled
+    if g_releasedJavascriptCallbacks \
+            and not g_javascriptCallbacksReleaseScheduled \
+            and not g_isShutdown:
+        g_javascriptCallbacksReleaseScheduled = True
+        PostPythonTask(TID_UI, 0, _FlushReleasedJavascriptCallbacks, [])
+
+def _FlushReleasedJavascriptCallbacks():
+    # Called on the UI thread through PostPythonTask().
+    global g_javascriptCallbacksReleaseScheduled
+    g_javascriptCallbacksReleaseScheduled = False
+    cdef dict released = dict(g_releasedJavascriptCallbacks)
+    g_releasedJavascriptCallbacks.clear()
+    cdef PyBrowser pyBrowser
+    for browserId, callbackIds in released.items():
+        pyBrowser = GetPyBrowserById(browserId)
+        if pyBrowser:
+            pyBrowser.SendProcessMessage(cef_types.PID_RENDERER, 0,
+                                         "ReleaseJavascriptCallbacks",
+                                         [callbackIds])
@@ -0,0 +1,164 @@
+# Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+# Frame.EvaluateJavascript() sends the "EvaluateJavascript" process
+# message to the Renderer process, where the code is run using
+# CefV8Context::Eval(). The result is sent back in the
+# "EvaluateJavascriptResult" message and resolves the future that
+# was returned to the caller.
+
+include "cefpython.pyx"
+
+cdef int g_javascriptEvaluationMaxId = 0
+# [0] browserId, [1] frameId, [2] future.
+cdef dict g_javascriptEvaluations = {}
+# (browserId, frameId) => set of evaluationIds.
+cdef dict g_javascriptEvaluationsByFrame = {}
+# browserId => set of frameIds with pending evaluations.
+cdef dict g_javascriptEvaluationFramesByBrowser = {}
+
+cdef object CreateFuture(py_string funcName):
+    if concurrent_futures is None:
+        raise Exception("%s failed: the concurrent.futures module is not"
+                        " available, on Python 2 install the 'futures'"
+                        " package" % funcName)
+    return concurrent_futures.Future()
+
+cdef void SetFutureResult(object future, object result) except *:
+    # Future may already be cancelled by the user or time out.
+    if not future.done():
+        future.set_result(result)
+
+cdef void SetFutureException(object future, object exception) except *:
+    if not future.done():
+        future.set_exception(exception)
+
+cdef object EvaluateJavascriptInFrame(PyFrame pyFrame, py_string jsCode,
+                                      object timeout):
+    global g_javascriptEvaluationMaxId
+    cdef object future = CreateFuture("Frame.EvaluateJavascript()")
+    cdef PyBrowser pyBrowser = pyFrame.GetBrowser()
+    if not pyBrowser:
+        raise Exception("Frame.EvaluateJavascript() failed: browser"
+                        " not found")
+    g_javascriptEvaluationMaxId += 1
+    cdef int evaluationId = g_javascriptEvaluationMaxId
+    cdef int browserId = pyFrame.GetBrowserIdentifier()
+    cdef object frameId = pyFrame.GetIdentifier()
+    g_javascriptEvaluations[evaluationId] = (browserId, frameId, future)
+    g_javascriptEvaluationsByFrame.setdefault(
+            (browserId, frameId), set()).add(evaluationId)
+    g_javascriptEvaluationFramesByBrowser.setdefault(
+            browserId, set()).add(frameId)
+    try:
+        pyBrowser.SendProcessMessage(
+                cef_types.PID_RENDERER,
+                frameId,
+                "EvaluateJavascript",
+                [frameId, evaluationId, jsCode])
+    except:
+        PopJavascriptEvaluation(evaluationId)
+        raise
+    if timeout is not None:
+        PostPythonTask(TID_UI, int(float(timeout) * 1000),
+                       _JavascriptEvaluationTimeout, [evaluationId])
+    return future
+
+cdef tuple PopJavascriptEvaluation(int evaluationId):
+    # Removes the evaluation along with its frame index entries,
+    # returns None if not found.
+    cdef tuple evaluation = g_javascriptEvaluations.pop(evaluationId, None)
+    if evaluation is None:
+        return None
+    cdef tuple frameKey = (evaluation[0], evaluation[1])
+    cdef set evaluationIds = g_javascriptEvaluationsByFrame.get(frameKey)
+    cdef set frameIds
+    if evaluationIds is not None:
+        evaluationIds.discard(evaluationId)
+        if not evaluationIds:
+            del g_javascriptEvaluationsByFrame[frameKey]
+            frameIds = g_javascriptEvaluationFramesByBrowser.get(
+                    evaluation[0])
+            if frameIds is not None:
+                frameIds.discard(evaluation[1])
+                if not frameIds:
+                    del g_javascriptEvaluationFramesByBrowser[evaluation[0]]
+    return evaluation
+
+def _JavascriptEvaluationTimeout(int evaluationId):
+    # Called on the UI thread through PostPythonTask().
+    cdef tuple evaluation = PopJavascriptEvaluation(evaluationId)
+    if evaluation:
+        Debug("_JavascriptEvaluationTimeout(): evaluationId=%s"
+              % evaluationId)
+        SetFutureException(evaluation[2], Exception(
+                "Frame.EvaluateJavascript() failed: timed out"))
+
+cdef void FailJavascriptEvaluations(list evaluationIds, py_string reason
+                                    ) except *:
+    # Called when the process messages of these evaluations were
+    # dropped, the result will never arrive.
+    cdef tuple evaluation
+    for evaluationId in evaluationIds:
+        evaluation = PopJavascriptEvaluation(evaluationId)
+        if evaluation:
+            SetFutureException(evaluation[2], Exception(
+                    "Frame.EvaluateJavascript() failed: %s" % reason))
+
+cdef void RemoveJavascriptEvaluationsForFrame(int browserId, object frameId
+                                              ) except *:
+    # Called from V8ContextHandler_OnContextReleased(). The context the
+    # code was sent to no longer exists, result will never arrive.
+    cdef set evaluationIds = g_javascriptEvaluationsByFrame.get(
+            (browserId, frameId))
+    if not evaluationIds:
+        return
+    FailJavascriptEvaluations(list(evaluationIds), "V8 context released")
+
+cdef void RemoveJavascriptEvaluationsForBrowser(int browserId) except *:
+    # Called from LifespanHandler_OnBeforeClose().
+    cdef set frameIds = g_javascriptEvaluationFramesByBrowser.get(browserId)
+    if not frameIds:
+        return
+    for frameId in list(frameIds):
+        FailJavascriptEvaluations(list(g_javascriptEvaluationsByFrame.get(
+                (browserId, frameId), ())), "browser closed")
+
+cdef public void JavascriptEvaluation_OnResult(
+        CefRefPtr[CefBrowser] cefBrowser,
+        int evaluationId,
+        CefRefPtr[CefListValue] cefResult
+        ) except * with gil:
+    cdef tuple evaluation
+    cdef list result
+    try:
+        evaluation = PopJavascriptEvaluation(evaluationId)
+        if not evaluation:
+            Debug("JavascriptEvaluation_OnResult(): evaluation not found,"
+                  " it may have timed out, evaluationId=%s" % evaluationId)
+            SkipSharedMemoryStrings(cefBrowser, cefResult)
+            return
+        # The renderer appends a single value to the list.
+        result = CefListValueToPyList(cefBrowser, cefResult)
+        SetFutureResult(evaluation[2], result[0] if result else None)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void JavascriptEvaluation_OnError(
+        CefRefPtr[CefBrowser] cefBrowser,
+        int evaluationId,
+        const CefString& cefError
+        ) except * with gil:
+    cdef tuple evaluation
+    try:
+        evaluation = PopJavascriptEvaluation(evaluationId)
+        if not evaluation:
+            Debug("JavascriptEvaluation_OnError(): evaluation not found,"
+                  " it may have timed out, evaluationId=%s" % evaluationId)
+            return
+        SetFutureException(evaluation[2], Exception(
+                "Frame.EvaluateJavascript() failed: %s"
+                % CefToPyString(cefError)))
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
@@ -142,6 +142,13 @@ class CefBrowser(Widget):
         # Clock.schedule_once(my_callback, 0) # call after the next frame
         # Clock.schedule_once(my_callback, -1) # call before the next frame
 
+        # When CEF doesn't need to do work soon, sleep for the delay it
+        # requested instead of running on every frame.
+        delay = cefpython.GetNextWorkDelay()
+        if delay:
+            Clock.schedule_once(self._message_loop_work, delay / 1000.0)
+            return
+
         # When scheduling "after the next frame" Kivy calls _message_loop_work
         # in about 13ms intervals. We use a small trick to make this 6ms
         # interval by scheduling it alternately before and after the next
@@ -182,6 +189,9 @@ class CefBrowser(Widget):
             "browser_subprocess_path": "%s/%s" % (
                 cefpython.GetModuleDirectory(), "subprocess"),
             "windowless_rendering_enabled": True,
+            # Delay of the next MessageLoopWork() call is requested by
+            # CEF, see _message_loop_work().
+            "external_message_pump": True,
             "context_menu": {
                 # Disable context menu, popup widgets not supported
                 "enabled": False,
@@ -205,6 +215,9 @@ class CefBrowser(Widget):
 
         global g_switches
         g_switches = switches
+        # Work requests are read with GetNextWorkDelay() in
+        # _message_loop_work(), the scheduler does nothing.
+        cefpython.SetMessagePumpScheduler(lambda delay_ms: None)
         cefpython.Initialize(settings, switches)
 
         # Start idle - CEF message loop work.
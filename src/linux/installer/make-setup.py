@@ -188,6 +188,14 @@ def main():
     ret = os.system("mv "+package_dir+"/*.css "+package_dir+"/examples/")
     # assert ret == 0
 
+    print("Creating asyncio dir in package dir")
+    os.mkdir(package_dir+"/asyncio/")
+
+    print("Copying asyncio/ to package dir")
+    asyncio_subpackage_dir = os.path.abspath(INSTALLER_DIR+"/../../asyncio/")
+    ret = os.system("cp -rf "+asyncio_subpackage_dir+"/* "+package_dir+"/asyncio/")
+    assert ret == 0
+
     print("Copying wx/ to package dir")
     wx_subpackage_dir = os.path.abspath(INSTALLER_DIR+"/../../wx/")
     ret = os.system("cp -rf "+wx_subpackage_dir+"/* "+package_dir+"/wx/")
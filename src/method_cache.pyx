@@ -0,0 +1,61 @@
+# Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+# Names of methods found on objects passed to JavascriptBindings.SetObject()
+# and Browser.SetClientHandler() are cached per class, so that binding
+# many instances of the same class runs inspect.getmembers() only once.
+# When a class has methods decorated with @cefpython.expose, only these
+# methods are bound and the class is not introspected at all. Classes
+# modified at runtime (e.g. methods added) require a call to
+# InvalidateMethodCache().
+
+include "cefpython.pyx"
+
+# Weak keys, so that classes created at runtime can be freed.
+# class => {predicate: [method names]}
+cdef object g_methodNamesCache = weakref.WeakKeyDictionary()
+
+def expose(object func):
+    # Decorator, see the comment at the top of this file.
+    func.__cefpython_expose__ = True
+    return func
+
+def InvalidateMethodCache(object cls=None):
+    if cls is None:
+        g_methodNamesCache.clear()
+    else:
+        g_methodNamesCache.pop(cls, None)
+
+cdef list GetExposedMethodNames(object cls):
+    cdef list names = []
+    for klass in inspect.getmro(cls):
+        for name, value in vars(klass).items():
+            if getattr(value, "__cefpython_expose__", False) \
+                    and name not in names:
+                names.append(name)
+    return names
+
+cdef list GetMethodNames(object obj, object predicate):
+    cdef object cls = obj.__class__
+    cdef dict classEntry
+    try:
+        classEntry = g_methodNamesCache.get(cls)
+    except TypeError:
+        # Class does not support weak references, don't cache.
+        classEntry = None
+    if classEntry is not None and predicate in classEntry:
+        return classEntry[predicate]
+    cdef list names = GetExposedMethodNames(cls)
+    if not names:
+        names = [value[0] for value
+                 in inspect.getmembers(obj, predicate=predicate)]
+    try:
+        g_methodNamesCache.setdefault(cls, {})[predicate] = names
+    except TypeError:
+        pass
+    return names
+
+cdef dict GetMethods(object obj, object predicate):
+    cdef dict methods = {}
+    for name in GetMethodNames(obj, predicate):
+        methods[name] = getattr(obj, name)
+    return methods
@@ -0,0 +1,162 @@
+# Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+# ObservableProperty is a dict-like object that can be bound with
+# JavascriptBindings.SetProperty(). Assigning and deleting its keys is
+# tracked and changes are flushed once per message loop iteration by a
+# task posted on the UI thread. Each bound browser receives a single
+# "JavascriptBindingsPatch" message with an "observables" dictionary
+# {name: {"changed": {key: value}, "deleted": [key, ...]}}. The Renderer
+# process updates only these keys of the javascript object and then
+# dispatches the "pythonpropertychange" event on the window object.
+# Changes are tracked per top-level key, modifying a nested value in
+# place is not detected, assign the key again instead.
+
+include "cefpython.pyx"
+
+cdef list g_dirtyObservableProperties = []
+cdef py_bool g_observablePropertiesFlushScheduled = False
+
+cdef class ObservableProperty:
+    cdef dict values
+    cdef dict changed
+    cdef set deleted
+    # [(JavascriptBindings, name), ...]
+    cdef list bindings
+    cdef py_bool dirty
+
+    def __init__(self, dict values=None):
+        self.values = {}
+        self.changed = {}
+        self.deleted = set()
+        self.bindings = []
+        self.dirty = False
+        if values:
+            self.Update(values)
+            # Initial values are sent along with the bindings.
+            self.changed.clear()
+
+    def __getitem__(self, object key):
+        return self.values[key]
+
+    def __setitem__(self, object key, object value):
+        self.Set(key, value)
+
+    def __delitem__(self, object key):
+        if key not in self.values:
+            raise KeyError(key)
+        self.Delete(key)
+
+    def __contains__(self, object key):
+        return key in self.values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(list(self.values))
+
+    cpdef object Get(self, object key, object default=None):
+        return self.values.get(key, default)
+
+    cpdef dict GetValues(self):
+        return dict(self.values)
+
+    cpdef py_void Set(self, object key, object value):
+        if not isinstance(key, basestring):
+            raise Exception("ObservableProperty.Set() failed: key must be"
+                            " a string, key=%s" % repr(key))
+        cdef object allowed = JavascriptBindings.IsValueAllowedRecursively(
+                value, True)
+        if allowed is not True:
+            raise Exception("ObservableProperty.Set() failed: key=%s, not"
+                            " allowed type: %s" % (key, allowed))
+        self.values[key] = value
+        self.deleted.discard(key)
+        self.changed[key] = None
+        self.MarkDirty()
+
+    cpdef py_void Update(self, dict values):
+        for key, value in values.items():
+            self.Set(key, value)
+
+    cpdef py_void Delete(self, object key):
+        if key not in self.values:
+            return
+        del self.values[key]
+        self.changed.pop(key, None)
+        self.deleted.add(key)
+        self.MarkDirty()
+
+    cdef void AddBinding(self, JavascriptBindings bindings, py_string name
+                         ) except *:
+        # Called from JavascriptBindings.SetProperty(). Current values
+        # are sent along with the bindings, earlier changes are not
+        # relevant unless a flush is pending for other bindings.
+        if not self.dirty:
+            self.changed.clear()
+            self.deleted.clear()
+        # SetProperty() may be called again with the same name, e.g.
+        # when the bindings are rebound.
+        if (bindings, name) not in self.bindings:
+            self.bindings.append((bindings, name))
+
+    cdef void MarkDirty(self) except *:
+        global g_observablePropertiesFlushScheduled
+        if not self.bindings:
+            return
+        if not self.dirty:
+            self.dirty = True
+            g_dirtyObservableProperties.append(self)
+        if not g_observablePropertiesFlushScheduled:
+            g_observablePropertiesFlushScheduled = True
+            PostPythonTask(TID_UI, 0, FlushObservableProperties, [])
+
+    cdef dict PopChanges(self):
+        cdef dict changed = {}
+        for key in self.changed:
+            changed[key] = self.values[key]
+        cdef dict changes = {
+            "changed": changed,
+            "deleted": list(self.deleted),
+        }
+        self.dirty = False
+        self.changed.clear()
+        self.deleted.clear()
+        return changes
+
+def FlushObservableProperties():
+    # Called on the UI thread through PostPythonTask().
+    global g_observablePropertiesFlushScheduled
+    g_observablePropertiesFlushScheduled = False
+    cdef list dirty = list(g_dirtyObservableProperties)
+    del g_dirtyObservableProperties[:]
+    cdef ObservableProperty observable
+    cdef JavascriptBindings bindings
+    cdef PyBrowser pyBrowser
+    cdef dict changes
+    cdef list current
+    # browserId => {name: changes}
+    cdef dict patches = {}
+    for observable in dirty:
+        changes = observable.PopChanges()
+        current = []
+        for bindings, name in observable.bindings:
+            if bindings.properties.get(name) is not observable:
+                # Property was replaced, forget this binding.
+                continue
+            current.append((bindings, name))
+            # Browsers not yet bound will receive current values
+            # along with full bindings.
+            for browserId in bindings.boundBrowserIds:
+                pyBrowser = GetPyBrowserById(browserId)
+                if pyBrowser and pyBrowser.GetJavascriptBindings() is bindings:
+                    patches.setdefault(browserId, {})[name] = changes
+        observable.bindings = current
+    for browserId, observables in patches.items():
+        pyBrowser = GetPyBrowserById(browserId)
+        pyBrowser.SendProcessMessage(cef_types.PID_RENDERER, 0,
+                                     "JavascriptBindingsPatch",
+                                     [{"functions": {},
+                                       "properties": {},
+                                       "objects": {},
+                                       "observables": observables}])
@@ -0,0 +1,138 @@
+# Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+# Outbound process messages batching, enabled with the
+# "process_message_batching" application setting. Messages sent
+# to the Renderer process with PyBrowser.SendProcessMessage() are
+# appended to a single "ProcessMessageBatch" message per browser,
+# the argument list is [name1, arguments1, name2, arguments2, ...].
+# The batch is sent by a task posted on the UI thread, thus all
+# messages sent during the current message loop iteration are
+# coalesced into one IPC message. The Renderer process unpacks
+# the batch in CefPythonApp::OnProcessMessageReceived() and handles
+# messages in order. Frame.ExecuteJavascript() does not use process
+# messages, it flushes the pending batch first so that the order of
+# calls is preserved, see FlushPendingProcessMessages().
+
+include "cefpython.pyx"
+
+cdef int PROCESS_MESSAGE_BATCH_MAX_SIZE_DEFAULT = 1000
+cdef int PROCESS_MESSAGE_BATCH_MAX_DELAY_DEFAULT = 0
+
+cdef int g_processMessageBatchMaxId = 0
+# browserId => ProcessMessageBatch
+cdef dict g_processMessageBatches = {}
+cdef dict g_processMessageStatistics = {
+    "messages_sent": 0,
+    "ipc_messages_sent": 0,
+    "batches_sent": 0,
+    "batches_flushed_on_size_limit": 0,
+    "batches_dropped": 0,
+    "largest_batch": 0,
+}
+
+cdef class ProcessMessageBatch:
+    cdef int batchId
+    cdef int browserId
+    cdef int size
+    cdef CefRefPtr[CefProcessMessage] cefMessage
+    # Frame.EvaluateJavascript() futures are failed when the batch
+    # is dropped.
+    cdef list evaluationIds
+
+cdef cpp_bool IsProcessMessageBatchingEnabled() except *:
+    return bool(GetAppSetting("process_message_batching"))
+
+cdef int GetProcessMessageBatchSetting(py_string key, int default) except *:
+    cdef object value = GetAppSetting(key)
+    if value is None:
+        return default
+    return int(value)
+
+cdef void QueueProcessMessage(PyBrowser pyBrowser, object frameId,
+                              py_string messageName, list pyArguments
+                              ) except *:
+    # Arguments are converted immediately, so that later modifications
+    # of the python objects are not reflected in the message.
+    global g_processMessageBatchMaxId
+    cdef int browserId = pyBrowser.GetIdentifier()
+    cdef ProcessMessageBatch batch = g_processMessageBatches.get(browserId)
+    cdef int maxDelay
+    if batch is None:
+        g_processMessageBatchMaxId += 1
+        batch = ProcessMessageBatch()
+        batch.batchId = g_processMessageBatchMaxId
+        batch.browserId = browserId
+        batch.size = 0
+        batch.evaluationIds = []
+        batch.cefMessage = CefProcessMessage_Create(PyToCefStringValue(
+                "ProcessMessageBatch"))
+        g_processMessageBatches[browserId] = batch
+        maxDelay = GetProcessMessageBatchSetting(
+                "process_message_batch_max_delay",
+                PROCESS_MESSAGE_BATCH_MAX_DELAY_DEFAULT)
+        PostPythonTask(TID_UI, maxDelay, _ProcessMessageBatchTask,
+                       [browserId, batch.batchId])
+    cdef CefRefPtr[CefListValue] cefBatchArguments = \
+            batch.cefMessage.get().GetArgumentList()
+    cdef CefRefPtr[CefListValue] cefArguments = CefListValue_Create()
+    PyListToExistingCefListValue(browserId, frameId, pyArguments,
+                                 cefArguments)
+    cdef int index = batch.size * 2
+    cefBatchArguments.get().SetString(index, PyToCefStringValue(messageName))
+    cefBatchArguments.get().SetList(index + 1, cefArguments)
+    batch.size += 1
+    if messageName == "EvaluateJavascript":
+        batch.evaluationIds.append(pyArguments[1])
+    g_processMessageStatistics["messages_sent"] += 1
+    if batch.size >= GetProcessMessageBatchSetting(
+            "process_message_batch_max_size",
+            PROCESS_MESSAGE_BATCH_MAX_SIZE_DEFAULT):
+        g_processMessageStatistics["batches_flushed_on_size_limit"] += 1
+        FlushProcessMessageBatch(browserId)
+
+def _ProcessMessageBatchTask(int browserId, int batchId):
+    # Called on the UI thread through PostPythonTask(). The batch
+    # might have already been sent when it reached the size limit,
+    # in such case a newer batch must wait for its own task.
+    cdef ProcessMessageBatch batch = g_processMessageBatches.get(browserId)
+    if batch is not None and batch.batchId == batchId:
+        try:
+            FlushProcessMessageBatch(browserId)
+        except Exception as exc:
+            # Futures of the dropped messages were already failed,
+            # there is no caller to report the error to.
+            Error(str(exc))
+
+cdef void FlushPendingProcessMessages(int browserId) except *:
+    if browserId in g_processMessageBatches:
+        FlushProcessMessageBatch(browserId)
+
+cdef void FlushProcessMessageBatch(int browserId) except *:
+    cdef ProcessMessageBatch batch = g_processMessageBatches.pop(browserId,
+                                                                 None)
+    if batch is None or not batch.size:
+        return
+    cdef PyBrowser pyBrowser = GetPyBrowserById(browserId)
+    if not pyBrowser or not pyBrowser.cefBrowser.get():
+        # Browser was closed in the meantime.
+        Debug("FlushProcessMessageBatch(): browser not found, dropping %s"
+              " messages" % batch.size)
+        g_processMessageStatistics["batches_dropped"] += 1
+        FailJavascriptEvaluations(batch.evaluationIds, "browser closed")
+        return
+    Debug("FlushProcessMessageBatch(): batch size=%s" % batch.size)
+    cdef cpp_bool success = pyBrowser.GetCefBrowser().get().SendProcessMessage(
+            cef_types.PID_RENDERER, batch.cefMessage)
+    if not success:
+        g_processMessageStatistics["batches_dropped"] += 1
+        FailJavascriptEvaluations(batch.evaluationIds,
+                                  "process message was not sent")
+        raise Exception("Browser.SendProcessMessage() failed: "
+                        "messageName=ProcessMessageBatch")
+    g_processMessageStatistics["ipc_messages_sent"] += 1
+    g_processMessageStatistics["batches_sent"] += 1
+    if batch.size > g_processMessageStatistics["largest_batch"]:
+        g_processMessageStatistics["largest_batch"] = batch.size
+
+def GetProcessMessageStatistics():
+    return dict(g_processMessageStatistics)
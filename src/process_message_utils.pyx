@@ -11,6 +11,12 @@
 
 include "cefpython.pyx"
 
+cdef class CefDictionaryValueWrapper:
+    # A dictionary that was already converted to a CEF value, e.g.
+    # properties of JavascriptBindings. When found in python arguments
+    # of a process message it is copied without converting again.
+    cdef CefRefPtr[CefDictionaryValue] cefValue
+
 # -----------------------------------------------------------------------------
 # CEF values to Python values
 # -----------------------------------------------------------------------------
@@ -36,6 +42,98 @@ cdef object CheckForCefPythonMessageHash(CefRefPtr[CefBrowser] cefBrowser,
             return jsCallback
     return pyString
 
+cdef object CefBinaryValueToPyValue(
+        CefRefPtr[CefBrowser] cefBrowser,
+        CefRefPtr[CefBinaryValue] binaryValue):
+    cdef cef_types.uint32 uint32_value
+    cdef cef_types.int64 int64_value
+    # SharedMemoryReference: regionId, offset, length.
+    cdef cef_types.uint64 sharedMemoryReference[3]
+    if binaryValue.get().GetSize() == sizeof(uint32_value):
+        binaryValue.get().GetData(&uint32_value, sizeof(uint32_value), 0)
+        return uint32_value
+    elif binaryValue.get().GetSize() == sizeof(int64_value):
+        binaryValue.get().GetData(&int64_value, sizeof(int64_value), 0)
+        return int64_value
+    elif binaryValue.get().GetSize() == sizeof(sharedMemoryReference):
+        # Large string written by the Renderer process to shared
+        # memory, see shared_memory.pyx.
+        binaryValue.get().GetData(sharedMemoryReference,
+                                  sizeof(sharedMemoryReference), 0)
+        return ReadSharedMemoryString(cefBrowser.get().GetIdentifier(),
+                                      sharedMemoryReference[0],
+                                      sharedMemoryReference[1],
+                                      sharedMemoryReference[2])
+    raise Exception("Unknown binary value, size=%s" % \
+            binaryValue.get().GetSize())
+
+cdef void SkipSharedMemoryString(
+        CefRefPtr[CefBrowser] cefBrowser,
+        CefRefPtr[CefBinaryValue] binaryValue) except *:
+    cdef cef_types.uint64 sharedMemoryReference[3]
+    if binaryValue.get().GetSize() == sizeof(sharedMemoryReference):
+        binaryValue.get().GetData(sharedMemoryReference,
+                                  sizeof(sharedMemoryReference), 0)
+        GetSharedMemoryBlobStart(cefBrowser.get().GetIdentifier(),
+                                 sharedMemoryReference[0],
+                                 sharedMemoryReference[1],
+                                 sharedMemoryReference[2])
+
+cdef void SkipSharedMemoryStrings(
+        CefRefPtr[CefBrowser] cefBrowser,
+        CefRefPtr[CefListValue] cefListValue,
+        int nestingLevel=0) except *:
+    # Called for process messages that are dropped without converting
+    # their arguments, e.g. when a function or callback was not found,
+    # so that large strings they reference in shared memory are
+    # released.
+    if nestingLevel > 8:
+        return
+    cdef cef_types.cef_value_type_t valueType
+    cdef int index
+    for index in range(0, int(cefListValue.get().GetSize())):
+        valueType = cefListValue.get().GetType(index)
+        if valueType == cef_types.VTYPE_BINARY:
+            SkipSharedMemoryString(cefBrowser,
+                                   cefListValue.get().GetBinary(index))
+        elif valueType == cef_types.VTYPE_LIST:
+            SkipSharedMemoryStrings(cefBrowser,
+                                    cefListValue.get().GetList(index),
+                                    nestingLevel + 1)
+        elif valueType == cef_types.VTYPE_DICTIONARY:
+            SkipSharedMemoryStringsInDictionary(
+                    cefBrowser, cefListValue.get().GetDictionary(index),
+                    nestingLevel + 1)
+    if nestingLevel == 0:
+        CommitSharedMemoryReads()
+
+cdef void SkipSharedMemoryStringsInDictionary(
+        CefRefPtr[CefBrowser] cefBrowser,
+        CefRefPtr[CefDictionaryValue] cefDictionaryValue,
+        int nestingLevel) except *:
+    if nestingLevel > 8:
+        return
+    cdef cpp_vector[CefString] keyList
+    cefDictionaryValue.get().GetKeys(keyList)
+    cdef cpp_vector[CefString].iterator iterator = keyList.begin()
+    cdef CefString cefKey
+    cdef cef_types.cef_value_type_t valueType
+    while iterator != keyList.end():
+        cefKey = deref(iterator)
+        preinc(iterator)
+        valueType = cefDictionaryValue.get().GetType(cefKey)
+        if valueType == cef_types.VTYPE_BINARY:
+            SkipSharedMemoryString(cefBrowser,
+                                   cefDictionaryValue.get().GetBinary(cefKey))
+        elif valueType == cef_types.VTYPE_LIST:
+            SkipSharedMemoryStrings(cefBrowser,
+                                    cefDictionaryValue.get().GetList(cefKey),
+                                    nestingLevel + 1)
+        elif valueType == cef_types.VTYPE_DICTIONARY:
+            SkipSharedMemoryStringsInDictionary(
+                    cefBrowser, cefDictionaryValue.get().GetDictionary(cefKey),
+                    nestingLevel + 1)
+
 cdef list CefListValueToPyList(
         CefRefPtr[CefBrowser] cefBrowser,
         CefRefPtr[CefListValue] cefListValue,
@@ -48,9 +146,6 @@ cdef list CefListValueToPyList(
     cdef int size = int(cefListValue.get().GetSize())
     cdef cef_types.cef_value_type_t valueType
     cdef list ret = []
-    cdef CefRefPtr[CefBinaryValue] binaryValue
-    cdef cef_types.uint32 uint32_value
-    cdef cef_types.int64 int64_value
     cdef object originallyString
     for index in range(0, size):
         valueType = cefListValue.get().GetType(index)
@@ -79,20 +174,14 @@ cdef list CefListValueToPyList(
                     cefListValue.get().GetList(index),
                     nestingLevel + 1))
         elif valueType == cef_types.VTYPE_BINARY:
-            binaryValue = cefListValue.get().GetBinary(index)
-            if binaryValue.get().GetSize() == sizeof(uint32_value):
-                binaryValue.get().GetData(
-                        &uint32_value, sizeof(uint32_value), 0)
-                ret.append(uint32_value)
-            elif binaryValue.get().GetSize() == sizeof(int64_value):
-                binaryValue.get().GetData(
-                        &int64_value, sizeof(int64_value), 0)
-                ret.append(int64_value)
-            else:
-                raise Exception("Unknown binary value, size=%s" % \
-                        binaryValue.get().GetSize())
+            ret.append(CefBinaryValueToPyValue(
+                    cefBrowser,
+                    cefListValue.get().GetBinary(index)))
         else:
             raise Exception("Unknown value type=%s" % valueType)
+    if nestingLevel == 0:
+        # Release the shared memory blobs read for this message.
+        CommitSharedMemoryReads()
     return ret
 
 cdef dict CefDictionaryValueToPyDict(
@@ -110,9 +199,6 @@ cdef dict CefDictionaryValueToPyDict(
     cdef cpp_vector[CefString].iterator iterator = keyList.begin()
     cdef CefString cefKey
     cdef py_string pyKey
-    cdef CefRefPtr[CefBinaryValue] binaryValue
-    cdef cef_types.uint32 uint32_value
-    cdef cef_types.int64 int64_value
     cdef object originallyString
     while iterator != keyList.end():
         cefKey = deref(iterator)
@@ -144,18 +230,9 @@ cdef dict CefDictionaryValueToPyDict(
                     cefDictionaryValue.get().GetList(cefKey),
                     nestingLevel + 1)
         elif valueType == cef_types.VTYPE_BINARY:
-            binaryValue = cefDictionaryValue.get().GetBinary(cefKey)
-            if binaryValue.get().GetSize() == sizeof(uint32_value):
-                binaryValue.get().GetData(
-                        &uint32_value, sizeof(uint32_value), 0)
-                ret[pyKey] = uint32_value
-            elif binaryValue.get().GetSize() == sizeof(int64_value):
-                binaryValue.get().GetData(
-                        &int64_value, sizeof(int64_value), 0)
-                ret[pyKey] = int64_value
-            else:
-                raise Exception("Unknown binary value, size=%s" % \
-                        binaryValue.get().GetSize())
+            ret[pyKey] = CefBinaryValueToPyValue(
+                    cefBrowser,
+                    cefDictionaryValue.get().GetBinary(cefKey))
         else:
             raise Exception("Unknown value type = %s" % valueType)
     return ret
@@ -168,7 +245,9 @@ cdef CefRefPtr[CefListValue] PyListToCefListValue(
         int browserId,
         object frameId,
         list pyList,
-        int nestingLevel=0) except *:
+        int nestingLevel=0,
+        list notAllowedTypes=None) except *:
+    # See PyDictToCefDictionaryValue() for notAllowedTypes.
     if nestingLevel > 8:
         raise Exception("PyListToCefListValue(): max nesting level (8)"
                 " exceeded")
@@ -203,12 +282,19 @@ cdef CefRefPtr[CefListValue] PyListToCefListValue(
             ret.get().SetString(index, PyToCefStringValue(str(value)))
         elif valueType == dict:
             ret.get().SetDictionary(index, PyDictToCefDictionaryValue(
-                    browserId, frameId, value, nestingLevel + 1))
+                    browserId, frameId, value, nestingLevel + 1,
+                    notAllowedTypes))
         elif valueType == list or valueType == tuple:
             if valueType == tuple:
                 value = list(value)
             ret.get().SetList(index, PyListToCefListValue(
-                    browserId, frameId, value, nestingLevel + 1))
+                    browserId, frameId, value, nestingLevel + 1,
+                    notAllowedTypes))
+        elif valueType == CefDictionaryValueWrapper:
+            ret.get().SetDictionary(index, (<CefDictionaryValueWrapper>value)
+                    .cefValue.get().Copy(False))
+        elif notAllowedTypes is not None:
+            notAllowedTypes.append(valueType.__name__)
         elif IsFunctionOrMethod(valueType):
             ret.get().SetBinary(index, PutPythonCallback(
                     browserId, frameId, value))
@@ -271,6 +357,10 @@ cdef void PyListToExistingCefListValue(
             PyListToExistingCefListValue(browserId, frameId, value,
                     newCefListValue, nestingLevel + 1)
             cefListValue.get().SetList(index, newCefListValue)
+        elif valueType == CefDictionaryValueWrapper:
+            cefListValue.get().SetDictionary(index,
+                    (<CefDictionaryValueWrapper>value).cefValue.get()
+                    .Copy(False))
         elif IsFunctionOrMethod(valueType):
             cefListValue.get().SetBinary(index, PutPythonCallback(
                         browserId, frameId, value))
@@ -286,7 +376,11 @@ cdef CefRefPtr[CefDictionaryValue] PyDictToCefDictionaryValue(
         int browserId,
         object frameId,
         dict pyDict,
-        int nestingLevel=0) except *:
+        int nestingLevel=0,
+        list notAllowedTypes=None) except *:
+    # When notAllowedTypes is a list, functions and values of other
+    # types that can't be converted are not sent, e.g. properties of
+    # JavascriptBindings, names of their types are appended to the list.
     if nestingLevel > 8:
         raise Exception("PyDictToCefDictionaryValue(): max nesting level (8)"
                 " exceeded")
@@ -322,12 +416,19 @@ cdef CefRefPtr[CefDictionaryValue] PyDictToCefDictionaryValue(
             ret.get().SetString(cefKey, PyToCefStringValue(str(value)))
         elif valueType == dict:
             ret.get().SetDictionary(cefKey, PyDictToCefDictionaryValue(
-                    browserId, frameId, value, nestingLevel + 1))
+                    browserId, frameId, value, nestingLevel + 1,
+                    notAllowedTypes))
         elif valueType == list or valueType == tuple:
             if valueType == tuple:
                 value = list(value)
             ret.get().SetList(cefKey, PyListToCefListValue(
-                    browserId, frameId, value, nestingLevel + 1))
+                    browserId, frameId, value, nestingLevel + 1,
+                    notAllowedTypes))
+        elif valueType == CefDictionaryValueWrapper:
+            ret.get().SetDictionary(cefKey, (<CefDictionaryValueWrapper>value)
+                    .cefValue.get().Copy(False))
+        elif notAllowedTypes is not None:
+            notAllowedTypes.append(valueType.__name__)
         elif IsFunctionOrMethod(valueType):
             ret.get().SetBinary(cefKey, PutPythonCallback(
                     browserId, frameId, value))
@@ -5,7 +5,27 @@
 include "cefpython.pyx"
 
 cdef int g_pythonCallbackMaxId = 0
+# callbackId => (browserId, frameId, function)
 cdef dict g_pythonCallbacks = {}
+# Secondary indexes, so that callbacks of a frame or browser are removed
+# without scanning all callbacks.
+# (browserId, frameId) => OrderedDict(callbackId => time of last use),
+# least recently used callbacks come first.
+cdef dict g_pythonCallbacksByFrame = {}
+# browserId => set of frameIds
+cdef dict g_pythonCallbackFramesByBrowser = {}
+# "python_callback_ttl" and "python_callbacks_per_frame_limit" settings,
+# read in Initialize().
+cdef object g_pythonCallbackTtl = None
+cdef object g_pythonCallbacksPerFrameLimit = None
+cdef dict g_pythonCallbackStats = {
+    "created": 0,
+    "executed": 0,
+    "not_found": 0,
+    "removed": 0,
+    "evicted_limit": 0,
+    "evicted_ttl": 0,
+}
 
 # TODO: send callbackId using CefBinaryNamedValue, see:
 # http://www.magpcss.org/ceforum/viewtopic.php?f=6&t=10881
@@ -31,62 +51,128 @@ cdef CefRefPtr[CefBinaryValue] PutPythonCallback(
             &pyCallback, sizeof(pyCallback))
     # [0] browserId, [1] frameId, [2] function.
     g_pythonCallbacks[g_pythonCallbackMaxId] = (browserId, frameId, function)
+    cdef object frameCallbacks = g_pythonCallbacksByFrame.get(
+            (browserId, frameId))
+    if frameCallbacks is None:
+        frameCallbacks = collections.OrderedDict()
+        g_pythonCallbacksByFrame[(browserId, frameId)] = frameCallbacks
+        g_pythonCallbackFramesByBrowser.setdefault(browserId, set()).add(
+                frameId)
+    frameCallbacks[g_pythonCallbackMaxId] = time.time()
+    g_pythonCallbackStats["created"] += 1
+    EvictPythonCallbacks(frameCallbacks)
     return binaryValue
 
+cdef void InitPythonCallbackSettings() except *:
+    # Called from Initialize().
+    global g_pythonCallbackTtl
+    global g_pythonCallbacksPerFrameLimit
+    g_pythonCallbackTtl = GetAppSetting("python_callback_ttl")
+    g_pythonCallbacksPerFrameLimit = GetAppSetting(
+            "python_callbacks_per_frame_limit")
+
+cdef void EvictPythonCallbacks(object frameCallbacks) except *:
+    # Callbacks of a frame are evicted when not used for longer than the
+    # "python_callback_ttl" setting (seconds) and when there are more
+    # than "python_callbacks_per_frame_limit", least recently used first.
+    # Both are disabled by default, callbacks then live until the frame
+    # is released.
+    cdef object ttl = g_pythonCallbackTtl
+    cdef object limit = g_pythonCallbacksPerFrameLimit
+    cdef object expired
+    cdef object callbackId
+    if ttl:
+        expired = time.time() - ttl
+        while frameCallbacks:
+            callbackId = next(iter(frameCallbacks))
+            if frameCallbacks[callbackId] > expired:
+                break
+            del frameCallbacks[callbackId]
+            del g_pythonCallbacks[callbackId]
+            g_pythonCallbackStats["evicted_ttl"] += 1
+    if limit:
+        while len(frameCallbacks) > limit:
+            callbackId = next(iter(frameCallbacks))
+            del frameCallbacks[callbackId]
+            del g_pythonCallbacks[callbackId]
+            g_pythonCallbackStats["evicted_limit"] += 1
+
+cdef void RemovePythonCallbacks(int browserId, object frameId) except *:
+    cdef object frameCallbacks = g_pythonCallbacksByFrame.pop(
+            (browserId, frameId), None)
+    if frameCallbacks is None:
+        return
+    for callbackId in frameCallbacks:
+        del g_pythonCallbacks[callbackId]
+    g_pythonCallbackStats["removed"] += len(frameCallbacks)
+    if frameCallbacks:
+        Debug("RemovePythonCallbacks(): removed %s python callbacks, " \
+                "frameId = %s" % (len(frameCallbacks), frameId))
+
 cdef public void RemovePythonCallbacksForFrame(
-        int frameId
+        CefRefPtr[CefBrowser] cefBrowser,
+        cef_types.int64 frameId
         ) except * with gil:
-    # Cannot remove elements from g_pythonCallbacks (dict) while iterating.
-    cdef list toRemove = []
+    cdef int browserId
+    cdef set frameIds
     try:
-        global g_pythonCallbacks
-        for callbackId, value in g_pythonCallbacks.iteritems():
-            if value[1] == frameId:
-                toRemove.append(callbackId)
-        for callbackId in toRemove:
-            del g_pythonCallbacks[callbackId]
-            Debug("RemovePythonCallbacksForFrame(): " \
-                    "removed python callback, callbackId = %s" \
-                    % callbackId)
+        browserId = cefBrowser.get().GetIdentifier()
+        frameIds = g_pythonCallbackFramesByBrowser.get(browserId)
+        if frameIds is not None:
+            frameIds.discard(frameId)
+            if not frameIds:
+                del g_pythonCallbackFramesByBrowser[browserId]
+        RemovePythonCallbacks(browserId, frameId)
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
 
 cdef void RemovePythonCallbacksForBrowser(
         int browserId) except *:
-    cdef list toRemove = []
-    global g_pythonCallbacks
-    for callbackId, value in g_pythonCallbacks.iteritems():
-        if value[0] == browserId:
-            toRemove.append(callbackId)
-    for callbackId in toRemove:
-        del g_pythonCallbacks[callbackId]
-        Debug("RemovePythonCallbacksForBrowser(): " \
-                "removed python callback, callbackId = %s" \
-                % callbackId)
+    cdef set frameIds = g_pythonCallbackFramesByBrowser.pop(browserId, None)
+    if frameIds is None:
+        return
+    for frameId in frameIds:
+        RemovePythonCallbacks(browserId, frameId)
+
+def GetPythonCallbackStatistics():
+    cdef dict stats = dict(g_pythonCallbackStats)
+    stats["count"] = len(g_pythonCallbacks)
+    stats["frames"] = len(g_pythonCallbacksByFrame)
+    return stats
 
 cdef public cpp_bool ExecutePythonCallback(
         CefRefPtr[CefBrowser] cefBrowser,
         int callbackId, 
         CefRefPtr[CefListValue] cefFunctionArguments,
         ) except * with gil:
+    cdef tuple entry
+    cdef object frameCallbacks
     cdef object function
-    cdef list functionArguments
     cdef object returnValue
     try:
         global g_pythonCallbacks
         if callbackId in g_pythonCallbacks:
             # [0] browserId, [1] frameId, [2] function.
-            function = g_pythonCallbacks[callbackId][2]
-            functionArguments = CefListValueToPyList(
-                    cefBrowser, cefFunctionArguments)
-            returnValue = function(*functionArguments)
+            entry = g_pythonCallbacks[callbackId]
+            function = entry[2]
+            # Move to the end of the frame's LRU order.
+            frameCallbacks = g_pythonCallbacksByFrame[(entry[0], entry[1])]
+            del frameCallbacks[callbackId]
+            frameCallbacks[callbackId] = time.time()
+            g_pythonCallbackStats["executed"] += 1
+            returnValue = function(*CefListValueToPyList(
+                    cefBrowser, cefFunctionArguments))
+            ScheduleJavascriptCallbacksRelease()
             if returnValue is not None:
                 Debug("ExecutePythonCallback() WARNING: function returned" \
                         "value, but returning values to javascript is not " \
                         "supported, function name = %s" % function.__name__)
             return True
         else:
+            # Callback was evicted or its frame was released.
+            g_pythonCallbackStats["not_found"] += 1
+            SkipSharedMemoryStrings(cefBrowser, cefFunctionArguments)
             Debug("ExecutePythonCallback() FAILED: callback not found, " \
                     "callbackId = %s" % callbackId)
             return False
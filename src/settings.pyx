@@ -36,7 +36,14 @@ cdef void SetApplicationSettings(
                 or key == "unique_request_context_per_browser"\
                 or key == "downloads_enabled"\
                 or key == "context_menu" \
-                or key == "auto_zooming":
+                or key == "auto_zooming" \
+                or key == "process_message_batching" \
+                or key == "process_message_batch_max_size" \
+                or key == "process_message_batch_max_delay" \
+                or key == "shared_memory_size" \
+                or key == "shared_memory_threshold" \
+                or key == "python_callback_ttl" \
+                or key == "python_callbacks_per_frame_limit":
             # CEF Python only options. These are not to be found in CEF.
             continue
         elif key == "accept_language_list":
@@ -0,0 +1,223 @@
+# Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+# Optional shared memory side channel, enabled with the
+# "shared_memory_size" application setting, extra_info [2] tells the
+# Renderer process that it is enabled. A region is created lazily for
+# a renderer process, when the first browser created in it sends the
+# "CreateSharedMemory" message. The region is sent back in the
+# "SharedMemoryCreated" message [regionId, name, size, threshold].
+# Renderer processes without browsers, e.g. spare ones, don't get
+# a region. Strings longer than the threshold that are sent from
+# javascript to Python (arguments of bound functions and callbacks) are
+# written by the Renderer process to a ring buffer in the region, only
+# a binary reference with offset and length travels in the process
+# message, see subprocess/shared_memory.cpp for the layout. Javascript
+# values are never converted to a binary value of that size, so a page
+# can't forge a reference. The Renderer process sends the regionId for
+# other browsers created in it in the "SharedMemoryAttached" message.
+# A region is released when its renderer process terminates or when
+# the last of its browsers is closed.
+
+include "cefpython.pyx"
+
+cdef int SHARED_MEMORY_HEADER_SIZE = 64
+cdef int SHARED_MEMORY_THRESHOLD_DEFAULT = 65536
+
+cdef int g_sharedMemoryMaxId = 0
+# regionId => (mmap object, name)
+cdef dict g_sharedMemoryRegions = {}
+# regionId => set of browserIds
+cdef dict g_sharedMemoryRegionBrowsers = {}
+# browserId => regionId
+cdef dict g_sharedMemoryBrowserRegions = {}
+# regionId => read position to commit after the message is converted
+cdef dict g_sharedMemoryReadPositions = {}
+
+cdef void SetSharedMemoryExtraInfo(CefRefPtr[CefListValue] extra_info
+                                   ) except *:
+    # Called on the IO thread.
+    if GetSharedMemorySize():
+        extra_info.get().SetBool(2, True)
+
+cdef object GetSharedMemorySize():
+    cdef object size = GetAppSetting("shared_memory_size")
+    if not size:
+        return 0
+    size = int(size)
+    if size <= SHARED_MEMORY_HEADER_SIZE:
+        raise Exception("Invalid shared_memory_size setting, it must be"
+                        " greater than %s" % SHARED_MEMORY_HEADER_SIZE)
+    return size
+
+cdef void CreateSharedMemoryRegion(PyBrowser pyBrowser) except *:
+    # Called when a browser in a renderer process without a region
+    # was created.
+    global g_sharedMemoryMaxId
+    cdef object size = GetSharedMemorySize()
+    if not size:
+        return
+    cdef object threshold = GetAppSetting("shared_memory_threshold")
+    if threshold is None:
+        threshold = SHARED_MEMORY_THRESHOLD_DEFAULT
+    g_sharedMemoryMaxId += 1
+    cdef int regionId = g_sharedMemoryMaxId
+    cdef py_string name = "cefpython_%s_%s" % (os.getpid(), regionId)
+    cdef object memory
+    cdef int fd
+    if platform.system() == "Windows":
+        # Named file mapping backed by the paging file.
+        memory = mmap.mmap(-1, size, tagname=name)
+    else:
+        if os.path.isdir("/dev/shm"):
+            name = os.path.join("/dev/shm", name)
+        else:
+            name = os.path.join(tempfile.gettempdir(), name)
+        fd = os.open(name, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            os.ftruncate(fd, size)
+            memory = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+    g_sharedMemoryRegions[regionId] = (memory, name)
+    AttachBrowserToSharedMemoryRegion(pyBrowser.GetIdentifier(), regionId)
+    Debug("CreateSharedMemoryRegion(): %s" % name)
+    pyBrowser.SendProcessMessage(cef_types.PID_RENDERER, 0,
+                                 "SharedMemoryCreated",
+                                 [regionId, name, int(size), int(threshold)])
+
+cdef object GetSharedMemoryBlobStart(int browserId, object regionId,
+                                     object offset, object length):
+    # Validates a reference from a process message and returns offset
+    # of the blob in the region. Messages from a renderer arrive in
+    # order, the blob and all blobs before it are released once the
+    # whole message is converted, see CommitSharedMemoryReads().
+    # Dictionary keys are not converted in the order the blobs were
+    # written, so the read position can't be moved here.
+    cdef tuple region = g_sharedMemoryRegions.get(regionId)
+    if not region \
+            or g_sharedMemoryBrowserRegions.get(browserId) != regionId:
+        raise Exception("ReadSharedMemoryString() failed: region not"
+                        " found, regionId=%s" % regionId)
+    cdef object memory = region[0]
+    cdef object capacity = len(memory) - SHARED_MEMORY_HEADER_SIZE
+    cdef object writePosition = struct.unpack_from("<Q", memory, 0)[0]
+    cdef object readPosition = struct.unpack_from("<Q", memory, 8)[0]
+    # A blob is never split and must be between the read and write
+    # positions, otherwise the reference is not valid.
+    if offset < readPosition or offset + length > writePosition \
+            or offset % capacity + length > capacity:
+        raise Exception("ReadSharedMemoryString() failed: invalid"
+                        " reference, regionId=%s, offset=%s, length=%s"
+                        % (regionId, offset, length))
+    if offset + length > g_sharedMemoryReadPositions.get(regionId, 0):
+        g_sharedMemoryReadPositions[regionId] = offset + length
+    return SHARED_MEMORY_HEADER_SIZE + offset % capacity
+
+cdef py_string ReadSharedMemoryString(int browserId, object regionId,
+                                      object offset, object length):
+    # Called when converting a process message.
+    cdef object start = GetSharedMemoryBlobStart(browserId, regionId,
+                                                 offset, length)
+    cdef bytes data = g_sharedMemoryRegions[regionId][0][
+            start:start + length]
+    # Same as CefToPyString(), the Renderer process writes UTF-8.
+    if PY_MAJOR_VERSION < 3:
+        return data
+    return data.decode(g_applicationSettings["string_encoding"],
+                       errors=BYTES_DECODE_ERRORS)
+
+cdef void CommitSharedMemoryReads() except *:
+    # Called after a process message was converted or skipped, see
+    # SkipSharedMemoryStrings().
+    cdef tuple region
+    for regionId, readPosition in g_sharedMemoryReadPositions.items():
+        region = g_sharedMemoryRegions.get(regionId)
+        if region:
+            struct.pack_into("<Q", region[0], 8, readPosition)
+    g_sharedMemoryReadPositions.clear()
+
+cdef void AttachBrowserToSharedMemoryRegion(int browserId, int regionId
+                                            ) except *:
+    cdef object oldRegionId = g_sharedMemoryBrowserRegions.get(browserId)
+    if oldRegionId == regionId:
+        return
+    if oldRegionId is not None:
+        # Cross-site navigation may move the browser to another
+        # renderer process.
+        RemoveSharedMemoryForBrowser(browserId)
+    if regionId not in g_sharedMemoryRegions:
+        return
+    g_sharedMemoryBrowserRegions[browserId] = regionId
+    g_sharedMemoryRegionBrowsers.setdefault(regionId, set()).add(browserId)
+
+cdef void RemoveSharedMemoryForBrowser(int browserId) except *:
+    # Called when a browser is closed. The region is released when
+    # no browser is using it anymore.
+    cdef object regionId = g_sharedMemoryBrowserRegions.pop(browserId, None)
+    if regionId is None:
+        return
+    cdef set browserIds = g_sharedMemoryRegionBrowsers.get(regionId)
+    if browserIds is not None:
+        browserIds.discard(browserId)
+        if not browserIds:
+            ReleaseSharedMemoryRegion(regionId)
+
+cdef void ReleaseSharedMemoryForBrowser(int browserId) except *:
+    # Called when the renderer process of the browser terminated,
+    # the region is no more used by any browser.
+    cdef object regionId = g_sharedMemoryBrowserRegions.get(browserId)
+    if regionId is not None:
+        ReleaseSharedMemoryRegion(regionId)
+
+cdef void ReleaseSharedMemoryRegion(int regionId) except *:
+    cdef set browserIds = g_sharedMemoryRegionBrowsers.pop(regionId, set())
+    for browserId in browserIds:
+        g_sharedMemoryBrowserRegions.pop(browserId, None)
+    g_sharedMemoryReadPositions.pop(regionId, None)
+    cdef tuple region = g_sharedMemoryRegions.pop(regionId, None)
+    if not region:
+        return
+    region[0].close()
+    if platform.system() != "Windows":
+        try:
+            os.unlink(region[1])
+        except OSError:
+            pass
+    Debug("ReleaseSharedMemoryRegion(): %s" % region[1])
+
+cdef public void SharedMemory_OnCreate(
+        CefRefPtr[CefBrowser] cefBrowser
+        ) except * with gil:
+    cdef PyBrowser pyBrowser
+    try:
+        pyBrowser = GetPyBrowser(cefBrowser)
+        if pyBrowser:
+            CreateSharedMemoryRegion(pyBrowser)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void SharedMemory_OnAttached(
+        CefRefPtr[CefBrowser] cefBrowser,
+        int regionId
+        ) except * with gil:
+    try:
+        AttachBrowserToSharedMemoryRegion(cefBrowser.get().GetIdentifier(),
+                                          regionId)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef void CloseSharedMemoryRegions() except *:
+    # Called from Shutdown().
+    for regionId, region in g_sharedMemoryRegions.items():
+        region[0].close()
+        if platform.system() != "Windows":
+            try:
+                os.unlink(region[1])
+            except OSError:
+                pass
+    g_sharedMemoryRegions.clear()
+    g_sharedMemoryRegionBrowsers.clear()
+    g_sharedMemoryBrowserRegions.clear()
+    g_sharedMemoryReadPositions.clear()
@@ -0,0 +1,178 @@
+# Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+# Chunked streaming of large strings between Python and javascript,
+# see Frame.SendStream() and Frame.ReceiveStream(). Only one chunk
+# per stream is in flight at a time and each chunk is a separate
+# process message, so converting a large payload does not block
+# the UI thread for a long time.
+#
+# Python to javascript: "StreamOpen" message [frameId, streamId,
+# functionName, True, 0], javascript function is called with a reader
+# object. Each reader.read() sends the "StreamRead" message [streamId]
+# and the next chunk is sent in the "StreamChunk" message [streamId,
+# chunk, done].
+#
+# Javascript to Python: "StreamOpen" message [frameId, streamId,
+# functionName, False, chunkSize], javascript function is called with
+# a writer object. The Renderer process splits written data into chunks
+# and sends them in the "StreamWrite" message [streamId, chunk, done].
+# The next chunk is sent after the Python callback returned and the
+# "StreamWriteAck" message [streamId] was sent.
+
+include "cefpython.pyx"
+
+cdef int g_streamMaxId = 0
+# streamId => Stream
+cdef dict g_streams = {}
+
+cdef class Stream:
+    cdef int streamId
+    cdef int browserId
+    cdef object frameId
+    cdef py_string funcName
+    # Frame.SendStream()
+    cdef object data
+    # Python integer, payloads may be larger than 2 GiB.
+    cdef object offset
+    cdef int chunkSize
+    # Frame.ReceiveStream()
+    cdef object callback
+    cdef object future
+
+cdef Stream OpenStreamInFrame(PyFrame pyFrame, py_string callerName,
+                              py_string funcName, object data,
+                              object callback, int chunkSize):
+    global g_streamMaxId
+    if chunkSize < 1:
+        raise Exception("%s failed: chunkSize must be greater than zero"
+                        % callerName)
+    cdef PyBrowser pyBrowser = pyFrame.GetBrowser()
+    if not pyBrowser:
+        raise Exception("%s failed: browser not found" % callerName)
+    if type(data) == bytes:
+        # Slicing bytes could split a multi-byte UTF-8 sequence between
+        # chunks. Unicode strings are split by characters, surrogate
+        # pairs are handled by the Renderer process.
+        data = data.decode(g_applicationSettings["string_encoding"],
+                           errors=BYTES_DECODE_ERRORS)
+    g_streamMaxId += 1
+    cdef Stream stream = Stream()
+    stream.streamId = g_streamMaxId
+    stream.browserId = pyFrame.GetBrowserIdentifier()
+    stream.frameId = pyFrame.GetIdentifier()
+    stream.funcName = funcName
+    stream.data = data
+    stream.offset = 0
+    stream.chunkSize = chunkSize
+    stream.callback = callback
+    stream.future = CreateFuture(callerName)
+    g_streams[stream.streamId] = stream
+    try:
+        pyBrowser.SendProcessMessage(
+                cef_types.PID_RENDERER,
+                stream.frameId,
+                "StreamOpen",
+                [stream.frameId, stream.streamId, funcName,
+                 data is not None, chunkSize if data is None else 0])
+    except:
+        del g_streams[stream.streamId]
+        raise
+    return stream
+
+cdef void CloseStream(Stream stream, object exception) except *:
+    g_streams.pop(stream.streamId, None)
+    if exception is None:
+        SetFutureResult(stream.future, None)
+    else:
+        SetFutureException(stream.future, exception)
+
+cdef void RemoveStreamsForFrame(int browserId, object frameId) except *:
+    # Called from V8ContextHandler_OnContextReleased().
+    cdef Stream stream
+    for stream in list(g_streams.values()):
+        if stream.browserId == browserId and stream.frameId == frameId:
+            CloseStream(stream, Exception("Stream \"%s\" failed: V8 context"
+                                          " released" % stream.funcName))
+
+cdef void RemoveStreamsForBrowser(int browserId) except *:
+    # Called from LifespanHandler_OnBeforeClose().
+    cdef Stream stream
+    for stream in list(g_streams.values()):
+        if stream.browserId == browserId:
+            CloseStream(stream, Exception("Stream \"%s\" failed: browser"
+                                          " closed" % stream.funcName))
+
+cdef public void Stream_OnRead(
+        CefRefPtr[CefBrowser] cefBrowser,
+        int streamId
+        ) except * with gil:
+    cdef Stream stream
+    cdef PyBrowser pyBrowser
+    cdef object chunk
+    cdef py_bool done
+    try:
+        stream = g_streams.get(streamId)
+        if not stream or stream.data is None \
+                or stream.browserId != cefBrowser.get().GetIdentifier():
+            Debug("Stream_OnRead(): stream not found, streamId=%s"
+                  % streamId)
+            return
+        pyBrowser = GetPyBrowser(cefBrowser)
+        chunk = stream.data[stream.offset:stream.offset + stream.chunkSize]
+        stream.offset += stream.chunkSize
+        done = stream.offset >= len(stream.data)
+        if done:
+            CloseStream(stream, None)
+        pyBrowser.SendProcessMessage(cef_types.PID_RENDERER, stream.frameId,
+                                     "StreamChunk", [streamId, chunk, done])
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void Stream_OnWrite(
+        CefRefPtr[CefBrowser] cefBrowser,
+        int streamId,
+        const CefString& cefChunk,
+        cpp_bool done
+        ) except * with gil:
+    cdef Stream stream
+    cdef PyBrowser pyBrowser
+    try:
+        stream = g_streams.get(streamId)
+        if not stream or stream.callback is None \
+                or stream.browserId != cefBrowser.get().GetIdentifier():
+            Debug("Stream_OnWrite(): stream not found, streamId=%s"
+                  % streamId)
+            return
+        try:
+            stream.callback(CefToPyString(cefChunk), bool(done))
+        except:
+            CloseStream(stream, sys.exc_info()[1])
+            raise
+        if done:
+            CloseStream(stream, None)
+        else:
+            # Renderer sends the next chunk only after this ack.
+            pyBrowser = GetPyBrowser(cefBrowser)
+            pyBrowser.SendProcessMessage(cef_types.PID_RENDERER,
+                                         stream.frameId, "StreamWriteAck",
+                                         [streamId])
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void Stream_OnCancel(
+        CefRefPtr[CefBrowser] cefBrowser,
+        int streamId,
+        const CefString& cefReason
+        ) except * with gil:
+    cdef Stream stream
+    try:
+        stream = g_streams.get(streamId)
+        if stream and stream.browserId == cefBrowser.get().GetIdentifier():
+            CloseStream(stream, Exception("Stream \"%s\" failed: %s"
+                                          % (stream.funcName,
+                                             CefToPyString(cefReason))))
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
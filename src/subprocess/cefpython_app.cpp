@@ -19,6 +19,9 @@
 #include <algorithm>
 #include "v8utils.h"
 #include "javascript_callback.h"
+#include "channel.h"
+#include "stream.h"
+#include "shared_memory.h"
 #include "v8function_handler.h"
 
 #ifdef BROWSER_PROCESS
@@ -121,7 +124,8 @@ void CefPythonApp::OnRenderProcessThreadCreated(
     extra_info->SetBool(0, g_debug);
     extra_info->SetString(1, g_logFile);
     // This is included only in the Browser process, when building
-    // the libcefpythonapp library.
+    // the libcefpythonapp library. Keys 2-5 are set there when
+    // shared memory is enabled, see shared_memory.pyx.
     BrowserProcessHandler_OnRenderProcessThreadCreated(extra_info);
 #endif // BROWSER_PROCESS
 }
@@ -136,6 +140,9 @@ void CefPythonApp::OnScheduleMessagePumpWork(int64 delay_ms) {
             MainMessageLoopExternalPump::Get();
     if (message_pump) {
         message_pump->OnScheduleMessagePumpWork(delay_ms);
+    } else {
+        // Pump driven by a Python scheduler, e.g. an asyncio loop.
+        App_OnScheduleMessagePumpWork(delay_ms);
     }
 #endif // BROWSER_PROCESS
 }
@@ -158,6 +165,7 @@ void CefPythonApp::OnRenderThreadCreated(CefRefPtr<CefListValue> extra_info) {
     if (extra_info->GetType(1) == VTYPE_STRING) {
         g_logFile = extra_info->GetString(1).ToString();
     }
+    InitSharedMemory(extra_info);
     if (!commandLineString_.empty()) {
         // See comment in OnBeforeCommandLineProcessing().
         DebugLog(commandLineString_.c_str());
@@ -169,6 +177,7 @@ void CefPythonApp::OnWebKitInitialized() {
 }
 
 void CefPythonApp::OnBrowserCreated(CefRefPtr<CefBrowser> browser) {
+    SendSharedMemoryAttached(browser);
 }
 
 void CefPythonApp::OnBrowserDestroyed(CefRefPtr<CefBrowser> browser) {
@@ -263,13 +272,17 @@ void CefPythonApp::OnContextReleased(CefRefPtr<CefBrowser> browser,
     // we're calling RemovePythonCallbacksForBrowser().
     message = CefProcessMessage::Create("RemovePythonCallbacksForFrame");
     arguments = message->GetArgumentList();
-    // TODO: int64 precision lost
-    arguments->SetInt(0, (int)(frame->GetIdentifier()));
+    // Frame id is int64, sent as a binary value.
+    int64 frameId = frame->GetIdentifier();
+    arguments->SetBinary(0, CefBinaryValue::Create(&frameId,
+                                                   sizeof(frameId)));
     browser->SendProcessMessage(PID_BROWSER, message);
     // ------------------------------------------------------------------------
     // 3. Clear javascript callbacks.
     // ------------------------------------------------------------------------
     RemoveJavascriptCallbacksForFrame(frame);
+    RemoveChannelSubscriptionsForFrame(frame);
+    RemoveStreamsForFrame(frame);
 }
 
 void CefPythonApp::OnUncaughtException(CefRefPtr<CefBrowser> browser,
@@ -292,7 +305,33 @@ bool CefPythonApp::OnProcessMessageReceived(CefRefPtr<CefBrowser> browser,
     logMessage.append(messageName.c_str());
     DebugLog(logMessage.c_str());
     CefRefPtr<CefListValue> args = message->GetArgumentList();
-    if (messageName == "DoJavascriptBindings") {
+    if (messageName == "ProcessMessageBatch") {
+        // Messages batched in the browser process, see
+        // process_message_batch.pyx. Arguments are pairs of
+        // message name and message arguments, handle them in order.
+        if (args->GetSize() % 2 != 0) {
+            DebugLog("Renderer: OnProcessMessageReceived(): invalid arguments,"\
+                    " messageName=ProcessMessageBatch");
+            return false;
+        }
+        for (size_t i = 0; i < args->GetSize(); i += 2) {
+            if (args->GetType(i) != VTYPE_STRING
+                    || args->GetType(i + 1) != VTYPE_LIST) {
+                DebugLog("Renderer: OnProcessMessageReceived(): invalid"\
+                        " batched message, messageName=ProcessMessageBatch");
+                continue;
+            }
+            CefRefPtr<CefProcessMessage> batchedMessage = \
+                    CefProcessMessage::Create(args->GetString(i));
+            CefRefPtr<CefListValue> batchedArgs = \
+                    batchedMessage->GetArgumentList();
+            CefRefPtr<CefListValue> sourceArgs = args->GetList(i + 1);
+            for (size_t j = 0; j < sourceArgs->GetSize(); j++) {
+                batchedArgs->SetValue(j, sourceArgs->GetValue(j));
+            }
+            OnProcessMessageReceived(browser, source_process, batchedMessage);
+        }
+    } else if (messageName == "DoJavascriptBindings") {
         if (args->GetSize() == 1
                 && args->GetType(0) == VTYPE_DICTIONARY
                 && args->GetDictionary(0)->IsValid()) {
@@ -305,6 +344,22 @@ bool CefPythonApp::OnProcessMessageReceived(CefRefPtr<CefBrowser> browser,
                     " messageName=DoJavascriptBindings");
             return false;
         }
+    } else if (messageName == "JavascriptBindingsPatch") {
+        // Sent by JavascriptBindings.Rebind() when only some names
+        // changed since the full bindings were sent.
+        if (args->GetSize() == 1
+                && args->GetType(0) == VTYPE_DICTIONARY
+                && args->GetDictionary(0)->IsValid()) {
+            CefRefPtr<CefDictionaryValue> patch = \
+                    args->GetDictionary(0)->Copy(false);
+            if (PatchJavascriptBindings(browser, patch)) {
+                DoJavascriptBindingsForBrowser(browser, patch);
+            }
+        } else {
+            DebugLog("Renderer: OnProcessMessageReceived(): invalid arguments,"\
+                    " messageName=JavascriptBindingsPatch");
+            return false;
+        }
     } else if (messageName == "ExecuteJavascriptCallback") {
         if (args->GetType(0) == VTYPE_INT) {
             int jsCallbackId = args->GetInt(0);
@@ -323,10 +378,211 @@ bool CefPythonApp::OnProcessMessageReceived(CefRefPtr<CefBrowser> browser,
                     "(int)");
             return false;
         }
+    } else if (messageName == "ReleaseJavascriptCallbacks") {
+        if (args->GetSize() == 1 && args->GetType(0) == VTYPE_LIST) {
+            CefRefPtr<CefListValue> callbackIds = args->GetList(0);
+            for (size_t i = 0; i < callbackIds->GetSize(); i++) {
+                if (callbackIds->GetType(i) == VTYPE_INT) {
+                    ReleaseJavascriptCallback(callbackIds->GetInt(i));
+                }
+            }
+        } else {
+            DebugLog("Renderer: OnProcessMessageReceived(): invalid arguments,"\
+                    " messageName=ReleaseJavascriptCallbacks");
+            return false;
+        }
+    } else if (messageName == "EvaluateJavascript") {
+        if (args->GetSize() == 3
+                && args->GetType(0) == VTYPE_INT // frameId
+                && args->GetType(1) == VTYPE_INT // evaluationId
+                && args->GetType(2) == VTYPE_STRING) { // code
+            EvaluateJavascript(browser, args->GetInt(0), args->GetInt(1),
+                               args->GetString(2));
+        } else {
+            DebugLog("Renderer: OnProcessMessageReceived(): invalid arguments,"\
+                    " messageName=EvaluateJavascript");
+            return false;
+        }
+    } else if (messageName == "ChannelDelivery") {
+        if (args->GetSize() == 3
+                && args->GetType(0) == VTYPE_STRING // channelName
+                && args->GetType(1) == VTYPE_INT // deliveryId
+                && args->GetType(2) == VTYPE_LIST) { // values
+            DeliverChannelValues(browser, args->GetString(0), args->GetInt(1),
+                                 args->GetList(2));
+        } else {
+            DebugLog("Renderer: OnProcessMessageReceived(): invalid arguments,"\
+                    " messageName=ChannelDelivery");
+            return false;
+        }
+    } else if (messageName == "StreamOpen") {
+        if (args->GetSize() == 5
+                && args->GetType(0) == VTYPE_INT // frameId
+                && args->GetType(1) == VTYPE_INT // streamId
+                && args->GetType(2) == VTYPE_STRING // functionName
+                && args->GetType(3) == VTYPE_BOOL // isReader
+                && args->GetType(4) == VTYPE_INT) { // chunkSize
+            OpenStream(browser, args->GetInt(0), args->GetInt(1),
+                       args->GetString(2), args->GetBool(3), args->GetInt(4));
+        } else {
+            DebugLog("Renderer: OnProcessMessageReceived(): invalid arguments,"\
+                    " messageName=StreamOpen");
+            return false;
+        }
+    } else if (messageName == "StreamChunk") {
+        if (args->GetSize() == 3
+                && args->GetType(0) == VTYPE_INT // streamId
+                && args->GetType(1) == VTYPE_STRING // chunk
+                && args->GetType(2) == VTYPE_BOOL) { // done
+            OnStreamChunk(args->GetInt(0), args->GetString(1),
+                          args->GetBool(2));
+        } else {
+            DebugLog("Renderer: OnProcessMessageReceived(): invalid arguments,"\
+                    " messageName=StreamChunk");
+            return false;
+        }
+    } else if (messageName == "StreamWriteAck") {
+        if (args->GetSize() == 1
+                && args->GetType(0) == VTYPE_INT) { // streamId
+            OnStreamWriteAck(args->GetInt(0));
+        } else {
+            DebugLog("Renderer: OnProcessMessageReceived(): invalid arguments,"\
+                    " messageName=StreamWriteAck");
+            return false;
+        }
+    } else if (messageName == "SharedMemoryCreated") {
+        if (args->GetSize() == 4
+                && args->GetType(0) == VTYPE_INT // regionId
+                && args->GetType(1) == VTYPE_STRING // name
+                && args->GetType(2) == VTYPE_INT // size
+                && args->GetType(3) == VTYPE_INT) { // threshold
+            OnSharedMemoryCreated(browser, args->GetInt(0),
+                                  args->GetString(1).ToString(),
+                                  static_cast<size_t>(args->GetInt(2)),
+                                  static_cast<size_t>(args->GetInt(3)));
+        } else {
+            DebugLog("Renderer: OnProcessMessageReceived(): invalid arguments,"\
+                    " messageName=SharedMemoryCreated");
+            return false;
+        }
+    } else if (messageName == "ExecuteFunction") {
+        if (args->GetSize() == 3
+                && args->GetType(0) == VTYPE_INT // frameId
+                && args->GetType(1) == VTYPE_STRING // functionName
+                && args->GetType(2) == VTYPE_LIST) { // functionArguments
+            ExecuteFunction(browser, args->GetInt(0), args->GetString(1),
+                            args->GetList(2));
+        } else {
+            DebugLog("Renderer: OnProcessMessageReceived(): invalid arguments,"\
+                    " messageName=ExecuteFunction");
+            return false;
+        }
     }
     return true;
 }
 
+void CefPythonApp::EvaluateJavascript(CefRefPtr<CefBrowser> browser,
+                                      int64 frameId,
+                                      int evaluationId,
+                                      const CefString& code) {
+    // The result is sent back to the browser process in the
+    // "EvaluateJavascriptResult" message: [evaluationId, success,
+    // list with a single value or an error message].
+    CefRefPtr<CefProcessMessage> message = CefProcessMessage::Create(
+            "EvaluateJavascriptResult");
+    CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+    arguments->SetInt(0, evaluationId);
+    CefRefPtr<CefFrame> frame = browser->GetFrame(frameId);
+    CefRefPtr<CefV8Context> context;
+    if (frame.get()) {
+        context = frame->GetV8Context();
+    }
+    if (!context.get() || !context->IsValid()) {
+        DebugLog("Renderer: EvaluateJavascript() FAILED: V8 context" \
+                " not found");
+        arguments->SetBool(1, false);
+        arguments->SetString(2, "V8 context not found");
+        browser->SendProcessMessage(PID_BROWSER, message);
+        return;
+    }
+    context->Enter();
+    CefRefPtr<CefV8Value> retval;
+    CefRefPtr<CefV8Exception> exception;
+    if (context->Eval(code, retval, exception)) {
+        // Must be converted while still in context, functions are
+        // converted to javascript callbacks.
+        CefRefPtr<CefListValue> result = CefListValue::Create();
+        V8ValueAppendToCefListValue(retval, result);
+        arguments->SetBool(1, true);
+        arguments->SetList(2, result);
+    } else {
+        arguments->SetBool(1, false);
+        if (exception.get()) {
+            arguments->SetString(2, exception->GetMessage());
+        } else {
+            arguments->SetString(2, "CefV8Context::Eval() failed");
+        }
+    }
+    context->Exit();
+    browser->SendProcessMessage(PID_BROWSER, message);
+}
+
+void CefPythonApp::ExecuteFunction(CefRefPtr<CefBrowser> browser,
+                                   int64 frameId,
+                                   const CefString& functionName,
+                                   CefRefPtr<CefListValue> functionArguments) {
+    // Called by Frame.ExecuteFunction(). The function path, eg.
+    // "object.method", is resolved on the window object and the
+    // function is called directly, without compiling javascript code.
+    CefRefPtr<CefFrame> frame = browser->GetFrame(frameId);
+    CefRefPtr<CefV8Context> context;
+    if (frame.get()) {
+        context = frame->GetV8Context();
+    }
+    if (!context.get() || !context->IsValid()) {
+        DebugLog("Renderer: ExecuteFunction() FAILED: V8 context not found");
+        return;
+    }
+    context->Enter();
+    CefRefPtr<CefV8Value> thisObject;
+    CefRefPtr<CefV8Value> v8Function = GetV8FunctionByPath(
+            context, functionName, thisObject);
+    if (!v8Function.get()) {
+        // Not a property of the window object, e.g. a top-level
+        // let/const binding. Resolve it the same way as the
+        // "funcName(...)" code of the ExecuteJavascript() path.
+        CefRefPtr<CefV8Exception> exception;
+        v8Function = EvalV8FunctionByPath(context, functionName, thisObject,
+                                          exception);
+        if (!v8Function.get()) {
+            if (exception.get()) {
+                ReportJavascriptError(context, exception->GetMessage());
+            } else {
+                ReportJavascriptError(context, "Uncaught TypeError: "
+                        + functionName.ToString() + " is not a function");
+            }
+            context->Exit();
+            return;
+        }
+    }
+    // Must be converted while in context, python functions are
+    // converted to javascript functions calling python callbacks.
+    CefV8ValueList v8Arguments = CefListValueToCefV8ValueList(
+            functionArguments);
+    CefRefPtr<CefV8Value> retval = v8Function->ExecuteFunction(thisObject,
+                                                               v8Arguments);
+    if (v8Function->HasException()) {
+        // Same as an uncaught exception in the ExecuteJavascript() path.
+        ReportJavascriptError(context,
+                              v8Function->GetException()->GetMessage());
+        v8Function->ClearException();
+    } else if (!retval.get()) {
+        DebugLog("Renderer: ExecuteFunction() FAILED: calling the function"\
+                " failed");
+    }
+    context->Exit();
+}
+
 void CefPythonApp::SetJavascriptBindings(CefRefPtr<CefBrowser> browser,
                                     CefRefPtr<CefDictionaryValue> data) {
     javascriptBindings_[browser->GetIdentifier()] = data;
@@ -396,7 +652,8 @@ bool CefPythonApp::BindedFunctionExists(CefRefPtr<CefBrowser> browser,
 }
 
 void CefPythonApp::DoJavascriptBindingsForBrowser(
-                        CefRefPtr<CefBrowser> browser) {
+                        CefRefPtr<CefBrowser> browser,
+                        CefRefPtr<CefDictionaryValue> patch) {
     // get frame
     // get context
     // if bindToFrames is true loop through all frames,
@@ -465,11 +722,33 @@ void CefPythonApp::DoJavascriptBindingsForBrowser(
         }
         CefRefPtr<CefV8Context> context = frame->GetV8Context();
         CefRefPtr<CefTaskRunner> taskRunner = context->GetTaskRunner();
-        taskRunner->PostTask(CefCreateClosureTask(base::Bind(
-                &CefPythonApp::DoJavascriptBindingsForFrame, this,
-                browser, frame, context
-        )));
+        if (patch.get()) {
+            taskRunner->PostTask(CefCreateClosureTask(base::Bind(
+                    &CefPythonApp::DoJavascriptBindingsPatchForFrame, this,
+                    browser, frame, context, patch
+            )));
+        } else {
+            taskRunner->PostTask(CefCreateClosureTask(base::Bind(
+                    &CefPythonApp::DoJavascriptBindingsForFrame, this,
+                    browser, frame, context
+            )));
+        }
+    }
+}
+
+CefRefPtr<CefV8Handler> GetBoundFunctionHandler(
+                        CefRefPtr<CefPythonApp> app,
+                        CefRefPtr<CefDictionaryValue> functions,
+                        const CefString& key,
+                        CefRefPtr<CefV8Handler> defaultHandler) {
+    // Functions and methods are sent by the Browser process with
+    // integer ids, the handler carries the id so that the function
+    // is looked up by id on each call. Bindings without ids are
+    // called by name using the shared handler.
+    if (functions->GetType(key) == VTYPE_INT && functions->GetInt(key)) {
+        return new V8FunctionHandler(app, 0, functions->GetInt(key));
     }
+    return defaultHandler;
 }
 
 void CefPythonApp::DoJavascriptBindingsForFrame(CefRefPtr<CefBrowser> browser,
@@ -546,7 +825,8 @@ void CefPythonApp::DoJavascriptBindingsForFrame(CefRefPtr<CefBrowser> browser,
             it != functionsVector.end(); ++it) {
         CefString functionName = *it;
         v8Function = CefV8Value::CreateFunction(functionName,
-                v8FunctionHandler);
+                GetBoundFunctionHandler(this, functions, functionName,
+                                        v8FunctionHandler));
         v8Window->SetValue(functionName, v8Function,
                 V8_PROPERTY_ATTRIBUTE_NONE);
     }
@@ -606,12 +886,276 @@ void CefPythonApp::DoJavascriptBindingsForFrame(CefRefPtr<CefBrowser> browser,
             std::string fullMethodName = objectName.ToString().append(".") \
                     .append(methodName.ToString());
             v8Function = CefV8Value::CreateFunction(fullMethodName,
-                    v8FunctionHandler);
+                    GetBoundFunctionHandler(this, methods, methodName,
+                                            v8FunctionHandler));
             v8Object->SetValue(methodName, v8Function,
                     V8_PROPERTY_ATTRIBUTE_NONE);
         }
     }
+    // CHANNELS, see channel.cpp. Optional, not sent by older versions.
+    if (jsBindings->HasKey("channels")
+            && jsBindings->GetType("channels") == VTYPE_LIST) {
+        CefRefPtr<CefListValue> channels = jsBindings->GetList("channels");
+        for (size_t i = 0; i < channels->GetSize(); i++) {
+            if (channels->GetType(i) != VTYPE_STRING) {
+                continue;
+            }
+            CefString channelName = channels->GetString(i);
+            v8Window->SetValue(channelName,
+                    CreateChannelV8Object(channelName),
+                    V8_PROPERTY_ATTRIBUTE_NONE);
+        }
+    }
     // END.
     if (didEnterContext)
         context->Exit();
 }
+
+bool CefPythonApp::PatchJavascriptBindings(CefRefPtr<CefBrowser> browser,
+                        CefRefPtr<CefDictionaryValue> patch) {
+    // Update bindings stored for the browser, so that frames created
+    // later get the patched values in DoJavascriptBindingsForFrame().
+    // A name is removed from all dictionaries before it is set, as it
+    // may have changed its kind, e.g. from a property to a function.
+    CefRefPtr<CefDictionaryValue> jsBindings = GetJavascriptBindings(browser);
+    if (!jsBindings.get()) {
+        DebugLog("Renderer: PatchJavascriptBindings() FAILED: " \
+                "bindings not set");
+        return false;
+    }
+    const char* kinds[] = {"functions", "properties", "objects"};
+    for (int i = 0; i < 3; i++) {
+        if (!(jsBindings->GetType(kinds[i]) == VTYPE_DICTIONARY
+                && patch->GetType(kinds[i]) == VTYPE_DICTIONARY)) {
+            DebugLog("Renderer: PatchJavascriptBindings() FAILED: " \
+                    "invalid data");
+            return false;
+        }
+    }
+    for (int i = 0; i < 3; i++) {
+        std::vector<CefString> names;
+        patch->GetDictionary(kinds[i])->GetKeys(names);
+        for (std::vector<CefString>::iterator it = names.begin(); \
+                it != names.end(); ++it) {
+            for (int j = 0; j < 3; j++) {
+                jsBindings->GetDictionary(kinds[j])->Remove(*it);
+            }
+        }
+    }
+    for (int i = 0; i < 3; i++) {
+        CefRefPtr<CefDictionaryValue> source = patch->GetDictionary(kinds[i]);
+        CefRefPtr<CefDictionaryValue> target = \
+                jsBindings->GetDictionary(kinds[i]);
+        std::vector<CefString> names;
+        source->GetKeys(names);
+        for (std::vector<CefString>::iterator it = names.begin(); \
+                it != names.end(); ++it) {
+            target->SetValue(*it, source->GetValue(*it)->Copy());
+        }
+    }
+    // OBSERVABLES, see observable_property.pyx. Optional.
+    if (patch->GetType("observables") == VTYPE_DICTIONARY) {
+        CefRefPtr<CefDictionaryValue> properties = \
+                jsBindings->GetDictionary("properties");
+        CefRefPtr<CefDictionaryValue> observables = \
+                patch->GetDictionary("observables");
+        std::vector<CefString> names;
+        observables->GetKeys(names);
+        for (std::vector<CefString>::iterator it = names.begin(); \
+                it != names.end(); ++it) {
+            if (properties->GetType(*it) != VTYPE_DICTIONARY
+                    || observables->GetType(*it) != VTYPE_DICTIONARY) {
+                continue;
+            }
+            CefRefPtr<CefDictionaryValue> target = \
+                    properties->GetDictionary(*it);
+            CefRefPtr<CefDictionaryValue> changes = \
+                    observables->GetDictionary(*it);
+            if (changes->GetType("changed") != VTYPE_DICTIONARY
+                    || changes->GetType("deleted") != VTYPE_LIST) {
+                DebugLog("Renderer: PatchJavascriptBindings() FAILED: " \
+                        "invalid observable data");
+                return false;
+            }
+            CefRefPtr<CefDictionaryValue> changed = \
+                    changes->GetDictionary("changed");
+            CefRefPtr<CefListValue> deleted = changes->GetList("deleted");
+            std::vector<CefString> keys;
+            changed->GetKeys(keys);
+            for (std::vector<CefString>::iterator it2 = keys.begin(); \
+                    it2 != keys.end(); ++it2) {
+                target->SetValue(*it2, changed->GetValue(*it2)->Copy());
+            }
+            for (size_t i = 0; i < deleted->GetSize(); i++) {
+                target->Remove(deleted->GetString(i));
+            }
+        }
+    }
+    return true;
+}
+
+void DispatchPropertyChangeEvent(CefRefPtr<CefV8Context> context,
+                                 const CefString& name,
+                                 CefRefPtr<CefV8Value> changed,
+                                 CefRefPtr<CefV8Value> deleted) {
+    // window.dispatchEvent(new CustomEvent("pythonpropertychange",
+    //         {detail: {name: name, changed: changed, deleted: deleted}}))
+    // Constructors can't be called through CefV8Value, the legacy
+    // document.createEvent() and initCustomEvent() are used instead.
+    CefRefPtr<CefV8Value> v8Window = context->GetGlobal();
+    CefRefPtr<CefV8Value> v8Document = v8Window->GetValue("document");
+    if (!v8Document.get() || !v8Document->IsObject()) {
+        return;
+    }
+    CefRefPtr<CefV8Value> createEvent = v8Document->GetValue("createEvent");
+    CefRefPtr<CefV8Value> dispatchEvent = v8Window->GetValue("dispatchEvent");
+    if (!createEvent.get() || !createEvent->IsFunction()
+            || !dispatchEvent.get() || !dispatchEvent->IsFunction()) {
+        DebugLog("Renderer: DispatchPropertyChangeEvent() FAILED: " \
+                "DOM events not available");
+        return;
+    }
+    CefV8ValueList arguments;
+    arguments.push_back(CefV8Value::CreateString("CustomEvent"));
+    CefRefPtr<CefV8Value> v8Event = createEvent->ExecuteFunction(v8Document,
+            arguments);
+    if (!v8Event.get() || !v8Event->IsObject()) {
+        DebugLog("Renderer: DispatchPropertyChangeEvent() FAILED: " \
+                "createEvent() failed");
+        return;
+    }
+    CefRefPtr<CefV8Value> v8Detail = CefV8Value::CreateObject(NULL);
+    v8Detail->SetValue("name", CefV8Value::CreateString(name),
+            V8_PROPERTY_ATTRIBUTE_NONE);
+    v8Detail->SetValue("changed", changed, V8_PROPERTY_ATTRIBUTE_NONE);
+    v8Detail->SetValue("deleted", deleted, V8_PROPERTY_ATTRIBUTE_NONE);
+    CefRefPtr<CefV8Value> initCustomEvent = \
+            v8Event->GetValue("initCustomEvent");
+    if (!initCustomEvent.get() || !initCustomEvent->IsFunction()) {
+        return;
+    }
+    arguments.clear();
+    arguments.push_back(CefV8Value::CreateString("pythonpropertychange"));
+    arguments.push_back(CefV8Value::CreateBool(false));
+    arguments.push_back(CefV8Value::CreateBool(false));
+    arguments.push_back(v8Detail);
+    initCustomEvent->ExecuteFunction(v8Event, arguments);
+    arguments.clear();
+    arguments.push_back(v8Event);
+    // Exceptions thrown in listeners are reported by the DOM,
+    // they do not propagate to dispatchEvent().
+    dispatchEvent->ExecuteFunction(v8Window, arguments);
+}
+
+void CefPythonApp::DoJavascriptBindingsPatchForFrame(
+                        CefRefPtr<CefBrowser> browser,
+                        CefRefPtr<CefFrame> frame,
+                        CefRefPtr<CefV8Context> context,
+                        CefRefPtr<CefDictionaryValue> patch) {
+    // Only the window values listed in the patch are replaced,
+    // other bindings in the frame are left untouched.
+    bool didEnterContext = false;
+    if (!CefV8Context::InContext()) {
+        if (!context->IsValid()) {
+            DebugLog("Renderer: DoJavascriptBindingsPatchForFrame() FAILED:"\
+                    " V8 context provided by CEF is invalid");
+            return;
+        }
+        context->Enter();
+        didEnterContext = true;
+    }
+    CefRefPtr<CefV8Value> v8Window = context->GetGlobal();
+    CefRefPtr<CefV8Handler> v8FunctionHandler(new V8FunctionHandler(this, 0));
+    // FUNCTIONS.
+    CefRefPtr<CefDictionaryValue> functions = \
+            patch->GetDictionary("functions");
+    std::vector<CefString> functionsVector;
+    functions->GetKeys(functionsVector);
+    for (std::vector<CefString>::iterator it = functionsVector.begin(); \
+            it != functionsVector.end(); ++it) {
+        v8Window->SetValue(*it, CefV8Value::CreateFunction(*it,
+                GetBoundFunctionHandler(this, functions, *it,
+                                        v8FunctionHandler)),
+                V8_PROPERTY_ATTRIBUTE_NONE);
+    }
+    // PROPERTIES.
+    CefRefPtr<CefV8Value> v8Properties = CefDictionaryValueToV8Value(
+            patch->GetDictionary("properties"));
+    std::vector<CefString> v8Keys;
+    if (v8Properties.get() && v8Properties->GetKeys(v8Keys)) {
+        for (std::vector<CefString>::iterator it = v8Keys.begin(); \
+                it != v8Keys.end(); ++it) {
+            v8Window->SetValue(*it, v8Properties->GetValue(*it),
+                    V8_PROPERTY_ATTRIBUTE_NONE);
+        }
+    }
+    // OBJECTS AND ITS METHODS.
+    CefRefPtr<CefDictionaryValue> objects = patch->GetDictionary("objects");
+    std::vector<CefString> objectsVector;
+    objects->GetKeys(objectsVector);
+    for (std::vector<CefString>::iterator it = objectsVector.begin(); \
+            it != objectsVector.end(); ++it) {
+        CefString objectName = *it;
+        if (objects->GetType(objectName) != VTYPE_DICTIONARY) {
+            continue;
+        }
+        CefRefPtr<CefV8Value> v8Object = CefV8Value::CreateObject(NULL);
+        v8Window->SetValue(objectName, v8Object, V8_PROPERTY_ATTRIBUTE_NONE);
+        CefRefPtr<CefDictionaryValue> methods = \
+                objects->GetDictionary(objectName);
+        std::vector<CefString> methodsVector;
+        methods->GetKeys(methodsVector);
+        for (std::vector<CefString>::iterator it2 = methodsVector.begin(); \
+                it2 != methodsVector.end(); ++it2) {
+            std::string fullMethodName = objectName.ToString().append(".") \
+                    .append(it2->ToString());
+            v8Object->SetValue(*it2, CefV8Value::CreateFunction(
+                    fullMethodName, GetBoundFunctionHandler(this, methods,
+                            *it2, v8FunctionHandler)),
+                    V8_PROPERTY_ATTRIBUTE_NONE);
+        }
+    }
+    // OBSERVABLES, only changed keys of the existing object are updated.
+    if (patch->GetType("observables") == VTYPE_DICTIONARY) {
+        CefRefPtr<CefDictionaryValue> observables = \
+                patch->GetDictionary("observables");
+        std::vector<CefString> observablesVector;
+        observables->GetKeys(observablesVector);
+        for (std::vector<CefString>::iterator it = observablesVector.begin(); \
+                it != observablesVector.end(); ++it) {
+            CefString name = *it;
+            CefRefPtr<CefV8Value> v8Observable = v8Window->GetValue(name);
+            if (!v8Observable.get() || !v8Observable->IsObject()
+                    || observables->GetType(name) != VTYPE_DICTIONARY) {
+                DebugLog("Renderer: DoJavascriptBindingsPatchForFrame(): " \
+                        "observable property not found");
+                continue;
+            }
+            CefRefPtr<CefDictionaryValue> changes = \
+                    observables->GetDictionary(name);
+            if (changes->GetType("changed") != VTYPE_DICTIONARY
+                    || changes->GetType("deleted") != VTYPE_LIST) {
+                continue;
+            }
+            CefRefPtr<CefV8Value> v8Changed = CefDictionaryValueToV8Value(
+                    changes->GetDictionary("changed"));
+            CefRefPtr<CefV8Value> v8Deleted = CefListValueToV8Value(
+                    changes->GetList("deleted"));
+            std::vector<CefString> keys;
+            if (v8Changed.get() && v8Changed->GetKeys(keys)) {
+                for (std::vector<CefString>::iterator it2 = keys.begin(); \
+                        it2 != keys.end(); ++it2) {
+                    v8Observable->SetValue(*it2, v8Changed->GetValue(*it2),
+                            V8_PROPERTY_ATTRIBUTE_NONE);
+                }
+            }
+            CefRefPtr<CefListValue> deleted = changes->GetList("deleted");
+            for (size_t i = 0; i < deleted->GetSize(); i++) {
+                v8Observable->DeleteValue(deleted->GetString(i));
+            }
+            DispatchPropertyChangeEvent(context, name, v8Changed, v8Deleted);
+        }
+    }
+    if (didEnterContext)
+        context->Exit();
+}
@@ -127,12 +127,40 @@ class CefPythonApp :
   bool BindedFunctionExists(CefRefPtr<CefBrowser> browser,
                                     const CefString& funcName);
 
-  void DoJavascriptBindingsForBrowser(CefRefPtr<CefBrowser> browser);
+  void DoJavascriptBindingsForBrowser(CefRefPtr<CefBrowser> browser,
+                                    CefRefPtr<CefDictionaryValue> patch
+                                            = NULL);
 
   void DoJavascriptBindingsForFrame(CefRefPtr<CefBrowser> browser,
                                     CefRefPtr<CefFrame> frame,
                                     CefRefPtr<CefV8Context> context);
 
+  bool PatchJavascriptBindings(CefRefPtr<CefBrowser> browser,
+                                    CefRefPtr<CefDictionaryValue> patch);
+
+  void DoJavascriptBindingsPatchForFrame(CefRefPtr<CefBrowser> browser,
+                                    CefRefPtr<CefFrame> frame,
+                                    CefRefPtr<CefV8Context> context,
+                                    CefRefPtr<CefDictionaryValue> patch);
+
+  // ---------------------------------------------------------------------------
+  // Javascript evaluation
+  // ---------------------------------------------------------------------------
+
+  void EvaluateJavascript(CefRefPtr<CefBrowser> browser,
+                          int64 frameId,
+                          int evaluationId,
+                          const CefString& code);
+
+  // ---------------------------------------------------------------------------
+  // Javascript function calls
+  // ---------------------------------------------------------------------------
+
+  void ExecuteFunction(CefRefPtr<CefBrowser> browser,
+                       int64 frameId,
+                       const CefString& functionName,
+                       CefRefPtr<CefListValue> functionArguments);
+
 private:
   IMPLEMENT_REFCOUNTING(CefPythonApp);
 };
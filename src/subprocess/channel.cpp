@@ -0,0 +1,157 @@
+// Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+#include "channel.h"
+#include <map>
+#include <vector>
+#include "DebugLog.h"
+#include "v8utils.h"
+#include "cefpython_app.h"
+
+typedef std::vector<std::pair<CefRefPtr<CefFrame>, CefRefPtr<CefV8Value> > >
+        ChannelSubscribers;
+// Key is a pair of browser id and channel name.
+typedef std::map<std::pair<int, std::string>, ChannelSubscribers>
+        ChannelSubscribersMap;
+
+ChannelSubscribersMap g_channelSubscribersMap;
+
+bool ChannelV8Handler::Execute(const CefString& functionName,
+                        CefRefPtr<CefV8Value> thisObject,
+                        const CefV8ValueList& v8Arguments,
+                        CefRefPtr<CefV8Value>& returnValue,
+                        CefString& exception) {
+    if (!CefV8Context::InContext()) {
+        DebugLog("Renderer: ChannelV8Handler::Execute() FAILED:"\
+                " not inside a V8 context");
+        return false;
+    }
+    if (!(v8Arguments.size() == 1 && v8Arguments[0]->IsFunction())) {
+        exception = std::string("[CEF Python] ").append(
+                channelName_.ToString()).append(".").append(
+                functionName.ToString()).append(
+                "() FAILED: expected a function argument");
+        // Must return true for the exception to be thrown.
+        return true;
+    }
+    CefRefPtr<CefV8Context> context = CefV8Context::GetCurrentContext();
+    CefRefPtr<CefFrame> frame = context->GetFrame();
+    CefRefPtr<CefV8Value> callback = v8Arguments[0];
+    ChannelSubscribers& subscribers = g_channelSubscribersMap[std::make_pair(
+            context->GetBrowser()->GetIdentifier(),
+            channelName_.ToString())];
+    ChannelSubscribers::iterator it = subscribers.begin();
+    while (it != subscribers.end()) {
+        if (it->first->GetIdentifier() == frame->GetIdentifier()
+                && it->second->IsSame(callback)) {
+            break;
+        }
+        ++it;
+    }
+    if (functionName == "subscribe") {
+        if (it == subscribers.end()) {
+            bool first = subscribers.empty();
+            subscribers.push_back(std::make_pair(frame, callback));
+            if (first) {
+                // Values held in the browser process because there were
+                // no subscribers can be delivered now.
+                CefRefPtr<CefProcessMessage> message =
+                        CefProcessMessage::Create("ChannelSubscribed");
+                message->GetArgumentList()->SetString(0, channelName_);
+                context->GetBrowser()->SendProcessMessage(PID_BROWSER,
+                                                          message);
+            }
+        }
+    } else if (functionName == "unsubscribe") {
+        if (it != subscribers.end()) {
+            subscribers.erase(it);
+        }
+    }
+    returnValue = CefV8Value::CreateUndefined();
+    return true;
+}
+
+CefRefPtr<CefV8Value> CreateChannelV8Object(const CefString& channelName) {
+    // Must be called while in a V8 context.
+    CefRefPtr<CefV8Handler> handler(new ChannelV8Handler(channelName));
+    CefRefPtr<CefV8Value> v8Object = CefV8Value::CreateObject(NULL);
+    v8Object->SetValue("subscribe",
+            CefV8Value::CreateFunction("subscribe", handler),
+            V8_PROPERTY_ATTRIBUTE_NONE);
+    v8Object->SetValue("unsubscribe",
+            CefV8Value::CreateFunction("unsubscribe", handler),
+            V8_PROPERTY_ATTRIBUTE_NONE);
+    return v8Object;
+}
+
+void DeliverChannelValues(CefRefPtr<CefBrowser> browser,
+                          const CefString& channelName,
+                          int deliveryId,
+                          CefRefPtr<CefListValue> values) {
+    ChannelSubscribersMap::iterator found = g_channelSubscribersMap.find(
+            std::make_pair(browser->GetIdentifier(), channelName.ToString()));
+    bool delivered = (found != g_channelSubscribersMap.end()
+                      && !found->second.empty());
+    if (delivered) {
+        // Make a copy, callbacks may subscribe or unsubscribe.
+        ChannelSubscribers subscribers = found->second;
+        for (size_t i = 0; i < values->GetSize(); i++) {
+            // [value, key]
+            if (values->GetType(i) != VTYPE_LIST) {
+                DebugLog("Renderer: DeliverChannelValues() FAILED:"\
+                        " invalid value");
+                continue;
+            }
+            for (ChannelSubscribers::iterator it = subscribers.begin();
+                    it != subscribers.end(); ++it) {
+                CefRefPtr<CefV8Context> context = it->first->GetV8Context();
+                if (!context.get() || !context->IsValid()) {
+                    continue;
+                }
+                context->Enter();
+                CefV8ValueList v8Arguments = CefListValueToCefV8ValueList(
+                        values->GetList(i));
+                if (!it->second->ExecuteFunction(NULL, v8Arguments).get()) {
+                    DebugLog("Renderer: DeliverChannelValues() FAILED:"\
+                            " callback->ExecuteFunction() FAILED");
+                }
+                context->Exit();
+            }
+        }
+    }
+    // Acknowledge even when there are no subscribers, otherwise
+    // the browser process would wait forever. Values that were not
+    // delivered are held until the first subscriber exists.
+    CefRefPtr<CefProcessMessage> message = CefProcessMessage::Create(
+            "ChannelAck");
+    CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+    arguments->SetString(0, channelName);
+    arguments->SetInt(1, deliveryId);
+    arguments->SetBool(2, delivered);
+    browser->SendProcessMessage(PID_BROWSER, message);
+}
+
+void RemoveChannelSubscriptionsForFrame(CefRefPtr<CefFrame> frame) {
+    int64 frameId = frame->GetIdentifier();
+    int browserId = frame->GetBrowser()->GetIdentifier();
+    ChannelSubscribersMap::iterator it = g_channelSubscribersMap.begin();
+    while (it != g_channelSubscribersMap.end()) {
+        if (it->first.first != browserId) {
+            ++it;
+            continue;
+        }
+        ChannelSubscribers& subscribers = it->second;
+        ChannelSubscribers::iterator sub = subscribers.begin();
+        while (sub != subscribers.end()) {
+            if (sub->first->GetIdentifier() == frameId) {
+                sub = subscribers.erase(sub);
+            } else {
+                ++sub;
+            }
+        }
+        if (subscribers.empty()) {
+            g_channelSubscribersMap.erase(it++);
+        } else {
+            ++it;
+        }
+    }
+}
@@ -0,0 +1,35 @@
+// Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+#pragma once
+#include "include/cef_v8.h"
+
+// Channels created with Browser.CreateChannel(), see channel.pyx.
+// In javascript: window[channelName].subscribe(callback) and
+// window[channelName].unsubscribe(callback). Callback is called
+// with (value, key) arguments.
+
+class ChannelV8Handler
+        : public CefV8Handler {
+public:
+    explicit ChannelV8Handler(const CefString& channelName)
+            : channelName_(channelName) {
+    }
+    virtual bool Execute(const CefString& name,
+                        CefRefPtr<CefV8Value> object,
+                        const CefV8ValueList& arguments,
+                        CefRefPtr<CefV8Value>& retval,
+                        CefString& exception) OVERRIDE;
+protected:
+    CefString channelName_;
+private:
+  IMPLEMENT_REFCOUNTING(ChannelV8Handler);
+};
+
+CefRefPtr<CefV8Value> CreateChannelV8Object(const CefString& channelName);
+
+void DeliverChannelValues(CefRefPtr<CefBrowser> browser,
+                          const CefString& channelName,
+                          int deliveryId,
+                          CefRefPtr<CefListValue> values);
+
+void RemoveChannelSubscriptionsForFrame(CefRefPtr<CefFrame> frame);
@@ -17,11 +17,15 @@ inline std::string AnyToString(const T& value)
     return oss.str();
 }
 
-typedef std::map<int,
-                 std::pair<CefRefPtr<CefFrame>, CefRefPtr<CefV8Value> > >
-                 JavascriptCallbackMap;
+// Callbacks are kept per frame, so that releasing a frame touches only
+// its own callbacks. A second map finds the frame of a callback.
+typedef std::map<int, CefRefPtr<CefV8Value> > JavascriptCallbackMap;
+typedef std::map<int64, std::pair<CefRefPtr<CefFrame>,
+                                  JavascriptCallbackMap> >
+                 FrameJavascriptCallbackMap;
 
-JavascriptCallbackMap g_jsCallbackMap;
+FrameJavascriptCallbackMap g_jsCallbackFrames;
+std::map<int, int64> g_jsCallbackFrameIds;
 int g_jsCallbackMaxId = 0;
 
 CefString PutJavascriptCallback(
@@ -41,29 +45,30 @@ CefString PutJavascriptCallback(
     strCallbackId.append(",\"functionName\":\"").append(functionName) \
             .append("\"");
     strCallbackId.append("}");
-    g_jsCallbackMap.insert(std::make_pair(
-            callbackId,
-            std::make_pair(frame, jsCallback)));
+    FrameJavascriptCallbackMap::iterator it = g_jsCallbackFrames.find(frameId);
+    if (it == g_jsCallbackFrames.end()) {
+        it = g_jsCallbackFrames.insert(std::make_pair(frameId,
+                std::make_pair(frame, JavascriptCallbackMap()))).first;
+    }
+    it->second.second.insert(std::make_pair(callbackId, jsCallback));
+    g_jsCallbackFrameIds.insert(std::make_pair(callbackId, frameId));
     return strCallbackId;
 }
 
 bool ExecuteJavascriptCallback(int callbackId, CefRefPtr<CefListValue> args) {
-    if (g_jsCallbackMap.empty()) {
-        DebugLog("Renderer: ExecuteJavascriptCallback() FAILED: " \
-                 "callback map is empty");
-        return false;
-    }
-    JavascriptCallbackMap::const_iterator it = g_jsCallbackMap.find(
+    std::map<int, int64>::const_iterator idIt = g_jsCallbackFrameIds.find(
             callbackId);
-    if (it == g_jsCallbackMap.end()) {
+    if (idIt == g_jsCallbackFrameIds.end()) {
         std::string logMessage = "Renderer: ExecuteJavascriptCallback() "
                 "FAILED: callback not found, id=";
         logMessage.append(AnyToString(callbackId));
         DebugLog(logMessage.c_str());
         return false;
     }
-    CefRefPtr<CefFrame> frame = it->second.first;
-    CefRefPtr<CefV8Value> callback = it->second.second;
+    FrameJavascriptCallbackMap::iterator frameIt = g_jsCallbackFrames.find(
+            idIt->second);
+    CefRefPtr<CefFrame> frame = frameIt->second.first;
+    CefRefPtr<CefV8Value> callback = frameIt->second.second[callbackId];
     CefRefPtr<CefV8Context> context = frame->GetV8Context();
     context->Enter();
     CefV8ValueList v8Arguments = CefListValueToCefV8ValueList(args);
@@ -80,25 +85,37 @@ bool ExecuteJavascriptCallback(int callbackId, CefRefPtr<CefListValue> args) {
     }
 }
 
+void ReleaseJavascriptCallback(int callbackId) {
+    // Called when the JavascriptCallback object was released in Python.
+    // The callback might have been removed already with its frame.
+    std::map<int, int64>::iterator idIt = g_jsCallbackFrameIds.find(
+            callbackId);
+    if (idIt == g_jsCallbackFrameIds.end()) {
+        return;
+    }
+    FrameJavascriptCallbackMap::iterator frameIt = g_jsCallbackFrames.find(
+            idIt->second);
+    g_jsCallbackFrameIds.erase(idIt);
+    frameIt->second.second.erase(callbackId);
+    if (frameIt->second.second.empty()) {
+        g_jsCallbackFrames.erase(frameIt);
+    }
+}
+
 void RemoveJavascriptCallbacksForFrame(CefRefPtr<CefFrame> frame) {
-    if (g_jsCallbackMap.empty()) {
+    FrameJavascriptCallbackMap::iterator frameIt = g_jsCallbackFrames.find(
+            frame->GetIdentifier());
+    if (frameIt == g_jsCallbackFrames.end()) {
         return;
     }
-    JavascriptCallbackMap::iterator it = g_jsCallbackMap.begin();
-    int64 frameId = frame->GetIdentifier();
-    while (it != g_jsCallbackMap.end()) {
-        if (it->second.first->GetIdentifier() == frameId) {
-            // Pass current iterator and increment it after passing
-            // to the function, but before erase() is called, this 
-            // is important for it to work in a loop. You can't do this:
-            // | if (..) erase(it);
-            // | ++it;
-            // This would cause an infinite loop.
-            g_jsCallbackMap.erase(it++);
-            DebugLog("Renderer: RemoveJavascriptCallbacksForFrame(): " \
-                    "removed js callback from the map");
-        } else {
-            ++it;
-        }
+    JavascriptCallbackMap& callbacks = frameIt->second.second;
+    for (JavascriptCallbackMap::iterator it = callbacks.begin();
+            it != callbacks.end(); ++it) {
+        g_jsCallbackFrameIds.erase(it->first);
     }
+    std::string logMessage = "Renderer: RemoveJavascriptCallbacksForFrame(): "
+            "removed js callbacks, count=";
+    logMessage.append(AnyToString(callbacks.size()));
+    DebugLog(logMessage.c_str());
+    g_jsCallbackFrames.erase(frameIt);
 }
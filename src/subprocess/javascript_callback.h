@@ -10,4 +10,6 @@ CefString PutJavascriptCallback(
 
 bool ExecuteJavascriptCallback(int callbackId, CefRefPtr<CefListValue> args);
 
+void ReleaseJavascriptCallback(int callbackId);
+
 void RemoveJavascriptCallbacksForFrame(CefRefPtr<CefFrame> frame);
@@ -9,9 +9,11 @@
 #include <errno.h>
 #include <fcntl.h>
 #include <math.h>
+#include <sys/eventfd.h>
 
 #include <glib.h>
 
+#include "include/base/cef_lock.h"
 #include "include/base/cef_logging.h"
 #include "include/cef_app.h"
 
@@ -91,12 +93,20 @@ class MainMessageLoopExternalPumpLinux : public MainMessageLoopExternalPump {
   // The time when we need to do delayed work.
   CefTime delayed_work_time_;
 
-  // We use a wakeup pipe to make sure we'll get out of the glib polling phase
-  // when another thread has scheduled us to do some work. There is a glib
-  // mechanism g_main_context_wakeup, but this won't guarantee that our event's
-  // Dispatch() will be called.
-  int wakeup_pipe_read_;
-  int wakeup_pipe_write_;
+  // We use a wakeup eventfd to make sure we'll get out of the glib polling
+  // phase when another thread has scheduled us to do some work. There is a
+  // glib mechanism g_main_context_wakeup, but this won't guarantee that our
+  // event's Dispatch() will be called. Unlike a pipe an eventfd never fills
+  // up, any number of wakeups before the poll returns are coalesced into
+  // a single read.
+  int wakeup_eventfd_;
+
+  // The shortest delay requested by OnScheduleMessagePumpWork() calls since
+  // the last wakeup was handled. Protected by |lock_| as it is written on
+  // any thread.
+  base::Lock lock_;
+  bool work_scheduled_;
+  int64 scheduled_delay_ms_;
 
   // Use a scoped_ptr to avoid needing the definition of GPollFD in the header.
   SCOPED_PTR(GPollFD) wakeup_gpollfd_;
@@ -159,16 +169,14 @@ GSourceFuncs WorkSourceFuncs = {
 MainMessageLoopExternalPumpLinux::MainMessageLoopExternalPumpLinux()
   : should_quit_(false),
     context_(g_main_context_default()),
+    work_scheduled_(false),
+    scheduled_delay_ms_(0),
     wakeup_gpollfd_(new GPollFD) {
-  // Create our wakeup pipe, which is used to flag when work was scheduled.
-  int fds[2];
-  int ret = pipe(fds);
-  DCHECK_EQ(ret, 0);
-  (void)ret;  // Prevent warning in release mode.
-
-  wakeup_pipe_read_  = fds[0];
-  wakeup_pipe_write_ = fds[1];
-  wakeup_gpollfd_->fd = wakeup_pipe_read_;
+  // Create our wakeup eventfd, which is used to flag when work was scheduled.
+  wakeup_eventfd_ = eventfd(0, EFD_NONBLOCK | EFD_CLOEXEC);
+  DCHECK_GE(wakeup_eventfd_, 0);
+
+  wakeup_gpollfd_->fd = wakeup_eventfd_;
   wakeup_gpollfd_->events = G_IO_IN;
 
   work_source_ = g_source_new(&WorkSourceFuncs, sizeof(WorkSource));
@@ -184,8 +192,7 @@ MainMessageLoopExternalPumpLinux::MainMessageLoopExternalPumpLinux()
 MainMessageLoopExternalPumpLinux::~MainMessageLoopExternalPumpLinux() {
   g_source_destroy(work_source_);
   g_source_unref(work_source_);
-  close(wakeup_pipe_read_);
-  close(wakeup_pipe_write_);
+  close(wakeup_eventfd_);
 }
 
 void MainMessageLoopExternalPumpLinux::Quit() {
@@ -227,12 +234,23 @@ int MainMessageLoopExternalPumpLinux::Run() {
 
 void MainMessageLoopExternalPumpLinux::OnScheduleMessagePumpWork(
     int64 delay_ms) {
-  // This can be called on any thread, so we don't want to touch any state
-  // variables as we would then need locks all over. This ensures that if we
-  // are sleeping in a poll that we will wake up.
-  if (HANDLE_EINTR(write(wakeup_pipe_write_, &delay_ms, sizeof(int64))) !=
-                   sizeof(int64)) {
-    NOTREACHED() << "Could not write to the UI message loop wakeup pipe!";
+  // This can be called on any thread. Only the shortest requested delay
+  // is kept, the eventfd is signaled once until the wakeup is handled.
+  // This ensures that if we are sleeping in a poll that we will wake up.
+  {
+    base::AutoLock lock_scope(lock_);
+    if (work_scheduled_) {
+      if (delay_ms < scheduled_delay_ms_)
+        scheduled_delay_ms_ = delay_ms;
+      return;
+    }
+    work_scheduled_ = true;
+    scheduled_delay_ms_ = delay_ms;
+  }
+  const uint64 value = 1;
+  if (HANDLE_EINTR(write(wakeup_eventfd_, &value, sizeof(value))) !=
+                   sizeof(value)) {
+    NOTREACHED() << "Could not write to the UI message loop wakeup eventfd!";
   }
 }
 
@@ -244,22 +262,23 @@ int MainMessageLoopExternalPumpLinux::HandlePrepare() {
 }
 
 bool MainMessageLoopExternalPumpLinux::HandleCheck() {
-  // We usually have a single message on the wakeup pipe, since we are only
-  // signaled when the queue went from empty to non-empty, but there can be
-  // two messages if a task posted a task, hence we read at most two bytes.
-  // The glib poll will tell us whether there was data, so this read shouldn't
-  // block.
+  // Reading the eventfd resets its counter, all wakeups signaled since the
+  // last read are handled by a single OnScheduleWork() call with the
+  // shortest requested delay. The glib poll will tell us whether there was
+  // data, so this read shouldn't block.
   if (wakeup_gpollfd_->revents & G_IO_IN) {
-    int64 delay_ms[2];
-    const size_t num_bytes =
-        HANDLE_EINTR(read(wakeup_pipe_read_, delay_ms, sizeof(int64) * 2));
-    if (num_bytes < sizeof(int64)) {
-      NOTREACHED() << "Error reading from the wakeup pipe.";
+    uint64 value;
+    if (HANDLE_EINTR(read(wakeup_eventfd_, &value, sizeof(value))) !=
+                     sizeof(value)) {
+      NOTREACHED() << "Error reading from the wakeup eventfd.";
+    }
+    int64 delay_ms;
+    {
+      base::AutoLock lock_scope(lock_);
+      work_scheduled_ = false;
+      delay_ms = scheduled_delay_ms_;
     }
-    if (num_bytes == sizeof(int64))
-      OnScheduleWork(delay_ms[0]);
-    if (num_bytes == sizeof(int64) * 2)
-      OnScheduleWork(delay_ms[1]);
+    OnScheduleWork(delay_ms);
   }
 
   if (GetTimeIntervalMilliseconds(delayed_work_time_) == 0) {
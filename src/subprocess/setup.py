@@ -66,6 +66,9 @@ libcefpython_src = [
     'v8function_handler.cpp',
     'v8utils.cpp',
     'javascript_callback.cpp',
+    'channel.cpp',
+    'stream.cpp',
+    'shared_memory.cpp',
     'main_message_loop/main_message_loop.cpp',
     'main_message_loop/main_message_loop_std.cpp',
     'main_message_loop/main_message_loop_external_pump.cpp'
@@ -0,0 +1,144 @@
+// Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+#include "shared_memory.h"
+#include <string.h>
+#include "DebugLog.h"
+
+#if defined(OS_WIN)
+#include <windows.h>
+#define SHARED_MEMORY_BARRIER() MemoryBarrier()
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <unistd.h>
+#define SHARED_MEMORY_BARRIER() __sync_synchronize()
+#endif
+
+// Layout of the region, must match shared_memory.pyx:
+//   [0:8]  write position, updated by the renderer (producer)
+//   [8:16] read position, updated by the browser (consumer)
+//   [64:]  ring buffer data
+// Positions grow forever, the offset in the ring buffer is
+// position % capacity. A blob is never split, when it doesn't
+// fit at the end of the ring buffer, it is written at the beginning.
+// There is a single producer (renderer main thread) and a single
+// consumer (browser UI thread), no locks are needed.
+const size_t kSharedMemoryHeaderSize = 64;
+
+bool g_sharedMemoryEnabled = false;
+int g_sharedMemoryRegionId = 0;
+char* g_sharedMemory = NULL;
+uint64 g_sharedMemoryCapacity = 0;
+size_t g_sharedMemoryThreshold = 0;
+
+void InitSharedMemory(CefRefPtr<CefListValue> extra_info) {
+    // [2] is set when shared memory is enabled.
+    g_sharedMemoryEnabled = (extra_info->GetSize() >= 3
+            && extra_info->GetType(2) == VTYPE_BOOL
+            && extra_info->GetBool(2));
+}
+
+void SendSharedMemoryAttached(CefRefPtr<CefBrowser> browser) {
+    // Called when a browser was created. The region is created by the
+    // Browser process for the first browser, other browsers tell which
+    // region they use, so that it is released when they are closed.
+    if (!g_sharedMemoryEnabled) {
+        return;
+    }
+    CefRefPtr<CefProcessMessage> message;
+    if (g_sharedMemory) {
+        message = CefProcessMessage::Create("SharedMemoryAttached");
+        message->GetArgumentList()->SetInt(0, g_sharedMemoryRegionId);
+    } else {
+        // Browsers created before the region arrives send this too,
+        // regions created for them are released in
+        // OnSharedMemoryCreated().
+        message = CefProcessMessage::Create("CreateSharedMemory");
+    }
+    browser->SendProcessMessage(PID_BROWSER, message);
+}
+
+void OnSharedMemoryCreated(CefRefPtr<CefBrowser> browser, int regionId,
+                           const std::string& name, size_t size,
+                           size_t threshold) {
+    if (g_sharedMemory) {
+        // Another browser's region was attached already, the Browser
+        // process moves the browser to it and releases this region.
+        SendSharedMemoryAttached(browser);
+        return;
+    }
+    if (size <= kSharedMemoryHeaderSize) {
+        return;
+    }
+    void* memory = NULL;
+#if defined(OS_WIN)
+    HANDLE mapping = OpenFileMappingA(FILE_MAP_ALL_ACCESS, FALSE,
+                                      name.c_str());
+    if (mapping) {
+        memory = MapViewOfFile(mapping, FILE_MAP_ALL_ACCESS, 0, 0, size);
+        // The view keeps the mapping alive.
+        CloseHandle(mapping);
+    }
+#else
+    int fd = open(name.c_str(), O_RDWR);
+    if (fd != -1) {
+        memory = mmap(NULL, size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+        close(fd);
+        if (memory == MAP_FAILED) {
+            memory = NULL;
+        }
+    }
+#endif
+    if (!memory) {
+        DebugLog("Renderer: OnSharedMemoryCreated(): attaching FAILED");
+        return;
+    }
+    g_sharedMemoryRegionId = regionId;
+    g_sharedMemory = static_cast<char*>(memory);
+    g_sharedMemoryCapacity = size - kSharedMemoryHeaderSize;
+    g_sharedMemoryThreshold = threshold;
+    DebugLog("Renderer: OnSharedMemoryCreated(): shared memory attached");
+}
+
+bool PutSharedMemoryString(const CefString& value,
+                           CefRefPtr<CefBinaryValue>& reference) {
+    // Returns false when the string should be sent in the process
+    // message: shared memory is disabled, the string is small or
+    // there is not enough free space in the ring buffer.
+    if (!g_sharedMemory || value.length() < g_sharedMemoryThreshold) {
+        return false;
+    }
+    std::string data = value.ToString();
+    uint64 length = data.size();
+    if (length > g_sharedMemoryCapacity) {
+        return false;
+    }
+    volatile uint64* header = reinterpret_cast<volatile uint64*>(
+            g_sharedMemory);
+    uint64 writePosition = header[0];
+    SHARED_MEMORY_BARRIER();
+    uint64 readPosition = header[1];
+    uint64 position = writePosition;
+    uint64 offset = position % g_sharedMemoryCapacity;
+    if (offset + length > g_sharedMemoryCapacity) {
+        // Skip the rest of the ring buffer.
+        position += g_sharedMemoryCapacity - offset;
+        offset = 0;
+    }
+    if (position + length - readPosition > g_sharedMemoryCapacity) {
+        DebugLog("Renderer: PutSharedMemoryString(): shared memory is full");
+        return false;
+    }
+    memcpy(g_sharedMemory + kSharedMemoryHeaderSize + offset, data.data(),
+           static_cast<size_t>(length));
+    // Data must be visible before the write position is updated.
+    SHARED_MEMORY_BARRIER();
+    header[0] = position + length;
+    SharedMemoryReference data_reference;
+    data_reference.regionId = static_cast<uint64>(g_sharedMemoryRegionId);
+    data_reference.offset = position;
+    data_reference.length = length;
+    reference = CefBinaryValue::Create(&data_reference,
+                                       sizeof(data_reference));
+    return true;
+}
@@ -0,0 +1,29 @@
+// Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+#pragma once
+#include "include/cef_browser.h"
+#include "include/cef_values.h"
+#include <string>
+
+// Optional shared memory region created by the Browser process for
+// each renderer process, see shared_memory.pyx. Large strings are
+// written to the region and only a reference with offset and length
+// is sent in the process message. The reference is a binary value
+// of this size, javascript values are never converted to a binary
+// value of this size, so a page can't forge it.
+struct SharedMemoryReference {
+    uint64 regionId;
+    uint64 offset;
+    uint64 length;
+};
+
+void InitSharedMemory(CefRefPtr<CefListValue> extra_info);
+
+void SendSharedMemoryAttached(CefRefPtr<CefBrowser> browser);
+
+void OnSharedMemoryCreated(CefRefPtr<CefBrowser> browser, int regionId,
+                           const std::string& name, size_t size,
+                           size_t threshold);
+
+bool PutSharedMemoryString(const CefString& value,
+                           CefRefPtr<CefBinaryValue>& reference);
@@ -0,0 +1,292 @@
+// Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+#include "stream.h"
+#include <deque>
+#include <map>
+#include "DebugLog.h"
+#include "v8utils.h"
+#include "cefpython_app.h"
+
+// Data is split into chunks here in the Renderer process, a chunk
+// is sent only after the previous one was acknowledged by the
+// Browser process with the "StreamWriteAck" message.
+struct StreamWrite {
+    base::string16 data;
+    size_t offset;
+    CefRefPtr<CefV8Value> callback;
+    bool close;
+};
+
+struct Stream {
+    CefRefPtr<CefFrame> frame;
+    bool isReader;
+    // Reader: callbacks waiting for chunks, each read() requests
+    // a single chunk with the "StreamRead" message.
+    std::deque<CefRefPtr<CefV8Value> > readCallbacks;
+    // Writer.
+    size_t chunkSize;
+    std::deque<StreamWrite> writes;
+    bool writeInFlight;
+};
+
+typedef std::map<int, Stream> StreamMap;
+
+StreamMap g_streamMap;
+
+void SendStreamMessage(CefRefPtr<CefFrame> frame,
+                       const CefString& messageName,
+                       int streamId) {
+    CefRefPtr<CefProcessMessage> message = CefProcessMessage::Create(
+            messageName);
+    message->GetArgumentList()->SetInt(0, streamId);
+    frame->GetBrowser()->SendProcessMessage(PID_BROWSER, message);
+}
+
+void CancelStream(CefRefPtr<CefFrame> frame, int streamId,
+                  const CefString& reason) {
+    CefRefPtr<CefProcessMessage> message = CefProcessMessage::Create(
+            "StreamCancel");
+    CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+    arguments->SetInt(0, streamId);
+    arguments->SetString(1, reason);
+    frame->GetBrowser()->SendProcessMessage(PID_BROWSER, message);
+}
+
+void CallStreamCallback(CefRefPtr<CefFrame> frame,
+                        CefRefPtr<CefV8Value> callback,
+                        const CefString& chunk,
+                        bool done) {
+    CefRefPtr<CefV8Context> context = frame->GetV8Context();
+    if (!context.get() || !context->IsValid()) {
+        return;
+    }
+    context->Enter();
+    CefV8ValueList v8Arguments;
+    v8Arguments.push_back(CefV8Value::CreateString(chunk));
+    v8Arguments.push_back(CefV8Value::CreateBool(done));
+    if (!callback->ExecuteFunction(NULL, v8Arguments).get()) {
+        DebugLog("Renderer: CallStreamCallback() FAILED:"\
+                " callback->ExecuteFunction() FAILED");
+    }
+    context->Exit();
+}
+
+void SendNextStreamChunk(int streamId) {
+    StreamMap::iterator it = g_streamMap.find(streamId);
+    if (it == g_streamMap.end() || it->second.writeInFlight) {
+        return;
+    }
+    Stream& stream = it->second;
+    CefRefPtr<CefFrame> frame = stream.frame;
+    // Writes that were fully acknowledged.
+    while (!stream.writes.empty() && !stream.writes.front().close
+            && stream.writes.front().offset >= stream.writes.front().data.size()) {
+        CefRefPtr<CefV8Value> callback = stream.writes.front().callback;
+        stream.writes.pop_front();
+        if (callback.get()) {
+            // May call write() or close() recursively.
+            CallStreamCallback(frame, callback, CefString(), false);
+            it = g_streamMap.find(streamId);
+            if (it == g_streamMap.end() || it->second.writeInFlight) {
+                return;
+            }
+        }
+    }
+    if (stream.writes.empty()) {
+        return;
+    }
+    StreamWrite& write = stream.writes.front();
+    CefRefPtr<CefProcessMessage> message = CefProcessMessage::Create(
+            "StreamWrite");
+    CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+    arguments->SetInt(0, streamId);
+    if (write.close) {
+        arguments->SetString(1, CefString());
+        arguments->SetBool(2, true);
+        g_streamMap.erase(it);
+        frame->GetBrowser()->SendProcessMessage(PID_BROWSER, message);
+        return;
+    }
+    size_t end = write.offset + stream.chunkSize;
+    if (end >= write.data.size()) {
+        end = write.data.size();
+    } else if (write.data[end - 1] >= 0xD800 && write.data[end - 1] <= 0xDBFF) {
+        // Do not split a surrogate pair. When the chunk would become
+        // empty send the whole pair instead, otherwise the offset would
+        // never advance.
+        if (end - 1 > write.offset) {
+            end -= 1;
+        } else {
+            // end < write.data.size() here, the low surrogate exists.
+            end += 1;
+        }
+    }
+    arguments->SetString(1, CefString(write.data.substr(write.offset,
+                                                        end - write.offset)));
+    arguments->SetBool(2, false);
+    write.offset = end;
+    stream.writeInFlight = true;
+    frame->GetBrowser()->SendProcessMessage(PID_BROWSER, message);
+}
+
+bool StreamV8Handler::Execute(const CefString& functionName,
+                        CefRefPtr<CefV8Value> thisObject,
+                        const CefV8ValueList& v8Arguments,
+                        CefRefPtr<CefV8Value>& returnValue,
+                        CefString& exception) {
+    returnValue = CefV8Value::CreateUndefined();
+    StreamMap::iterator it = g_streamMap.find(streamId_);
+    if (it == g_streamMap.end()) {
+        if (functionName == "read" && v8Arguments.size() == 1
+                && v8Arguments[0]->IsFunction()) {
+            // Stream was already read until the end.
+            CefV8ValueList callbackArguments;
+            callbackArguments.push_back(CefV8Value::CreateString(CefString()));
+            callbackArguments.push_back(CefV8Value::CreateBool(true));
+            v8Arguments[0]->ExecuteFunction(NULL, callbackArguments);
+            return true;
+        }
+        if (functionName == "cancel") {
+            return true;
+        }
+        exception = std::string("[CEF Python] ").append(
+                functionName.ToString()).append(
+                "() FAILED: stream is closed");
+        // Must return true for the exception to be thrown.
+        return true;
+    }
+    Stream& stream = it->second;
+    if (functionName == "read") {
+        if (!(v8Arguments.size() == 1 && v8Arguments[0]->IsFunction())) {
+            exception = "[CEF Python] read() FAILED: expected a function"\
+                    " argument";
+            return true;
+        }
+        stream.readCallbacks.push_back(v8Arguments[0]);
+        SendStreamMessage(stream.frame, "StreamRead", streamId_);
+    } else if (functionName == "cancel") {
+        CefRefPtr<CefFrame> frame = stream.frame;
+        g_streamMap.erase(it);
+        CancelStream(frame, streamId_, "cancelled by javascript");
+    } else if (functionName == "write") {
+        if (v8Arguments.size() < 1 || !v8Arguments[0]->IsString()
+                || (v8Arguments.size() > 1
+                    && !v8Arguments[1]->IsFunction())) {
+            exception = "[CEF Python] write() FAILED: expected a string"\
+                    " and an optional function argument";
+            return true;
+        }
+        StreamWrite write;
+        write.data = v8Arguments[0]->GetStringValue().ToString16();
+        write.offset = 0;
+        if (v8Arguments.size() > 1) {
+            write.callback = v8Arguments[1];
+        }
+        write.close = false;
+        stream.writes.push_back(write);
+        SendNextStreamChunk(streamId_);
+    } else if (functionName == "close") {
+        StreamWrite write;
+        write.offset = 0;
+        write.close = true;
+        stream.writes.push_back(write);
+        SendNextStreamChunk(streamId_);
+    }
+    return true;
+}
+
+void OpenStream(CefRefPtr<CefBrowser> browser,
+                int64 frameId,
+                int streamId,
+                const CefString& functionName,
+                bool isReader,
+                int chunkSize) {
+    CefRefPtr<CefFrame> frame = browser->GetFrame(frameId);
+    CefRefPtr<CefV8Context> context;
+    if (frame.get()) {
+        context = frame->GetV8Context();
+    }
+    if (!context.get() || !context->IsValid()) {
+        DebugLog("Renderer: OpenStream() FAILED: V8 context not found");
+        CefRefPtr<CefFrame> mainFrame = browser->GetMainFrame();
+        CancelStream(mainFrame, streamId, "V8 context not found");
+        return;
+    }
+    context->Enter();
+    CefRefPtr<CefV8Value> thisObject;
+    CefRefPtr<CefV8Value> v8Function = GetV8FunctionByPath(
+            context, functionName, thisObject);
+    if (!v8Function.get()) {
+        context->Exit();
+        DebugLog("Renderer: OpenStream() FAILED: function not found");
+        CancelStream(frame, streamId, "function not found");
+        return;
+    }
+    Stream stream;
+    stream.frame = frame;
+    stream.isReader = isReader;
+    stream.chunkSize = chunkSize > 0 ? chunkSize : 1;
+    stream.writeInFlight = false;
+    g_streamMap[streamId] = stream;
+    CefRefPtr<CefV8Handler> handler(new StreamV8Handler(streamId));
+    CefRefPtr<CefV8Value> v8Object = CefV8Value::CreateObject(NULL);
+    const char* methods[2][2] = {{"read", "cancel"}, {"write", "close"}};
+    for (int i = 0; i < 2; i++) {
+        const char* methodName = methods[isReader ? 0 : 1][i];
+        v8Object->SetValue(methodName,
+                CefV8Value::CreateFunction(methodName, handler),
+                V8_PROPERTY_ATTRIBUTE_NONE);
+    }
+    CefRefPtr<CefV8Value> retval = v8Function->ExecuteFunction(thisObject,
+            CefV8ValueList(1, v8Object));
+    if (!retval.get()) {
+        DebugLog("Renderer: OpenStream() FAILED: calling the function"\
+                " failed");
+    }
+    context->Exit();
+}
+
+void OnStreamChunk(int streamId, const CefString& chunk, bool done) {
+    StreamMap::iterator it = g_streamMap.find(streamId);
+    if (it == g_streamMap.end() || it->second.readCallbacks.empty()) {
+        DebugLog("Renderer: OnStreamChunk() FAILED: stream not found");
+        return;
+    }
+    CefRefPtr<CefFrame> frame = it->second.frame;
+    std::deque<CefRefPtr<CefV8Value> > callbacks;
+    callbacks.push_back(it->second.readCallbacks.front());
+    it->second.readCallbacks.pop_front();
+    if (done) {
+        // Remaining reads will get an empty chunk.
+        callbacks.insert(callbacks.end(), it->second.readCallbacks.begin(),
+                         it->second.readCallbacks.end());
+        g_streamMap.erase(it);
+    }
+    for (size_t i = 0; i < callbacks.size(); i++) {
+        CallStreamCallback(frame, callbacks[i],
+                           i == 0 ? chunk : CefString(), done);
+    }
+}
+
+void OnStreamWriteAck(int streamId) {
+    StreamMap::iterator it = g_streamMap.find(streamId);
+    if (it == g_streamMap.end()) {
+        return;
+    }
+    it->second.writeInFlight = false;
+    SendNextStreamChunk(streamId);
+}
+
+void RemoveStreamsForFrame(CefRefPtr<CefFrame> frame) {
+    // Browser process fails its streams when it receives the
+    // "OnContextReleased" message.
+    int64 frameId = frame->GetIdentifier();
+    StreamMap::iterator it = g_streamMap.begin();
+    while (it != g_streamMap.end()) {
+        if (it->second.frame->GetIdentifier() == frameId) {
+            g_streamMap.erase(it++);
+        } else {
+            ++it;
+        }
+    }
+}
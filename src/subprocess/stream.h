@@ -0,0 +1,39 @@
+// Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+#pragma once
+#include "include/cef_v8.h"
+
+// Streams created with Frame.SendStream() and Frame.ReceiveStream(),
+// see stream.pyx. The javascript function is called with a reader
+// object: reader.read(callback), callback(chunk, done), reader.cancel(),
+// or with a writer object: writer.write(data, [callback]), writer.close().
+
+class StreamV8Handler
+        : public CefV8Handler {
+public:
+    explicit StreamV8Handler(int streamId)
+            : streamId_(streamId) {
+    }
+    virtual bool Execute(const CefString& name,
+                        CefRefPtr<CefV8Value> object,
+                        const CefV8ValueList& arguments,
+                        CefRefPtr<CefV8Value>& retval,
+                        CefString& exception) OVERRIDE;
+protected:
+    int streamId_;
+private:
+  IMPLEMENT_REFCOUNTING(StreamV8Handler);
+};
+
+void OpenStream(CefRefPtr<CefBrowser> browser,
+                int64 frameId,
+                int streamId,
+                const CefString& functionName,
+                bool isReader,
+                int chunkSize);
+
+void OnStreamChunk(int streamId, const CefString& chunk, bool done);
+
+void OnStreamWriteAck(int streamId);
+
+void RemoveStreamsForFrame(CefRefPtr<CefFrame> frame);
@@ -34,6 +34,24 @@ bool V8FunctionHandler::Execute(const CefString& functionName,
         browser->SendProcessMessage(PID_BROWSER, processMessage);
         returnValue = CefV8Value::CreateNull();
         return true;
+    } else if (functionId_) {
+        // Bound function with an id assigned in the Browser process,
+        // which looks it up by id, no need to check bindings here.
+        DebugLog("Renderer: V8FunctionHandler::Execute(): js binding by id");
+        CefRefPtr<CefListValue> functionArguments = V8ValueListToCefListValue(
+                v8Arguments);
+        // TODO: losing int64 precision here.
+        int frameId = (int)frame->GetIdentifier();
+        CefRefPtr<CefProcessMessage> processMessage = \
+                CefProcessMessage::Create("V8FunctionHandler::Execute");
+        CefRefPtr<CefListValue> messageArguments = \
+                processMessage->GetArgumentList();
+        messageArguments->SetInt(0, frameId);
+        messageArguments->SetInt(1, functionId_);
+        messageArguments->SetList(2, functionArguments);
+        browser->SendProcessMessage(PID_BROWSER, processMessage);
+        returnValue = CefV8Value::CreateNull();
+        return true;
     } else {
         DebugLog("Renderer: V8FunctionHandler::Execute(): js binding");
         if (!(cefPythonApp_.get() \
@@ -11,10 +11,14 @@ class CefPythonApp;
 class V8FunctionHandler 
         : public CefV8Handler {
 public:
+    // functionId is assigned to functions bound with JavascriptBindings
+    // in the Browser process, zero for functions called by name.
     V8FunctionHandler(CefRefPtr<CefPythonApp> cefPythonApp,
-                      int pythonCallbackId)
+                      int pythonCallbackId,
+                      int functionId=0)
             : cefPythonApp_(cefPythonApp),
-              pythonCallbackId_(pythonCallbackId) {
+              pythonCallbackId_(pythonCallbackId),
+              functionId_(functionId) {
     }
     virtual bool Execute(const CefString& name,
                         CefRefPtr<CefV8Value> object,
@@ -24,6 +28,7 @@ public:
 protected:
     CefRefPtr<CefPythonApp> cefPythonApp_;
     int pythonCallbackId_;
+    int functionId_;
 private:
   IMPLEMENT_REFCOUNTING(V8FunctionHandler);
 };
@@ -9,6 +9,7 @@
 
 #include "v8utils.h"
 #include "javascript_callback.h"
+#include "shared_memory.h"
 #include "DebugLog.h"
 #include "cefpython_app.h"
 #include <sstream>
@@ -64,7 +65,15 @@ void V8ValueAppendToCefListValue(CefRefPtr<CefV8Value> v8Value,
         // CefTime class.
         listValue->SetNull((int)listValue->GetSize());
     } else if (v8Value->IsString()) {
-        listValue->SetString((int)listValue->GetSize(), v8Value->GetStringValue());
+        // Large strings may be passed through shared memory.
+        CefString stringValue = v8Value->GetStringValue();
+        CefRefPtr<CefBinaryValue> sharedMemoryReference;
+        if (PutSharedMemoryString(stringValue, sharedMemoryReference)) {
+            listValue->SetBinary((int)listValue->GetSize(),
+                                 sharedMemoryReference);
+        } else {
+            listValue->SetString((int)listValue->GetSize(), stringValue);
+        }
     } else if (v8Value->IsArray()) {
         // Check for IsArray() must happen before the IsObject() check.
         int length = v8Value->GetArrayLength();
@@ -149,7 +158,14 @@ CefRefPtr<CefDictionaryValue> V8ObjectToCefDictionaryValue(
             // CefTime class.
             ret->SetNull(key);
         } else if (v8Value->IsString()) {
-            ret->SetString(key, v8Value->GetStringValue());
+            // Large strings may be passed through shared memory.
+            CefString stringValue = v8Value->GetStringValue();
+            CefRefPtr<CefBinaryValue> sharedMemoryReference;
+            if (PutSharedMemoryString(stringValue, sharedMemoryReference)) {
+                ret->SetBinary(key, sharedMemoryReference);
+            } else {
+                ret->SetString(key, stringValue);
+            }
         } else if (v8Value->IsArray()) {
             // Check for IsArray() must happen before the IsObject() check.
             int length = v8Value->GetArrayLength();
@@ -392,3 +408,101 @@ CefRefPtr<CefV8Value> CefDictionaryValueToV8Value(
     }
     return ret;
 }
+
+// ----------------------------------------------------------------------------
+// Functions.
+// ----------------------------------------------------------------------------
+
+CefRefPtr<CefV8Value> GetV8FunctionByPath(
+        CefRefPtr<CefV8Context> context,
+        const CefString& functionPath,
+        CefRefPtr<CefV8Value>& thisObject) {
+    // Resolves "func" or "object.method" on the window object, must be
+    // called while in context. Returns NULL if not found. The thisObject
+    // is set to NULL for global functions, "this" is then the global
+    // object.
+    CefRefPtr<CefV8Value> global = context->GetGlobal();
+    CefRefPtr<CefV8Value> v8Function = global;
+    std::string path = functionPath.ToString();
+    size_t start = 0;
+    thisObject = NULL;
+    while (v8Function.get() && v8Function->IsObject()) {
+        size_t dotPosition = path.find(".", start);
+        thisObject = v8Function;
+        v8Function = thisObject->GetValue(path.substr(start,
+                dotPosition == std::string::npos ? std::string::npos
+                                                 : dotPosition - start));
+        if (dotPosition == std::string::npos) {
+            break;
+        }
+        start = dotPosition + 1;
+    }
+    if (!v8Function.get() || !v8Function->IsFunction()) {
+        thisObject = NULL;
+        return NULL;
+    }
+    if (thisObject.get() && thisObject->IsSame(global)) {
+        thisObject = NULL;
+    }
+    return v8Function;
+}
+
+CefRefPtr<CefV8Value> EvalV8FunctionByPath(
+        CefRefPtr<CefV8Context> context,
+        const CefString& functionPath,
+        CefRefPtr<CefV8Value>& thisObject,
+        CefRefPtr<CefV8Exception>& exception) {
+    // Resolves "func" or "object.method" by evaluating the path as
+    // javascript code, must be called while in context. Finds also
+    // top-level let/const/class bindings, which are not properties
+    // of the window object. The path must be validated by the caller.
+    // Returns NULL if not found, exception is set when evaluating
+    // threw.
+    std::string path = functionPath.ToString();
+    size_t dotPosition = path.rfind(".");
+    CefRefPtr<CefV8Value> v8Function;
+    thisObject = NULL;
+    if (dotPosition == std::string::npos) {
+        if (!context->Eval(path, v8Function, exception)) {
+            return NULL;
+        }
+    } else {
+        if (!context->Eval(path.substr(0, dotPosition), thisObject,
+                           exception)) {
+            thisObject = NULL;
+            return NULL;
+        }
+        if (thisObject.get() && thisObject->IsObject()) {
+            v8Function = thisObject->GetValue(path.substr(dotPosition + 1));
+        }
+    }
+    if (!v8Function.get() || !v8Function->IsFunction()) {
+        thisObject = NULL;
+        return NULL;
+    }
+    return v8Function;
+}
+
+void ReportJavascriptError(CefRefPtr<CefV8Context> context,
+                           const CefString& message) {
+    // Reports an error the same way as an uncaught exception, it is
+    // shown in the console and DisplayHandler.OnConsoleMessage() is
+    // called. Must be called while in context.
+    std::string logMessage = "Renderer: javascript error: ";
+    logMessage.append(message.ToString());
+    DebugLog(logMessage.c_str());
+    CefRefPtr<CefV8Value> console = context->GetGlobal()->GetValue("console");
+    if (!console.get() || !console->IsObject()) {
+        return;
+    }
+    CefRefPtr<CefV8Value> consoleError = console->GetValue("error");
+    if (!consoleError.get() || !consoleError->IsFunction()) {
+        return;
+    }
+    CefV8ValueList arguments;
+    arguments.push_back(CefV8Value::CreateString(message));
+    consoleError->ExecuteFunction(console, arguments);
+    if (consoleError->HasException()) {
+        consoleError->ClearException();
+    }
+}
@@ -36,3 +36,21 @@ CefRefPtr<CefV8Value> CefListValueToV8Value(
 CefRefPtr<CefV8Value> CefDictionaryValueToV8Value(
         CefRefPtr<CefDictionaryValue> dictValue,
         int nestingLevel=0);
+
+// ----------------------------------------------------------------------------
+// Functions.
+// ----------------------------------------------------------------------------
+
+CefRefPtr<CefV8Value> GetV8FunctionByPath(
+        CefRefPtr<CefV8Context> context,
+        const CefString& functionPath,
+        CefRefPtr<CefV8Value>& thisObject);
+
+CefRefPtr<CefV8Value> EvalV8FunctionByPath(
+        CefRefPtr<CefV8Context> context,
+        const CefString& functionPath,
+        CefRefPtr<CefV8Value>& thisObject,
+        CefRefPtr<CefV8Exception>& exception);
+
+void ReportJavascriptError(CefRefPtr<CefV8Context> context,
+                           const CefString& message);
@@ -4,59 +4,89 @@
 
 include "cefpython.pyx"
 
-g_taskMaxId = 0
-g_tasks = {}
+cdef int g_taskMaxId = 0
+# taskId => (func, params)
+cdef dict g_tasks = {}
+
+cdef void ValidateTask(py_string funcName, int threadId, object func
+                       ) except *:
+    if threadId not in g_browserProcessThreads:
+        raise Exception("%s failed: requires a browser process thread"
+                        % funcName)
+    if not IsFunctionOrMethod(type(func)):
+        raise Exception("%s failed: not a function nor method" % funcName)
 
 def PostTask(int threadId, object func, *args):
-    global g_tasks, g_taskMaxId
+    ValidateTask("PostTask()", threadId, func)
+    PostPythonTask(threadId, 0, func, list(args))
 
-    # Validate threadId.
-    if threadId not in g_browserProcessThreads:
-        raise Exception("PoastTask failed: requires a browser process thread")
+def PostDelayedTask(int threadId, int delayMs, object func, *args):
+    ValidateTask("PostDelayedTask()", threadId, func)
+    PostPythonTask(threadId, delayMs, func, list(args))
 
-    # Validate func.
-    if not IsFunctionOrMethod(type(func)):
-        raise Exception("PostTask failed: not a function nor method")
+def PostTaskWithResult(int threadId, object func, *args):
+    ValidateTask("PostTaskWithResult()", threadId, func)
+    cdef object future = CreateFuture("PostTaskWithResult()")
+    PostPythonTask(threadId, 0, _RunTaskWithResult,
+                   [future, func] + list(args))
+    return future
+
+def PostDelayedTaskWithResult(int threadId, int delayMs, object func, *args):
+    ValidateTask("PostDelayedTaskWithResult()", threadId, func)
+    cdef object future = CreateFuture("PostDelayedTaskWithResult()")
+    PostPythonTask(threadId, delayMs, _RunTaskWithResult,
+                   [future, func] + list(args))
+    return future
+
+def _RunTaskWithResult(object future, object func, *args):
+    # Runs on the target thread. A task whose future was cancelled
+    # before it started is skipped.
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        result = func(*args)
+    except Exception as exc:
+        future.set_exception(exc)
+    else:
+        future.set_result(result)
+
+cdef object CallOnUIThread(py_string funcName, object func, list args):
+    # Used with the multi_threaded_message_loop setting to run func on
+    # the CEF UI thread and wait for its result. The GIL is released
+    # while waiting. Exceptions are re-raised in the calling thread.
+    cdef object future = CreateFuture(funcName)
+    PostPythonTask(TID_UI, 0, _RunTaskWithResult, [future, func] + args)
+    return future.result()
 
-    # Params.
-    cdef list params = list(args)
+cdef void PostPythonTask(int threadId, int delayMs, object func,
+                         list params) except *:
+    # Also used internally to schedule work on a CEF thread, for
+    # example timeouts in Frame.EvaluateJavascript().
+    global g_taskMaxId
 
     # Keep func and params until PyTaskRunnable is called.
     g_taskMaxId += 1
-    g_tasks[str(g_taskMaxId)] = {
-        "func": func,
-        "params": params
-    }
+    cdef int cTaskId = g_taskMaxId
+    g_tasks[cTaskId] = (func, params)
 
     # Call C++ wrapper.
-    cdef int cTaskId = int(g_taskMaxId)
     with nogil:
-        PostTaskWrapper(threadId, cTaskId)
+        PostDelayedTaskWrapper(threadId, cTaskId, delayMs)
 
 cdef public void PyTaskRunnable(int taskId) except * with gil:
-    cdef object func
-    cdef list params
-    cdef object task
+    cdef tuple task
 
     try:
-        global g_tasks
-
-        # Validate if task exist.
-        if str(taskId) not in g_tasks:
+        # Fetch task: func and params.
+        task = g_tasks.pop(taskId, None)
+        if task is None:
             raise Exception("PyTaskRunnable failed: invalid taskId=%s" \
                     % taskId)
 
-        # Fetch task: func and params.
-        task = g_tasks[str(taskId)]
-        func = task["func"]
-        params = task["params"]
-        del g_tasks[str(taskId)]
-
         # Execute user func.
-        Debug("PyTaskRunnable: taskId=%s, func=%s" % (taskId, func.__name__))
-        func(*params)
+        Debug("PyTaskRunnable: taskId=%s, func=%s" % (taskId, task[0]))
+        task[0](*task[1])
 
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
-
@@ -0,0 +1,76 @@
+# Copyright (c) 2016 CEF Python. See the Authors and License files.
+
+# ThreadSafeBrowser is a proxy that can be used from any thread. Calling
+# a method posts the call to the UI thread and returns a future. Calls
+# made by all proxies until the UI thread runs the posted task are
+# batched, so that many calls from worker threads cost a single task.
+# When a method is called on the UI thread it is executed immediately.
+
+include "cefpython.pyx"
+
+# [(browserId, methodName, args, kwargs, future), ...]
+cdef list g_threadSafeBrowserCalls = []
+cdef py_bool g_threadSafeBrowserFlushScheduled = False
+
+cdef class ThreadSafeBrowser:
+    cdef int browserId
+
+    def __init__(self, PyBrowser browser):
+        self.browserId = browser.GetIdentifier()
+
+    def GetIdentifier(self):
+        return self.browserId
+
+    def __getattr__(self, py_string name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return ThreadSafeBrowserMethod(self.browserId, name)
+
+cdef class ThreadSafeBrowserMethod:
+    cdef int browserId
+    cdef py_string name
+
+    def __init__(self, int browserId, py_string name):
+        self.browserId = browserId
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        global g_threadSafeBrowserFlushScheduled
+        cdef object future = CreateFuture("ThreadSafeBrowser.%s()"
+                                          % self.name)
+        if IsThread(TID_UI):
+            RunThreadSafeBrowserCall(self.browserId, self.name, args, kwargs,
+                                     future)
+            return future
+        g_threadSafeBrowserCalls.append((self.browserId, self.name, args,
+                                         kwargs, future))
+        if not g_threadSafeBrowserFlushScheduled:
+            g_threadSafeBrowserFlushScheduled = True
+            PostPythonTask(TID_UI, 0, _FlushThreadSafeBrowserCalls, [])
+        return future
+
+cdef void RunThreadSafeBrowserCall(int browserId, py_string name, tuple args,
+                                   dict kwargs, object future) except *:
+    if not future.set_running_or_notify_cancel():
+        return
+    cdef PyBrowser pyBrowser = GetPyBrowserById(browserId)
+    if not pyBrowser:
+        future.set_exception(Exception("ThreadSafeBrowser.%s() failed:"
+                                       " browser was closed" % name))
+        return
+    try:
+        result = getattr(pyBrowser, name)(*args, **kwargs)
+    except Exception as exc:
+        future.set_exception(exc)
+    else:
+        future.set_result(result)
+
+def _FlushThreadSafeBrowserCalls():
+    # Called on the UI thread through PostPythonTask(). Calls appended
+    # by other threads while running are flushed by the next task.
+    global g_threadSafeBrowserCalls, g_threadSafeBrowserFlushScheduled
+    g_threadSafeBrowserFlushScheduled = False
+    cdef list calls = g_threadSafeBrowserCalls
+    g_threadSafeBrowserCalls = []
+    for call in calls:
+        RunThreadSafeBrowserCall(call[0], call[1], call[2], call[3], call[4])
@@ -151,6 +151,13 @@ def main():
     glob_move(package_dir+"/*.css", package_dir+"/examples/")
     glob_move(package_dir+"/*.js", package_dir+"/examples/")
 
+    print("Creating asyncio dir in package dir")
+    os.mkdir(package_dir+"/asyncio/")
+
+    print("Copying asyncio/ to package dir")
+    asyncio_subpackage_dir = os.path.abspath(installer_dir+"/../../asyncio/")
+    glob_copy(asyncio_subpackage_dir+"/*", package_dir+"/asyncio/")
+
     print("Copying wx/ to package dir")
     wx_subpackage_dir = os.path.abspath(installer_dir+"/../../wx/")
     glob_copy(wx_subpackage_dir+"/*", package_dir+"/wx/")
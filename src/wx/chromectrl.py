@@ -19,11 +19,14 @@ def Debug(msg):
 
 #-------------------------------------------------------------------------------
 
-# Default timer interval when timer used to service CEF message loop
+# Default timer interval when timer used to service CEF message loop.
+# With the adaptiveTimer param of Initialize() next intervals are the
+# delays requested by CEF, see MessageLoopTimer().
 DEFAULT_TIMER_MILLIS = 10
 
 # A global timer for CEF message loop processing.
 g_messageLoopTimer = None
+g_adaptiveTimer = False
 
 def CreateMessageLoopTimer(timerMillis):
     # This function gets called multiple times for each ChromeWindow
@@ -33,7 +36,10 @@ def CreateMessageLoopTimer(timerMillis):
     if g_messageLoopTimer:
         return
     g_messageLoopTimer = wx.Timer()
-    g_messageLoopTimer.Start(timerMillis)
+    if g_adaptiveTimer:
+        g_messageLoopTimer.Start(timerMillis, wx.TIMER_ONE_SHOT)
+    else:
+        g_messageLoopTimer.Start(timerMillis)
     Debug("g_messageLoopTimer.GetId() = "\
             +str(g_messageLoopTimer.GetId()))
     wx.EVT_TIMER(g_messageLoopTimer, g_messageLoopTimer.GetId(),\
@@ -41,6 +47,10 @@ def CreateMessageLoopTimer(timerMillis):
 
 def MessageLoopTimer(event):
     cefpython.MessageLoopWork()
+    # Poll fast when CEF has work to do and back off when idle.
+    if g_adaptiveTimer and g_messageLoopTimer:
+        g_messageLoopTimer.Start(max(1, cefpython.GetNextWorkDelay()),
+                                 wx.TIMER_ONE_SHOT)
 
 def DestroyMessageLoopTimer():
     global g_messageLoopTimer
@@ -367,12 +377,17 @@ class CallbackClientHandler(object):
 
 #-------------------------------------------------------------------------------
 
-def Initialize(settings=None, debug=False):
+def Initialize(settings=None, debug=False, adaptiveTimer=False):
     """Initializes CEF, We should do it before initializing wx
        If no settings passed a default is used
+       With adaptiveTimer the message loop timer is re-armed with
+       cefpython.GetNextWorkDelay() instead of firing every 10ms. It
+       requires the "external_message_pump" setting and a scheduler set
+       with cefpython.SetMessagePumpScheduler() by the application.
     """
     switches = {}
     global g_settings
+    global g_adaptiveTimer
     if not settings:
         settings = {}
 
@@ -411,6 +426,11 @@ def Initialize(settings=None, debug=False):
         settings["log_severity"] = cefpython.LOGSEVERITY_VERBOSE
         settings["log_file"] = "debug.log" # Set to "" to disable.
 
+    if adaptiveTimer and not settings.get("external_message_pump"):
+        raise Exception("chromectrl.Initialize() failed: adaptiveTimer"
+                        " requires the external_message_pump setting")
+
+    g_adaptiveTimer = adaptiveTimer
     g_settings = settings
     cefpython.Initialize(settings, switches)
 
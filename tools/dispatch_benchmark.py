@@ -0,0 +1,119 @@
+# Copyright (c) 2016 CEF Python, see the Authors file. All rights reserved.
+
+"""Measure the cost of dispatching CEF events to empty Python callbacks.
+
+A windowless browser runs a page that repaints, logs to console and
+changes its title on every animation frame and reloads itself every
+second. The page is run once without callbacks (baseline) and then
+once for each event type with a callback set only for that type, the
+callback only counts calls. The extra time spent in MessageLoopWork()
+divided by the number of events is the dispatch cost per event. Event
+types without a callback should cost the same as in the baseline run.
+
+Usage:
+    dispatch_benchmark.py [SECONDS]
+
+SECONDS is the duration of each run, default is 3.
+"""
+
+from cefpython3 import cefpython as cef
+import base64
+import sys
+import time
+
+HTML = """
+<html><body><div id=d></div><script>
+var n = 0;
+function frame() {
+    n++;
+    document.getElementById("d").innerHTML = n;
+    document.title = "frame " + n;
+    console.log("frame " + n);
+    requestAnimationFrame(frame);
+}
+requestAnimationFrame(frame);
+setTimeout(function() { location.reload(); }, 1000);
+</script></body></html>
+"""
+URL = "data:text/html;base64," + base64.b64encode(
+        HTML.encode("utf-8")).decode("ascii")
+
+EVENTS = [
+    "OnPaint",
+    "OnConsoleMessage",
+    "OnTitleChange",
+    "OnAddressChange",
+    "OnLoadStart",
+    "OnLoadEnd",
+    "OnBeforeBrowse",
+    "OnBeforeResourceLoad",
+    "GetResourceHandler",
+]
+
+
+def main():
+    """Main entry point."""
+    if "-h" in sys.argv or "--help" in sys.argv:
+        print(__doc__.strip())
+        sys.exit(0)
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    sys.excepthook = cef.ExceptHook
+    cef.Initialize({"windowless_rendering_enabled": True,
+                    "log_severity": cef.LOGSEVERITY_ERROR,
+                    "log_file": ""})
+    baseline = run(None, seconds)
+    print("CEF Python {ver}, {seconds}s per run".format(
+            ver=cef.__version__, seconds=seconds))
+    print("Baseline: {time:.3f}s in MessageLoopWork()".format(
+            time=baseline[0]))
+    print("{0:<24}{1:>10}{2:>14}".format("Event", "Count", "Cost/event"))
+    for event in EVENTS:
+        (elapsed, count) = run(event, seconds)
+        if count:
+            cost = (elapsed - baseline[0]) / count * 1000000.0
+            print("{0:<24}{1:>10}{2:>11.1f} us".format(event, count, cost))
+        else:
+            print("{0:<24}{1:>10}{2:>14}".format(event, 0, "-"))
+    cef.Shutdown()
+
+
+def run(event, seconds):
+    """Run the page with a callback for the given event that only counts
+    calls. Returns (time spent in MessageLoopWork, number of events)."""
+    window_info = cef.WindowInfo()
+    window_info.SetAsOffscreen(0)
+    browser = cef.CreateBrowserSync(window_info=window_info, url=URL)
+    handler = ClientHandler()
+    browser.SetClientCallback("GetViewRect", handler.GetViewRect)
+    if event:
+        browser.SetClientCallback(event, handler.callback)
+    browser.WasResized()
+    elapsed = 0.0
+    end = time.time() + seconds
+    while time.time() < end:
+        start = time.time()
+        cef.MessageLoopWork()
+        elapsed += time.time() - start
+        time.sleep(0.001)
+    browser.CloseBrowser(True)
+    del browser
+    for _ in range(20):
+        cef.MessageLoopWork()
+        time.sleep(0.01)
+    return elapsed, handler.count
+
+
+class ClientHandler(object):
+    def __init__(self):
+        self.count = 0
+
+    def GetViewRect(self, browser, rect_out):
+        rect_out.extend([0, 0, 800, 600])
+        return True
+
+    def callback(self, *_):
+        self.count += 1
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,7 @@ from cefpython3 import cefpython as cef
 import time
 import base64
 import sys
+import threading
 
 # To show the window for an extended period of time increase this number.
 MESSAGE_LOOP_RANGE = 25  # each iteration is 0.01 sec
@@ -29,6 +30,24 @@ g_datauri_data = """
         msg = msg.replace("error", "<b style='color:red'>error</b>");
         document.getElementById("console").innerHTML += msg+"<br>";
     }
+    function test_stream_reader(reader) {
+        var data = "";
+        reader.read(function on_chunk(chunk, done) {
+            data += chunk;
+            if (done) {
+                print("test_stream_reader ok");
+                external.test_stream_reader_done(data);
+            } else {
+                reader.read(on_chunk);
+            }
+        });
+    }
+    function test_stream_writer(writer) {
+        writer.write(new Array(11).join("0123456789"), function() {
+            print("test_stream_writer ok");
+        });
+        writer.close();
+    }
     window.onload = function(){
         print("window.onload() ok");
 
@@ -62,6 +81,40 @@ g_datauri_data = """
             py_callback("String sent from Javascript");
             print("py_callback() ok");
         });
+
+        // Test channel: test_channel
+        var channel_values = [];
+        test_channel.subscribe(function(value, key){
+            channel_values.push(value);
+            if (value == 3) {
+                print("test_channel ok");
+                external.test_channel_done(key, channel_values);
+            }
+        });
+        external.test_channel_subscribed();
+
+        // Test observable property: test_observable
+        window.addEventListener("pythonpropertychange", function(event) {
+            if (event.detail.name == "test_observable") {
+                print("test_observable ok");
+                external.test_observable_done(event.detail.changed,
+                                              event.detail.deleted,
+                                              test_observable);
+            }
+        });
+        external.test_observable_update();
+
+        // Test incremental rebinding: test_patched_property
+        external.test_bindings_patch();
+        (function wait_for_patch() {
+            if (typeof test_patched_property == "undefined") {
+                setTimeout(wait_for_patch, 10);
+                return;
+            }
+            print("test_bindings_patch ok");
+            external.test_bindings_patch_done(test_patched_property,
+                                              test_property1);
+        })();
     };
     </script>
 </head>
@@ -77,6 +130,9 @@ g_datauri = "data:text/html;base64,"+base64.b64encode(g_datauri_data.encode(
 
 g_subtests_ran = 0
 
+# Data sent in chunks by Frame.SendStream() and by javascript
+g_stream_data = "0123456789" * 10
+
 
 def subtest_message(message):
     global g_subtests_ran
@@ -114,6 +170,11 @@ class MainTest_IsolatedTest(unittest.TestCase):
         self.assertIsNotNone(browser, "Browser object")
         subtest_message("cef.CreateBrowserSync() ok")
 
+        # Test browser lookup by window handle
+        self.assertIs(cef.GetBrowserByWindowHandle(browser.GetWindowHandle()),
+                      browser)
+        subtest_message("cef.GetBrowserByWindowHandle() ok")
+
         # Test other handlers: LoadHandler, DisplayHandler etc.
         client_handlers = [LoadHandler(self), DisplayHandler(self)]
         for handler in client_handlers:
@@ -128,15 +189,50 @@ class MainTest_IsolatedTest(unittest.TestCase):
         bindings.SetProperty("test_property1", external.test_property1)
         bindings.SetProperty("test_property2", external.test_property2)
         bindings.SetObject("external", external)
+        bindings.SetProperty("test_observable", external.test_observable)
         browser.SetJavascriptBindings(bindings)
+        external.bindings = bindings
         subtest_message("browser.SetJavascriptBindings() ok")
 
+        # Test channel
+        external.channel = browser.CreateChannel("test_channel",
+                                                 policy="latest")
+        subtest_message("browser.CreateChannel() ok")
+        # The page never subscribes to this channel
+        unsubscribed_channel = browser.CreateChannel("test_drop_channel",
+                                                     policy="drop")
+        unsubscribed_channel.Publish(0)
+
+        # Test tasks
+        task_future = cef.PostDelayedTaskWithResult(
+                cef.TID_UI, 10, lambda x, y: x * y, 6, 7)
+        subtest_message("cef.PostDelayedTaskWithResult() ok")
+
+        # Test thread safe browser proxy, called from another thread
+        tsbrowser = cef.ThreadSafeBrowser(browser)
+        tsbrowser_futures = []
+        thread = threading.Thread(target=lambda: tsbrowser_futures.append(
+                tsbrowser.GetUrl()))
+        thread.start()
+        thread.join()
+        subtest_message("cef.ThreadSafeBrowser() ok")
+
         # Run message loop for 0.5 sec.
         # noinspection PyTypeChecker
         for i in range(MESSAGE_LOOP_RANGE):
             cef.MessageLoopWork()
             time.sleep(0.01)
         subtest_message("cef.MessageLoopWork() ok")
+        self.assertEqual(task_future.result(timeout=0), 42)
+        subtest_message("PostDelayedTaskWithResult() future ok")
+        self.assertTrue(tsbrowser_futures[0].result(timeout=0))
+        subtest_message("ThreadSafeBrowser.GetUrl() future ok")
+        for value in range(1, 1001):
+            unsubscribed_channel.Publish(value)
+        self.assertLessEqual(unsubscribed_channel.GetPendingCount(), 1)
+        self.assertGreaterEqual(
+                unsubscribed_channel.GetStatistics()["skipped"], 999)
+        subtest_message("Channel with no subscriber stays bounded ok")
 
         # Test browser closing. Remember to clean reference.
         browser.CloseBrowser(True)
@@ -170,8 +266,8 @@ class MainTest_IsolatedTest(unittest.TestCase):
                                     " ok")
             self.assertTrue(test_for_True)
 
-        # Test shutdown of CEF
-        cef.Shutdown()
+        # Test shutdown of CEF, browser was already closed
+        self.assertEqual(cef.Shutdown(timeout=2.0), [])
         subtest_message("cef.Shutdown() ok")
 
         # Display real number of tests there were run
@@ -207,6 +303,9 @@ class LoadHandler(object):
         self.OnLoadStart_True = False
         self.OnLoadEnd_True = False
         self.FrameSourceVisitor_True = False
+        self.EvaluateJavascript_True = False
+        self.ReceiveStream_True = False
+        self.stream_chunks = []
         # self.OnLoadingStateChange_Start_True = False # FAILS
         self.OnLoadingStateChange_End_True = False
 
@@ -225,6 +324,26 @@ class LoadHandler(object):
         frame.GetSource(self.frame_source_visitor)
         browser.ExecuteJavascript(
                 "print('LoadHandler.OnLoadEnd() ok')")
+        future = frame.EvaluateJavascript("[1+2, 'ok']")
+        future.add_done_callback(self._OnEvaluateJavascriptDone)
+        frame.SendStream("test_stream_reader", g_stream_data, chunkSize=16)
+        frame.ReceiveStream("test_stream_writer", self._OnStreamChunk,
+                            chunkSize=16)
+
+    def _OnEvaluateJavascriptDone(self, future):
+        self.test_case.assertFalse(self.EvaluateJavascript_True)
+        self.EvaluateJavascript_True = True
+        self.test_case.assertEqual(future.result(), [3, "ok"])
+
+    def _OnStreamChunk(self, chunk, done):
+        self.stream_chunks.append(chunk)
+        if done:
+            self.test_case.assertFalse(self.ReceiveStream_True)
+            self.ReceiveStream_True = True
+            self.test_case.assertEqual("".join(self.stream_chunks),
+                                       g_stream_data)
+            # 7 chunks of data and an empty chunk on close
+            self.test_case.assertEqual(len(self.stream_chunks), 8)
 
     def OnLoadingStateChange(self, browser, is_loading,
                              can_go_back, can_go_forward):
@@ -296,6 +415,15 @@ class External(object):
         self.test_function_True = False
         self.test_callbacks_True = False
         self.py_callback_True = False
+        self.test_channel_True = False
+        self.test_stream_reader_True = False
+        self.test_bindings_patch_True = False
+        self.test_observable_True = False
+        self.test_observable = cef.ObservableProperty({"count": 0,
+                                                       "temp": True,
+                                                       "other": "x"})
+        self.channel = None
+        self.bindings = None
 
     def test_function(self):
         """Test binding function to the 'window' object."""
@@ -307,8 +435,53 @@ class External(object):
             self.py_callback_True = True
             self.test_case.assertEqual(msg_from_js,
                                        "String sent from Javascript")
+            stats = cef.GetPythonCallbackStatistics()
+            self.test_case.assertGreaterEqual(stats["executed"], 1)
+            self.test_case.assertGreaterEqual(stats["count"], 1)
         self.test_callbacks_True = True
         js_callback.Call("String sent from Python", py_callback)
+        js_callback.Release()
+
+    def test_stream_reader_done(self, data):
+        """Test data sent by Frame.SendStream()."""
+        self.test_stream_reader_True = True
+        self.test_case.assertEqual(data, g_stream_data)
+
+    def test_bindings_patch(self):
+        """Test that Rebind() after SetProperty() sends only a patch."""
+        self.bindings.SetProperty("test_patched_property", [1, "patched"])
+        self.bindings.Rebind()
+
+    def test_bindings_patch_done(self, patched_property, property1):
+        self.test_bindings_patch_True = True
+        self.test_case.assertEqual(patched_property, [1, "patched"])
+        # Other bindings were not touched
+        self.test_case.assertEqual(property1, self.test_property1)
+
+    def test_observable_update(self):
+        """Test that changes are flushed once in a single patch."""
+        self.test_observable["count"] = 1
+        self.test_observable["count"] = 2
+        del self.test_observable["temp"]
+
+    def test_observable_done(self, changed, deleted, observable):
+        self.test_case.assertFalse(self.test_observable_True)
+        self.test_observable_True = True
+        self.test_case.assertEqual(changed, {"count": 2})
+        self.test_case.assertEqual(deleted, ["temp"])
+        self.test_case.assertEqual(observable, {"count": 2, "other": "x"})
+
+    def test_channel_subscribed(self):
+        """Test publishing values to a channel."""
+        for value in [1, 2, 3]:
+            self.channel.Publish(value, key="price")
+
+    def test_channel_done(self, key, values):
+        self.test_channel_True = True
+        self.test_case.assertEqual(key, "price")
+        # With the "latest" policy value 2 is skipped, as value 3 was
+        # published before the first delivery was acknowledged.
+        self.test_case.assertEqual(values, [1, 3])
 
 
 if __name__ == "__main__":